@@ -1,22 +1,30 @@
 from __future__ import annotations
 
 import base64
+import bisect
 import calendar
 import hashlib
+import heapq
 import hmac
+import itertools
 import json
+import math
 import os
 import re
 import secrets
 import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from functools import wraps
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Iterator, Optional
 
 from flask import (
     Flask,
     abort,
+    g,
     jsonify,
     redirect,
     render_template,
@@ -26,25 +34,81 @@ from flask import (
 )
 from werkzeug.exceptions import BadRequest
 from werkzeug.exceptions import HTTPException
+from werkzeug.middleware.proxy_fix import ProxyFix
 
-from storage import DatabaseStorage, StorageConfigError
+from storage import DatabaseStorage, LRUCache, StorageConfigError, UserExistsError
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(BASE_DIR, "data")
 USERS_FILE = os.path.join(DATA_DIR, "users.json")
 SCHEDULE_DIR = os.path.join(DATA_DIR, "schedules")
 
+
+def _env_int(name: str, default: int, minimum: int) -> int:
+    """Integer setting from the environment; unset or malformed values fall back to ``default``."""
+    try:
+        value = int(os.environ.get(name, str(default)))
+    except ValueError:
+        value = default
+    return max(minimum, value)
+
+
+def _env_float(name: str, default: float, minimum: float) -> float:
+    """Float counterpart of :func:`_env_int`."""
+    try:
+        value = float(os.environ.get(name, str(default)))
+    except ValueError:
+        value = default
+    return max(minimum, value)
+
+
 _STORAGE: Optional[DatabaseStorage] = None
+_FREEBUSY: Optional["_FreeBusyIndex"] = None
+_PASSWORD_WORKERS: Optional["_PasswordWorkers"] = None
+_TOKEN_REVOCATIONS: Optional["_TokenRevocations"] = None
 PASSWORD_ITERATIONS = 260000
+PASSWORD_RETRY_AFTER_SECONDS = 1
+# Reverse proxies in front of the app; request.remote_addr then comes from the last N X-Forwarded-For hops.
+TRUSTED_PROXY_COUNT = _env_int("TRUSTED_PROXY_COUNT", 0, minimum=0)
+TOKEN_PREFIX = "cst1"
+TOKEN_TTL_SECONDS = _env_int("API_TOKEN_TTL_SECONDS", 900, minimum=1)
+TOKEN_REVOCATION_REFRESH_SECONDS = _env_float("TOKEN_REVOCATION_REFRESH_SECONDS", 5.0, minimum=0.0)
 USERNAME_PATTERN = re.compile(r"^[A-Za-z0-9_]{4,20}$")
 PASSWORD_PATTERN = re.compile(r"^(?=.*[A-Za-z])(?=.*\d).{8,}$")
 ALLOWED_FREQUENCIES = {"none", "daily", "weekly", "monthly", "yearly"}
 ALLOWED_END_TYPES = {"never", "until", "count"}
-MAX_OCCURRENCES = 200
+# An expanded listing without ``limit`` returns at most this many occurrences, with ``next_cursor`` to go on.
+MAX_OCCURRENCES = 1000
+MAX_RECURRENCE_COUNT = 10000
+MAX_PAGE_SIZE = 500
+CONFLICT_HORIZON_DAYS = 366
+# Fixed-length periods repeat exactly, so two such series overlap iff they do within one common cycle.
+SERIES_PERIOD_DAYS = {"daily": 1, "weekly": 7}
+# Expansion order for overlap checks: the sparsest series is expanded, the other is probed arithmetically.
+SERIES_SPARSITY = {"daily": 0, "weekly": 1, "monthly": 2, "yearly": 3, "none": 4}
+# Working periods on workdays, as (name, start minute, end minute).
+WORK_PERIODS = (("morning", 9 * 60, 12 * 60), ("afternoon", 13 * 60 + 30, 18 * 60))
+MAX_SLOT_SEARCH_DAYS = 62
+MAX_SLOT_RESULTS = 50
+MINUTES_PER_DAY = 24 * 60
+MAX_COMMON_PARTICIPANTS = 20
+MAX_BULK_EVENTS = 5000
+MAX_STATS_HISTOGRAM_DAYS = 366
+ADMIN_USER_SORTS = ("username", "created_at", "event_count")
+ICS_PRODID = "-//CalendarSecretary//Calendar Export//EN"
+ICS_IMPORT_BATCH = 500
+# Fallbacks for VEVENT fields this app requires but iCalendar treats as optional.
+ICS_DEFAULT_TITLE = "(untitled)"
+ICS_DEFAULT_LOCATION = "(none)"
+ICS_FREQUENCIES = {"DAILY": "daily", "WEEKLY": "weekly", "MONTHLY": "monthly", "YEARLY": "yearly"}
+ICS_WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+ICS_DURATION_PATTERN = re.compile(r"^\+?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$")
 
 app = Flask(__name__)
 app.secret_key = os.environ.get("CALENDAR_SECRET_KEY", "dev-secret-change-me")
 app.config["JSON_SORT_KEYS"] = False
+if TRUSTED_PROXY_COUNT:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXY_COUNT)
 JSON_ERROR_PATH_PREFIXES = ("/api/",)
 JSON_ERROR_PATH_EXACT = {"/login"}
 
@@ -60,6 +124,16 @@ class User:
     created_at: str = ""
 
 
+@dataclass
+class Principal:
+    username: str
+    api_key: str
+    enabled: bool
+    is_admin: bool
+    # Claims of the bearer token the caller authenticated with, if any.
+    token: Optional[Dict[str, Any]] = None
+
+
 def _get_storage() -> DatabaseStorage:
     global _STORAGE
     if _STORAGE is None:
@@ -68,6 +142,34 @@ def _get_storage() -> DatabaseStorage:
     return _STORAGE
 
 
+def _get_password_workers() -> "_PasswordWorkers":
+    global _PASSWORD_WORKERS
+    if _PASSWORD_WORKERS is None:
+        _PASSWORD_WORKERS = _PasswordWorkers(
+            workers=_env_int("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1), minimum=1),
+            queue_limit=_env_int("PASSWORD_HASH_QUEUE_LIMIT", 8, minimum=0),
+            per_client_limit=_env_int("PASSWORD_HASH_PER_CLIENT", 2, minimum=1),
+            per_user_limit=_env_int("PASSWORD_HASH_PER_USER", 1, minimum=1),
+        )
+    return _PASSWORD_WORKERS
+
+
+def _get_token_revocations() -> "_TokenRevocations":
+    global _TOKEN_REVOCATIONS
+    storage = _get_storage()
+    if _TOKEN_REVOCATIONS is None or _TOKEN_REVOCATIONS.storage is not storage:
+        _TOKEN_REVOCATIONS = _TokenRevocations(storage, TOKEN_REVOCATION_REFRESH_SECONDS)
+    return _TOKEN_REVOCATIONS
+
+
+def _get_freebusy() -> "_FreeBusyIndex":
+    global _FREEBUSY
+    storage = _get_storage()
+    if _FREEBUSY is None or _FREEBUSY.storage is not storage:
+        _FREEBUSY = _FreeBusyIndex(storage)
+    return _FREEBUSY
+
+
 def _wants_json_error(path: str) -> bool:
     return path in JSON_ERROR_PATH_EXACT or any(path.startswith(prefix) for prefix in JSON_ERROR_PATH_PREFIXES)
 
@@ -103,41 +205,48 @@ def _log_database_exception(error: BaseException) -> None:
     )
 
 
-def _serialize_users(users: Dict[str, User]) -> Dict[str, Any]:
-    payload: Dict[str, Any] = {}
-    for username, user in users.items():
-        payload[username] = {
-            "password": {
-                "salt": base64.b64encode(user.password_salt).decode("utf-8"),
-                "iterations": user.iterations,
-                "hash": base64.b64encode(user.password_hash).decode("utf-8"),
-            },
-            "api_key": user.api_key,
-            "enabled": user.enabled,
-            "created_at": user.created_at,
-        }
-    return payload
+def _serialize_password(salt: bytes, password_hash: bytes, iterations: int) -> Dict[str, Any]:
+    return {
+        "salt": base64.b64encode(salt).decode("utf-8"),
+        "iterations": iterations,
+        "hash": base64.b64encode(password_hash).decode("utf-8"),
+    }
 
 
-def _load_users() -> Dict[str, User]:
-    raw = _get_storage().load_users()
-    users: Dict[str, User] = {}
-    for username, payload in raw.items():
-        password = payload["password"]
-        users[username] = User(
-            username=username,
-            api_key=payload.get("api_key", ""),
-            password_salt=base64.b64decode(password["salt"]),
-            password_hash=base64.b64decode(password["hash"]),
-            iterations=int(password.get("iterations", PASSWORD_ITERATIONS)),
-            enabled=bool(payload.get("enabled", True)),
-            created_at=payload.get("created_at", ""),
-        )
-    return users
+def _serialize_user(user: User) -> Dict[str, Any]:
+    return {
+        "password": _serialize_password(user.password_salt, user.password_hash, user.iterations),
+        "api_key": user.api_key,
+        "enabled": user.enabled,
+        "created_at": user.created_at,
+    }
+
+
+def _user_from_payload(username: str, payload: Dict[str, Any]) -> User:
+    password = payload["password"]
+    return User(
+        username=username,
+        api_key=payload.get("api_key", ""),
+        password_salt=base64.b64decode(password["salt"]),
+        password_hash=base64.b64decode(password["hash"]),
+        iterations=int(password.get("iterations", PASSWORD_ITERATIONS)),
+        enabled=bool(payload.get("enabled", True)),
+        created_at=payload.get("created_at", ""),
+    )
+
+
+def _load_user(username: str) -> Optional[User]:
+    payload = _get_storage().get_user(username)
+    if not payload:
+        return None
+    return _user_from_payload(username, payload)
 
 
-def _save_users(users: Dict[str, User]) -> None:
-    _get_storage().save_users(_serialize_users(users))
+def _load_user_by_api_key(api_key: str) -> Optional[User]:
+    payload = _get_storage().get_user_by_api_key(api_key)
+    if not payload:
+        return None
+    return _user_from_payload(payload["username"], payload)
 
 
 def _hash_password(password: str) -> tuple[bytes, bytes]:
@@ -161,6 +270,50 @@ def _verify_password(user: User, password: str) -> bool:
     return hmac.compare_digest(digest, user.password_hash)
 
 
+class _PasswordWorkRejected(Exception):
+    """Raised when password hashing capacity is exhausted; answered with 429."""
+
+
+class _PasswordWorkers:
+    """Bounded thread pool for PBKDF2 work with up-front admission control.
+
+    ``hashlib.pbkdf2_hmac`` releases the GIL, so at most ``workers`` derivations use CPU at once
+    while other requests keep running. Work beyond ``workers + queue_limit`` in flight, or beyond
+    the per-client / per-user caps, is rejected immediately instead of queueing behind a burst.
+    """
+
+    def __init__(self, workers: int, queue_limit: int, per_client_limit: int, per_user_limit: int):
+        self.capacity = workers + queue_limit
+        self.limits = {"client": per_client_limit, "user": per_user_limit}
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._in_flight = 0
+        self._holders: Dict[tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def run(self, func, *args: Any, client: Optional[str] = None, user: Optional[str] = None) -> Any:
+        keys = [(kind, value) for kind, value in (("client", client), ("user", user)) if value]
+        with self._lock:
+            if self._in_flight >= self.capacity or any(self._holders.get(key, 0) >= self.limits[key[0]] for key in keys):
+                raise _PasswordWorkRejected()
+            self._in_flight += 1
+            for key in keys:
+                self._holders[key] = self._holders.get(key, 0) + 1
+        try:
+            return self._executor.submit(func, *args).result()
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                for key in keys:
+                    self._holders[key] -= 1
+                    if not self._holders[key]:
+                        del self._holders[key]
+
+
+def _run_password_work(func, *args: Any, user: Optional[str] = None) -> Any:
+    """Run ``_hash_password`` / ``_verify_password`` on the bounded pool, keyed by client address and user."""
+    return _get_password_workers().run(func, *args, client=request.remote_addr, user=user)
+
+
 def _validate_username(username: str) -> bool:
     return bool(USERNAME_PATTERN.match(username))
 
@@ -182,46 +335,143 @@ def _load_schedule(username: str) -> Dict[str, Any]:
     return _get_storage().load_schedule(username)
 
 
-def _save_schedule(username: str, data: Dict[str, Any]) -> None:
-    _get_storage().save_schedule(username, data)
-
-
 def _get_user_from_api_key(api_key: str) -> Optional[str]:
-    users = _load_users()
-    for username, user in users.items():
-        if user.api_key == api_key:
-            return username
-    return None
+    user = _load_user_by_api_key(api_key)
+    return user.username if user else None
 
 
-def _current_username() -> Optional[str]:
-    if "username" in session:
-        return session["username"]
+def _request_api_key() -> Optional[str]:
     api_key = request.headers.get("X-API-Key")
     if not api_key:
         auth = request.headers.get("Authorization", "")
         if auth.lower().startswith("bearer "):
             api_key = auth.split(" ", 1)[1].strip()
-    if api_key:
-        return _get_user_from_api_key(api_key)
-    return None
+    return api_key or None
 
 
-def _is_admin(username: str) -> bool:
-    return username == "admin"
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+class _TokenRevocations:
+    """Process-local copy of the token revocation list.
+
+    Checking a token is a dict lookup; the list is reloaded from storage at most every ``refresh``
+    seconds, which bounds how long a revocation made by another process can go unseen.
+    """
 
+    def __init__(self, storage: DatabaseStorage, refresh: float):
+        self.storage = storage
+        self._cache = LRUCache(1, refresh)
 
-def _parse_iso_datetime(value: str) -> Optional[datetime]:
-    if not value:
+    def _snapshot(self) -> Dict[tuple[str, str], int]:
+        snapshot = self._cache.get("revocations")
+        if snapshot is None:
+            rows = self.storage.load_token_revocations(_now_ms())
+            snapshot = {(username, token_id): revoked_at for username, token_id, revoked_at in rows}
+            self._cache.set("revocations", snapshot)
+        return snapshot
+
+    def is_revoked(self, claims: Dict[str, Any]) -> bool:
+        snapshot = self._snapshot()
+        if (claims["sub"], claims["jti"]) in snapshot:
+            return True
+        return claims["iat"] <= snapshot.get((claims["sub"], "*"), -1)
+
+    def revoke(self, username: str, token_id: str, expires_at: int) -> None:
+        revoked_at = _now_ms()
+        self.storage.revoke_token(username, token_id, revoked_at, expires_at)
+        self._cache.update("revocations", lambda snapshot: {**snapshot, (username, token_id): revoked_at})
+
+    def revoke_user(self, username: str) -> None:
+        """Revoke every token issued to ``username`` so far; none of them outlives one TTL."""
+        self.revoke(username, "*", _now_ms() + TOKEN_TTL_SECONDS * 1000)
+
+
+def _sign_token(body: str) -> str:
+    digest = hmac.new(str(app.secret_key).encode("utf-8"), body.encode("ascii"), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).decode("ascii").rstrip("=")
+
+
+def _issue_token(username: str) -> Dict[str, Any]:
+    issued_at = _now_ms()
+    claims = {"sub": username, "iat": issued_at, "exp": issued_at + TOKEN_TTL_SECONDS * 1000, "jti": secrets.token_hex(8)}
+    payload = base64.urlsafe_b64encode(json.dumps(claims).encode("utf-8")).decode("ascii").rstrip("=")
+    body = f"{TOKEN_PREFIX}.{payload}"
+    return {
+        "access_token": f"{body}.{_sign_token(body)}",
+        "token_type": "Bearer",
+        "expires_in": TOKEN_TTL_SECONDS,
+    }
+
+
+def _verify_token(token: str) -> Optional[Dict[str, Any]]:
+    """Claims of a valid, unexpired and unrevoked token; no user lookup and no password hashing."""
+    # Issued tokens are pure base64url; anything else could not be signed or compared as ASCII.
+    if not token.isascii():
+        return None
+    prefix, _, rest = token.partition(".")
+    payload, _, signature = rest.partition(".")
+    if prefix != TOKEN_PREFIX or not hmac.compare_digest(signature, _sign_token(f"{prefix}.{payload}")):
         return None
     try:
-        return datetime.fromisoformat(value)
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
     except ValueError:
         return None
+    if not isinstance(claims, dict) or not {"sub", "iat", "exp", "jti"} <= set(claims):
+        return None
+    if claims["exp"] <= _now_ms() or _get_token_revocations().is_revoked(claims):
+        return None
+    return claims
+
+
+def _current_principal() -> Optional[Principal]:
+    """Resolve the caller once per request; later calls reuse ``g.principal``."""
+    if "principal" in g:
+        return g.principal
+
+    principal: Optional[Principal] = None
+    if "username" in session:
+        username = session["username"]
+        user = _load_user(username)
+        # A session that outlived its account is treated like a disabled one.
+        principal = Principal(
+            username=username,
+            api_key=user.api_key if user else "",
+            enabled=bool(user and user.enabled),
+            is_admin=_is_admin(username),
+        )
+    else:
+        api_key = _request_api_key()
+        claims = _verify_token(api_key) if api_key and api_key.startswith(f"{TOKEN_PREFIX}.") else None
+        # Signed tokens carry the username; disabling a user revokes their tokens instead of being looked up here.
+        user = _load_user_by_api_key(api_key) if api_key and not claims else None
+        if claims:
+            principal = Principal(
+                username=claims["sub"],
+                api_key="",
+                enabled=True,
+                is_admin=_is_admin(claims["sub"]),
+                token=claims,
+            )
+        elif user:
+            principal = Principal(
+                username=user.username,
+                api_key=user.api_key,
+                enabled=user.enabled,
+                is_admin=_is_admin(user.username),
+            )
+    g.principal = principal
+    return principal
+
+
+def _current_username() -> Optional[str]:
+    principal = _current_principal()
+    return principal.username if principal else None
 
 
-def _event_count_for_user(username: str) -> int:
-    return len(_load_schedule(username).get("items", []))
+def _is_admin(username: str) -> bool:
+    return username == "admin"
 
 
 def _iso_now() -> str:
@@ -235,11 +485,11 @@ def _parse_event_time(value: str) -> datetime:
         raise ValueError("time must be YYYY-MM-DDTHH:MM")
 
 
-def _parse_event_or_date(value: str, is_end: bool = False) -> datetime:
+def _parse_event_or_date(value: str, field_name: str, is_end: bool = False) -> datetime:
     """Parse datetime string that may omit time part (date-only)."""
     if "T" in (value or ""):
         return _parse_event_time(value)
-    date_only = _parse_date(value)
+    date_only = _parse_date(value, field_name)
     if is_end:
         return date_only.replace(hour=23, minute=59)
     return date_only.replace(hour=0, minute=0)
@@ -256,11 +506,11 @@ def _resolve_event_range(start_value: str, end_value: Optional[str]) -> tuple[da
     return start_at, end_at
 
 
-def _parse_date(value: str) -> datetime:
+def _parse_date(value: str, field_name: str) -> datetime:
     try:
         return datetime.strptime(value, "%Y-%m-%d")
     except (TypeError, ValueError):
-        raise ValueError("target_date must be YYYY-MM-DD")
+        raise ValueError(f"{field_name} must be YYYY-MM-DD")
 
 
 def _parse_workday_date(value: str) -> datetime:
@@ -281,10 +531,7 @@ def _check_working_hours(target_datetime: datetime) -> Dict[str, Any]:
         }
 
     minute_of_day = target_datetime.hour * 60 + target_datetime.minute
-    morning_start = 9 * 60
-    morning_end = 12 * 60
-    afternoon_start = 13 * 60 + 30
-    afternoon_end = 18 * 60
+    (_, morning_start, morning_end), (_, afternoon_start, afternoon_end) = WORK_PERIODS
 
     if morning_start <= minute_of_day < morning_end:
         return {
@@ -334,51 +581,255 @@ def _parse_clock_time(value: str, field_name: str) -> tuple[int, int]:
     return parsed.hour, parsed.minute
 
 
-def _find_first_available_slot(items: list[Dict[str, Any]], target_date: datetime, required_minutes: int, window_start: datetime, window_end: datetime) -> Optional[tuple[datetime, datetime]]:
-    query_start = target_date.replace(hour=0, minute=0)
-    query_end = target_date.replace(hour=23, minute=59)
-    occupied: list[tuple[datetime, datetime]] = []
+class _BusyIndex:
+    """Busy intervals from expanded occurrences, kept sorted by start for overlap queries.
 
-    for item in items:
-        start_at, end_at = _resolve_event_range(item["time"], item.get("end_time"))
-        duration = end_at - start_at
-        occurrences = _build_occurrences(item, query_start, query_end)
-        for occurrence in occurrences:
-            occurrence_start = _parse_event_time(occurrence["occurrence_time"])
-            occurrence_end = occurrence_start + duration
-            if occurrence_start < window_end and occurrence_end > window_start:
-                occupied.append((max(occurrence_start, window_start), min(occurrence_end, window_end)))
-
-    occupied.sort(key=lambda entry: entry[0])
-
-    merged: list[tuple[datetime, datetime]] = []
-    for start_at, end_at in occupied:
-        if not merged or start_at > merged[-1][1]:
-            merged.append((start_at, end_at))
-            continue
-        merged[-1] = (merged[-1][0], max(merged[-1][1], end_at))
+    With ``max_duration`` tracked, only intervals starting in ``(start - max_duration, end)`` can
+    overlap a query, so lookups cost O(log n + k).
+    """
+
+    def __init__(self, intervals: Optional[list[tuple[datetime, datetime, Dict[str, Any]]]] = None):
+        self._entries = sorted(intervals or [], key=lambda entry: (entry[0], entry[1]))
+        self._starts = [entry[0] for entry in self._entries]
+        self._max_duration = max((end_at - start_at for start_at, end_at, _ in self._entries), default=timedelta(0))
 
-    cursor = window_start
+    @classmethod
+    def from_items(cls, items: list[Dict[str, Any]], window_start: datetime, window_end: datetime, ignore_id: Optional[int] = None) -> "_BusyIndex":
+        intervals: list[tuple[datetime, datetime, Dict[str, Any]]] = []
+        for item in items:
+            if ignore_id is not None and item.get("id") == ignore_id:
+                continue
+            start_at, end_at = _resolve_event_range(item["time"], item.get("end_time"))
+            duration = end_at - start_at
+            for occurrence_start, _ in _iter_occurrences(item, window_start - duration, window_end):
+                if occurrence_start < window_end and occurrence_start + duration > window_start:
+                    intervals.append((occurrence_start, occurrence_start + duration, item))
+        return cls(intervals)
+
+    def __iter__(self) -> Iterator[tuple[datetime, datetime, Dict[str, Any]]]:
+        return iter(self._entries)
+
+    def add(self, start_at: datetime, end_at: datetime, item: Dict[str, Any]) -> None:
+        position = bisect.bisect_right(self._starts, start_at)
+        self._starts.insert(position, start_at)
+        self._entries.insert(position, (start_at, end_at, item))
+        self._max_duration = max(self._max_duration, end_at - start_at)
+
+    def overlapping(self, start_at: datetime, end_at: Optional[datetime]) -> Iterator[tuple[datetime, datetime, Dict[str, Any]]]:
+        """Intervals overlapping ``[start_at, end_at)``; ``end_at=None`` leaves the range open."""
+        low = bisect.bisect_right(self._starts, start_at - self._max_duration)
+        high = bisect.bisect_left(self._starts, end_at) if end_at is not None else len(self._starts)
+        for position in range(low, high):
+            if self._entries[position][1] > start_at:
+                yield self._entries[position]
+
+    def find_overlap(self, start_at: datetime, end_at: datetime) -> Optional[Dict[str, Any]]:
+        return next((entry[2] for entry in self.overlapping(start_at, end_at)), None)
+
+
+def _minute_bits(start_minute: int, end_minute: int) -> int:
+    """Bitmask with minutes ``[start_minute, end_minute)`` set."""
+    if end_minute <= start_minute:
+        return 0
+    return ((1 << (end_minute - start_minute)) - 1) << start_minute
+
+
+def _day_start(moment: datetime) -> datetime:
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _minutes_between(start_at: datetime, end_at: datetime) -> int:
+    return (end_at - start_at) // timedelta(minutes=1)
+
+
+def _busy_masks(items: list[Dict[str, Any]], first_day: datetime, last_day: datetime) -> Dict[date, int]:
+    """Busy bitmap for every day in ``[first_day, last_day]``; bit ``i`` is minute ``i`` of that day."""
+    range_start = _day_start(first_day)
+    range_end = _day_start(last_day) + timedelta(days=1)
+    masks = {(range_start + timedelta(days=offset)).date(): 0 for offset in range((range_end - range_start).days)}
+    for start_at, end_at, _ in _BusyIndex.from_items(items, range_start, range_end):
+        start_at, end_at = max(start_at, range_start), min(end_at, range_end)
+        day = _day_start(start_at)
+        while day < end_at:
+            next_day = day + timedelta(days=1)
+            masks[day.date()] |= _minute_bits(
+                _minutes_between(day, max(start_at, day)),
+                _minutes_between(day, min(end_at, next_day)),
+            )
+            day = next_day
+    return masks
+
+
+def _mask_runs(mask: int) -> Iterator[tuple[int, int]]:
+    """``(start_minute, end_minute)`` for each run of set bits, lowest first."""
+    while mask:
+        start = (mask & -mask).bit_length() - 1
+        shifted = mask >> start
+        length = (shifted ^ (shifted + 1)).bit_length() - 1
+        yield start, start + length
+        mask &= ~_minute_bits(start, start + length)
+
+
+def _free_run_starts(free: int, length: int) -> int:
+    """Bits ``i`` of ``free`` such that minutes ``i .. i + length - 1`` are all set."""
+    runs = free
+    covered = 1
+    while covered < length and runs:
+        step = min(covered, length - covered)
+        runs &= runs >> step
+        covered += step
+    return runs
+
+
+def _scan_free_slots(masks: Dict[date, int], windows: list[tuple[datetime, datetime]], required_minutes: int, max_results: int) -> list[tuple[datetime, datetime]]:
+    """Earliest slot of each free gap inside the sorted, disjoint ``windows``, up to ``max_results``."""
     required_delta = timedelta(minutes=required_minutes)
-    for start_at, end_at in merged:
-        if cursor + required_delta <= start_at:
-            return cursor, cursor + required_delta
-        if end_at > cursor:
-            cursor = end_at
-
-    if cursor + required_delta <= window_end:
-        return cursor, cursor + required_delta
-    return None
+    slots: list[tuple[datetime, datetime]] = []
+    for window_start, window_end in windows:
+        origin = _day_start(window_start)
+        busy = 0
+        for offset in range((window_end - origin).days + 1):
+            busy |= masks.get((origin + timedelta(days=offset)).date(), 0) << (MINUTES_PER_DAY * offset)
+        free = _minute_bits(_minutes_between(origin, window_start), _minutes_between(origin, window_end)) & ~busy
+        # A fitting run that begins where the previous minute is busy is the start of a free gap.
+        starts = _free_run_starts(free, required_minutes) & ~(free << 1)
+        while starts:
+            lowest = starts & -starts
+            slot_start = origin + timedelta(minutes=lowest.bit_length() - 1)
+            slots.append((slot_start, slot_start + required_delta))
+            if len(slots) >= max_results:
+                return slots
+            starts ^= lowest
+    return slots
+
+
+def _search_windows(start_date: datetime, end_date: datetime, day_start: tuple[int, int], day_end: tuple[int, int], working_hours_only: bool) -> list[tuple[datetime, datetime]]:
+    """Per-day search windows between two dates, optionally clipped to ``WORK_PERIODS`` on workdays."""
+    windows: list[tuple[datetime, datetime]] = []
+    day = start_date
+    while day <= end_date:
+        window_start = day.replace(hour=day_start[0], minute=day_start[1])
+        window_end = day.replace(hour=day_end[0], minute=day_end[1])
+        if not working_hours_only:
+            windows.append((window_start, window_end))
+        elif _check_working_hours(day)["is_workday"]:
+            for _, period_start, period_end in WORK_PERIODS:
+                clipped_start = max(window_start, day + timedelta(minutes=period_start))
+                clipped_end = min(window_end, day + timedelta(minutes=period_end))
+                if clipped_start < clipped_end:
+                    windows.append((clipped_start, clipped_end))
+        day += timedelta(days=1)
+    return windows
+
+
+def _parse_slot_search(payload: Dict[str, Any], start_field: str) -> tuple[list[tuple[datetime, datetime]], int]:
+    """Search windows and required minutes from a slot search payload."""
+    start_date = _parse_date(payload.get(start_field), start_field)
+    end_date = _parse_date(payload["end_date"], "end_date") if payload.get("end_date") else start_date
+    if end_date < start_date:
+        raise ValueError(f"end_date must not be earlier than {start_field}")
+    if (end_date - start_date).days >= MAX_SLOT_SEARCH_DAYS:
+        raise ValueError(f"date range must not exceed {MAX_SLOT_SEARCH_DAYS} days")
+
+    duration_hours = float(payload.get("duration_hours"))
+    if duration_hours <= 0:
+        raise ValueError("duration_hours must be greater than 0")
+    required_minutes = int(duration_hours * 60)
+    if required_minutes <= 0:
+        raise ValueError("duration_hours must be at least 1 minute")
+
+    preferred_start_raw = payload.get("preferred_start_time") or "00:00"
+    preferred_end_raw = payload.get("preferred_end_time") or "23:59"
+    day_start = _parse_clock_time(preferred_start_raw, "preferred_start_time")
+    day_end = _parse_clock_time(preferred_end_raw, "preferred_end_time")
+    if day_end <= day_start:
+        raise ValueError("preferred_end_time must be later than preferred_start_time")
+
+    working_hours_only = bool(payload.get("working_hours_only"))
+    return _search_windows(start_date, end_date, day_start, day_end, working_hours_only), required_minutes
 
 
 def _find_conflict(items: list[Dict[str, Any]], start_at: datetime, end_at: datetime, ignore_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
-    for entry in items:
-        if ignore_id is not None and entry.get("id") == ignore_id:
-            continue
-        existing_start, existing_end = _resolve_event_range(entry["time"], entry.get("end_time"))
-        if start_at < existing_end and end_at > existing_start:
-            return entry
-    return None
+    return _BusyIndex.from_items(items, start_at, end_at, ignore_id=ignore_id).find_overlap(start_at, end_at)
+
+
+class _FreeBusyIndex:
+    """Per-user, per-day busy bitmaps cached between requests.
+
+    Writes made through this process patch or drop the affected days; writes from other
+    processes show up once entries expire, so bookings still confirm against storage.
+    Every local write also bumps the user's generation, and a rebuilt bitmap is only
+    stored if the generation did not move while it was being read.
+    """
+
+    def __init__(self, storage: DatabaseStorage):
+        self.storage = storage
+        self._cache = LRUCache(storage.config.freebusy_cache_size, storage.config.freebusy_cache_ttl)
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _generation(self, username: str) -> int:
+        with self._lock:
+            return self._generations.get(username, 0)
+
+    def _bump(self, username: str) -> None:
+        with self._lock:
+            self._generations[username] = self._generations.get(username, 0) + 1
+
+    def masks(self, username: str, first_day: datetime, last_day: datetime) -> Dict[date, int]:
+        return self.masks_for([username], first_day, last_day)[username]
+
+    def masks_for(self, usernames: list[str], first_day: datetime, last_day: datetime) -> Dict[str, Dict[date, int]]:
+        """Bitmaps per user and day; every missing day of every user is rebuilt from one range query."""
+        days = [_day_start(first_day) + timedelta(days=offset) for offset in range((_day_start(last_day) - _day_start(first_day)).days + 1)]
+        masks: Dict[str, Dict[date, int]] = {username: {} for username in usernames}
+        missing: Dict[str, list[datetime]] = {}
+        for username in usernames:
+            for day in days:
+                mask = self._cache.get((username, day.date()))
+                if mask is None:
+                    missing.setdefault(username, []).append(day)
+                else:
+                    masks[username][day.date()] = mask
+        if missing:
+            generations = {username: self._generation(username) for username in missing}
+            range_start = min(user_days[0] for user_days in missing.values())
+            range_end = max(user_days[-1] for user_days in missing.values())
+            schedules = self.storage.load_schedules_range(
+                list(missing), _format_event_time(range_start), _format_event_time(range_end + timedelta(days=1))
+            )
+            for username, user_days in missing.items():
+                fresh = _busy_masks(schedules[username], user_days[0], user_days[-1])
+                for day in user_days:
+                    masks[username][day.date()] = fresh[day.date()]
+                with self._lock:
+                    # A write landed during the read; its result may predate it, so serve it uncached.
+                    if self._generations.get(username, 0) != generations[username]:
+                        continue
+                    for day in user_days:
+                        self._cache.set((username, day.date()), fresh[day.date()])
+        return masks
+
+    def record(self, username: str, item: Dict[str, Any]) -> None:
+        """Fold a newly stored item into the cached days it touches."""
+        self._bump(username)
+        if _series_frequency(item) != "none":
+            self.invalidate(username, item)
+            return
+        start_at, end_at = _resolve_event_range(item["time"], item.get("end_time"))
+        for day, mask in _busy_masks([item], start_at, end_at).items():
+            self._cache.update((username, day), lambda cached, mask=mask: cached | mask)
+
+    def invalidate(self, username: str, item: Optional[Dict[str, Any]] = None) -> None:
+        """Drop cached days ``item`` may cover, or every cached day of the user."""
+        self._bump(username)
+        if item is None:
+            self._cache.discard_where(lambda key, _: key[0] == username)
+            return
+        start_at, last_end = _series_span(item)
+        first_day = start_at.date()
+        last_day = last_end.date() if last_end is not None else date.max
+        self._cache.discard_where(lambda key, _: key[0] == username and first_day <= key[1] <= last_day)
 
 
 def _parse_end_date(value: str) -> datetime:
@@ -414,6 +865,8 @@ def _normalize_recurrence(payload: Dict[str, Any]) -> Dict[str, Any]:
             raise ValueError("recurrence.count must be an integer")
         if count_value < 1:
             raise ValueError("recurrence.count must be greater than 0")
+        if count_value > MAX_RECURRENCE_COUNT:
+            raise ValueError(f"recurrence.count must not exceed {MAX_RECURRENCE_COUNT}")
 
     return {
         "frequency": frequency,
@@ -423,76 +876,337 @@ def _normalize_recurrence(payload: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def _advance_occurrence(current: datetime, frequency: str) -> datetime:
-    if frequency == "daily":
-        return current + timedelta(days=1)
-    if frequency == "weekly":
-        return current + timedelta(weeks=1)
+def _nth_occurrence(base_time: datetime, frequency: str, index: int) -> Optional[datetime]:
+    """Start of the ``index``-th (0-based) occurrence, computed directly from the series start.
+
+    ``None`` when that occurrence would fall after ``datetime.max``.
+    """
+    try:
+        if frequency == "daily":
+            return base_time + timedelta(days=index)
+        if frequency == "weekly":
+            return base_time + timedelta(weeks=index)
+        if frequency == "monthly":
+            months = base_time.month - 1 + index
+            year = base_time.year + months // 12
+            month = months % 12 + 1
+            if year > datetime.max.year:
+                return None
+            day = min(base_time.day, calendar.monthrange(year, month)[1])
+            return base_time.replace(year=year, month=month, day=day)
+        if frequency == "yearly":
+            year = base_time.year + index
+            if year > datetime.max.year:
+                return None
+            day = min(base_time.day, calendar.monthrange(year, base_time.month)[1])
+            return base_time.replace(year=year, day=day)
+    except OverflowError:
+        return None
+    return base_time
+
+
+def _first_index_at_or_after(base_time: datetime, frequency: str, moment: datetime) -> int:
+    """Index of the first occurrence starting at or after ``moment``, without stepping through earlier ones."""
+    if moment <= base_time:
+        return 0
+    if frequency in {"daily", "weekly"}:
+        period = timedelta(days=1 if frequency == "daily" else 7)
+        quotient, remainder = divmod(moment - base_time, period)
+        return quotient + (1 if remainder else 0)
     if frequency == "monthly":
-        year = current.year + (current.month // 12)
-        month = (current.month % 12) + 1
-        day = min(current.day, calendar.monthrange(year, month)[1])
-        return current.replace(year=year, month=month, day=day)
-    if frequency == "yearly":
-        year = current.year + 1
-        day = min(current.day, calendar.monthrange(year, current.month)[1])
-        return current.replace(year=year, day=day)
-    return current
-
-
-def _build_occurrences(item: Dict[str, Any], query_start: Optional[datetime], query_end: Optional[datetime]) -> list[Dict[str, Any]]:
+        index = (moment.year - base_time.year) * 12 + (moment.month - base_time.month)
+    else:
+        index = moment.year - base_time.year
+    # The candidate lands in moment's month/year; at most one more step is needed.
+    candidate = _nth_occurrence(base_time, frequency, index)
+    return index if candidate is not None and candidate >= moment else index + 1
+
+
+def _iter_occurrences(
+    item: Dict[str, Any],
+    query_start: Optional[datetime],
+    query_end: Optional[datetime],
+    horizon_from: Optional[datetime] = None,
+) -> Iterator[tuple[datetime, Dict[str, Any]]]:
+    """Lazily yield ``(occurrence_start, item)`` in chronological order.
+
+    Without ``query_end`` a never-ending series stops a year after ``horizon_from``
+    (default ``query_start``) or after its own start, whichever is later.
+    """
     base_time = _parse_event_time(item["time"])
     recurrence = item.get("recurrence") or {"frequency": "none"}
     frequency = recurrence.get("frequency", "none")
     if frequency == "none":
         if query_start and base_time < query_start:
-            return []
+            return
         if query_end and base_time > query_end:
-            return []
-        return [{**item, "occurrence_time": item["time"], "source_id": item["id"]}]
+            return
+        yield base_time, item
+        return
 
     end_type = recurrence.get("end_type", "never")
     until_dt = _parse_end_date(recurrence.get("until")) if recurrence.get("until") else None
-    max_count = recurrence.get("count") if recurrence.get("count") else MAX_OCCURRENCES
-    max_count = min(int(max_count), MAX_OCCURRENCES)
+    total = int(recurrence["count"]) if end_type == "count" and recurrence.get("count") else None
 
+    # A count whose last occurrence lies past datetime.max ends the series no sooner than "never".
+    last_start = _nth_occurrence(base_time, frequency, total - 1) if total is not None else None
     if end_type == "until" and until_dt:
         absolute_end = until_dt
+    elif last_start is not None:
+        absolute_end = last_start
     elif query_end:
         absolute_end = query_end
     else:
-        absolute_end = base_time + timedelta(days=366)
+        horizon_start = max(base_time, horizon_from or query_start or base_time)
+        absolute_end = horizon_start + min(timedelta(days=366), datetime.max - horizon_start)
+    if query_end:
+        absolute_end = min(absolute_end, query_end)
 
     if query_start and base_time > absolute_end:
-        return []
+        return
+
+    # Jump straight to the first occurrence in range so cost tracks what is returned, not the series' age.
+    index = _first_index_at_or_after(base_time, frequency, query_start) if query_start else 0
+    while total is None or index < total:
+        cursor = _nth_occurrence(base_time, frequency, index)
+        if cursor is None or cursor > absolute_end:
+            return
+        yield cursor, item
+        index += 1
+
+
+def _occurrence_payload(occurrence_start: datetime, item: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        **item,
+        "occurrence_time": occurrence_start.strftime("%Y-%m-%dT%H:%M"),
+        "source_id": item["id"],
+    }
+
+
+def _occurrence_sort_key(entry: tuple[datetime, Dict[str, Any]]) -> tuple[datetime, int]:
+    return entry[0], entry[1]["id"]
+
+
+def _series_frequency(item: Dict[str, Any]) -> str:
+    return (item.get("recurrence") or {}).get("frequency") or "none"
+
+
+def _series_last_start(item: Dict[str, Any], base_time: datetime) -> Optional[datetime]:
+    """Latest moment an occurrence of ``item`` may start; ``None`` when the series never ends."""
+    recurrence = item.get("recurrence") or {"frequency": "none"}
+    frequency = recurrence.get("frequency", "none")
+    if frequency == "none":
+        return base_time
+    if recurrence.get("end_type") == "until" and recurrence.get("until"):
+        return _parse_end_date(recurrence["until"])
+    if recurrence.get("end_type") == "count" and recurrence.get("count"):
+        return _nth_occurrence(base_time, frequency, int(recurrence["count"]) - 1)
+    return None
+
+
+def _shift_or_none(moment: Optional[datetime], delta: timedelta) -> Optional[datetime]:
+    """``moment + delta``, or ``None`` when either is unbounded or the sum passes ``datetime.max``."""
+    if moment is None or delta > datetime.max - moment:
+        return None
+    return moment + delta
+
+
+def _series_span(item: Dict[str, Any]) -> tuple[datetime, Optional[datetime]]:
+    """Start of the first occurrence and end of the last.
+
+    The end is ``None`` for never-ending series and for series whose end lies past ``datetime.max``.
+    """
+    start_at, end_at = _resolve_event_range(item["time"], item.get("end_time"))
+    return start_at, _shift_or_none(_series_last_start(item, start_at), end_at - start_at)
+
+
+def _series_occurrence_overlapping(item: Dict[str, Any], start_at: datetime, end_at: datetime) -> Optional[datetime]:
+    """Start of the first occurrence of ``item`` overlapping ``[start_at, end_at)``, located without expansion."""
+    base_time, base_end = _resolve_event_range(item["time"], item.get("end_time"))
+    duration = base_end - base_time
+    frequency = _series_frequency(item)
+    if frequency == "none":
+        return base_time if base_time < end_at and base_end > start_at else None
+
+    recurrence = item.get("recurrence") or {}
+    total = int(recurrence["count"]) if recurrence.get("end_type") == "count" and recurrence.get("count") else None
+    last_start = _series_last_start(item, base_time)
+
+    index = _first_index_at_or_after(base_time, frequency, start_at - duration)
+    occurrence_start = _nth_occurrence(base_time, frequency, index)
+    if occurrence_start is not None and occurrence_start <= start_at - duration:
+        index += 1
+        occurrence_start = _nth_occurrence(base_time, frequency, index)
+    if occurrence_start is None or (total is not None and index >= total):
+        return None
+    if last_start is not None and occurrence_start > last_start:
+        return None
+    return occurrence_start if occurrence_start < end_at else None
+
+
+def _first_series_overlap(candidate: Dict[str, Any], existing: Dict[str, Any], horizon_days: int = CONFLICT_HORIZON_DAYS) -> Optional[datetime]:
+    """First occurrence of ``candidate`` that overlaps any occurrence of ``existing``.
+
+    Only the sparser series is expanded; each of its occurrences is tested against the other
+    series by index arithmetic. Two daily/weekly series repeat every ``lcm`` of their periods, so
+    one cycle decides them for good; anything involving monthly/yearly is checked up to
+    ``horizon_days`` past the point where both series are active.
+    """
+    candidate_start, candidate_end = _resolve_event_range(candidate["time"], candidate.get("end_time"))
+    existing_start, existing_end = _resolve_event_range(existing["time"], existing.get("end_time"))
+    candidate_frequency = _series_frequency(candidate)
+    existing_frequency = _series_frequency(existing)
+    candidate_duration = candidate_end - candidate_start
+    existing_duration = existing_end - existing_start
+    max_duration = max(candidate_duration, existing_duration)
+
+    span_start = max(candidate_start, existing_start)
+    last_ends = [
+        last_end
+        for last_end in (_series_span(candidate)[1], _series_span(existing)[1])
+        if last_end is not None
+    ]
+    if candidate_frequency in SERIES_PERIOD_DAYS and existing_frequency in SERIES_PERIOD_DAYS:
+        cycle = timedelta(days=math.lcm(SERIES_PERIOD_DAYS[candidate_frequency], SERIES_PERIOD_DAYS[existing_frequency]))
+        window_end = _shift_or_none(span_start, cycle + 2 * max_duration)
+    else:
+        window_end = _shift_or_none(span_start, timedelta(days=horizon_days))
+    window_end = min([window_end or datetime.max, *last_ends])
+    window_start = span_start - max_duration
+    if window_end <= window_start:
+        return None
+
+    expand_candidate = SERIES_SPARSITY[candidate_frequency] >= SERIES_SPARSITY[existing_frequency]
+    sparse, dense = (candidate, existing) if expand_candidate else (existing, candidate)
+    sparse_duration = candidate_duration if expand_candidate else existing_duration
+    for occurrence_start, _ in _iter_occurrences(sparse, window_start, window_end):
+        hit = _series_occurrence_overlapping(dense, occurrence_start, occurrence_start + sparse_duration)
+        if hit is not None:
+            return occurrence_start if expand_candidate else hit
+    return None
+
+
+def _series_conflicts(candidate: Dict[str, Any], items: list[Dict[str, Any]], ignore_id: Optional[int] = None) -> list[tuple[datetime, Dict[str, Any]]]:
+    """``(candidate occurrence, item)`` for every item the candidate series collides with, earliest first."""
+    conflicts: list[tuple[datetime, Dict[str, Any]]] = []
+    for item in items:
+        if ignore_id is not None and item.get("id") == ignore_id:
+            continue
+        occurrence_start = _first_series_overlap(candidate, item)
+        if occurrence_start is not None:
+            conflicts.append((occurrence_start, item))
+    conflicts.sort(key=_occurrence_sort_key)
+    return conflicts
+
 
-    events: list[Dict[str, Any]] = []
-    cursor = base_time
-    emitted = 0
-    while emitted < max_count and cursor <= absolute_end:
-        if (not query_start or cursor >= query_start) and (not query_end or cursor <= query_end):
-            events.append({
-                **item,
-                "occurrence_time": cursor.strftime("%Y-%m-%dT%H:%M"),
-                "source_id": item["id"],
-            })
-        emitted += 1
-        cursor = _advance_occurrence(cursor, frequency)
+def _find_series_conflict(candidate: Dict[str, Any], items: list[Dict[str, Any]], ignore_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    if _series_frequency(candidate) == "none":
+        start_at, end_at = _resolve_event_range(candidate["time"], candidate.get("end_time"))
+        return _find_conflict(items, start_at, end_at, ignore_id=ignore_id)
+    conflicts = _series_conflicts(candidate, items, ignore_id=ignore_id)
+    return conflicts[0][1] if conflicts else None
 
-    return events
+
+class _BatchConflictIndex:
+    """Conflict checks for a batch of new events against stored items and the rows accepted so far.
+
+    One-off events sit in an interval index; series are probed arithmetically, so nothing is
+    expanded beyond what a single overlap test needs.
+    """
+
+    def __init__(self, items: list[Dict[str, Any]]):
+        self._once = _BusyIndex()
+        self._series: list[Dict[str, Any]] = []
+        for item in items:
+            self.add(item)
+
+    def add(self, item: Dict[str, Any]) -> None:
+        if _series_frequency(item) == "none":
+            start_at, end_at = _resolve_event_range(item["time"], item.get("end_time"))
+            self._once.add(start_at, end_at, item)
+        else:
+            self._series.append(item)
+
+    def find(self, candidate: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        start_at, end_at = _resolve_event_range(candidate["time"], candidate.get("end_time"))
+        if _series_frequency(candidate) == "none":
+            conflict = self._once.find_overlap(start_at, end_at)
+            if conflict:
+                return conflict
+            return next((item for item in self._series if _series_occurrence_overlapping(item, start_at, end_at)), None)
+
+        for once_start, once_end, item in self._once.overlapping(start_at, _series_span(candidate)[1]):
+            if _series_occurrence_overlapping(candidate, once_start, once_end):
+                return item
+        return next((item for item in self._series if _first_series_overlap(candidate, item)), None)
+
+
+def _encode_cursor(*parts: Any) -> str:
+    return base64.urlsafe_b64encode(json.dumps(parts).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(raw: str) -> list[Any]:
+    try:
+        parts = json.loads(base64.urlsafe_b64decode(raw + "=" * (-len(raw) % 4)))
+    except ValueError:
+        raise ValueError("after cursor is invalid")
+    if not isinstance(parts, list):
+        raise ValueError("after cursor is invalid")
+    return parts
+
+
+def _parse_occurrence_cursor(raw: str) -> tuple[datetime, int, Optional[datetime]]:
+    """Last occurrence of the previous page and the ``start`` of the first page, if it had one."""
+    try:
+        occurrence_time, source_id, window_start = _decode_cursor(raw)
+        return (
+            _parse_event_time(occurrence_time),
+            int(source_id),
+            _parse_event_time(window_start) if window_start is not None else None,
+        )
+    except (TypeError, ValueError):
+        raise ValueError("after cursor is invalid")
+
+
+def _parse_item_cursor(raw: str) -> tuple[str, int]:
+    try:
+        time_value, item_id = _decode_cursor(raw)
+        return _format_event_time(_parse_event_time(time_value)), int(item_id)
+    except (TypeError, ValueError):
+        raise ValueError("after cursor is invalid")
+
+
+def _parse_user_cursor(raw: str, sort: str) -> tuple[Any, str]:
+    try:
+        sort_value, username = _decode_cursor(raw)
+        if not isinstance(username, str) or not isinstance(sort_value, int if sort == "event_count" else str):
+            raise ValueError
+        return sort_value, username
+    except (TypeError, ValueError):
+        raise ValueError("after cursor is invalid")
+
+
+def _parse_page_limit(value: Optional[str]) -> Optional[int]:
+    if value is None or value == "":
+        return None
+    try:
+        limit = int(value)
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    return limit
 
 
 def require_auth(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
-        username = _current_username()
-        if not username:
+        principal = _current_principal()
+        if not principal:
             abort(401, description="Authentication required")
-        users = _load_users()
-        user = users.get(username)
-        if not user or not user.enabled:
+        if not principal.enabled:
             abort(403, description="Account is disabled")
-        return func(username, *args, **kwargs)
+        return func(principal.username, *args, **kwargs)
 
     return wrapper
 
@@ -500,20 +1214,24 @@ def require_auth(func):
 def require_admin(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
-        username = _current_username()
-        if not username:
+        principal = _current_principal()
+        if not principal:
             abort(401, description="Authentication required")
-        users = _load_users()
-        user = users.get(username)
-        if not user or not user.enabled:
+        if not principal.enabled:
             abort(403, description="Account is disabled")
-        if not _is_admin(username):
+        if not principal.is_admin:
             abort(403, description="Admin access required")
-        return func(username, *args, **kwargs)
+        return func(principal.username, *args, **kwargs)
 
     return wrapper
 
 
+@app.before_request
+def reset_principal():
+    # g outlives a single request when an app context is already active, so never reuse a stale principal.
+    g.pop("principal", None)
+
+
 @app.errorhandler(StorageConfigError)
 def handle_storage_config_error(error: StorageConfigError):
     _log_database_exception(error)
@@ -522,6 +1240,13 @@ def handle_storage_config_error(error: StorageConfigError):
     return "Database service is not configured", 503
 
 
+@app.errorhandler(_PasswordWorkRejected)
+def handle_password_work_rejected(_error: _PasswordWorkRejected):
+    response = jsonify({"message": "Too many password requests, please retry shortly", "error": "rate_limited"})
+    response.headers["Retry-After"] = str(PASSWORD_RETRY_AFTER_SECONDS)
+    return response, 429
+
+
 @app.errorhandler(Exception)
 def handle_unexpected_exception(error: Exception):
     if isinstance(error, HTTPException):
@@ -545,9 +1270,8 @@ def login():
     payload = request.get_json(silent=True) or request.form
     username = (payload.get("username") or "").strip()
     password = payload.get("password") or ""
-    users = _load_users()
-    user = users.get(username)
-    if not user or not _verify_password(user, password):
+    user = _load_user(username)
+    if not user or not _run_password_work(_verify_password, user, password, user=username):
         return jsonify({"message": "Invalid username or password"}), 401
     if not user.enabled:
         return jsonify({"message": "Account is disabled"}), 403
@@ -582,14 +1306,12 @@ def register():
     if not _validate_password(password):
         return jsonify({"message": "Password must be at least 8 chars and include letters and numbers"}), 400
 
-    users = _load_users()
-
-    if username in users:
+    if _load_user(username):
         return jsonify({"message": "Username already exists"}), 400
 
-    salt, password_hash = _hash_password(password)
+    salt, password_hash = _run_password_work(_hash_password, password, user=username)
     api_key = _generate_api_key()
-    users[username] = User(
+    user = User(
         username=username,
         api_key=api_key,
         password_salt=salt,
@@ -598,12 +1320,52 @@ def register():
         enabled=True,
         created_at=_iso_now(),
     )
-    _save_users(users)
-    _save_schedule(username, {"next_id": 1, "items": []})
+    try:
+        _get_storage().insert_user(username, _serialize_user(user))
+    except UserExistsError:
+        return jsonify({"message": "Username already exists"}), 400
+    _get_storage().invalidate_user(username)
 
     return jsonify({"message": "Registration successful", "username": username, "api_key": api_key}), 201
 
 
+@app.route("/api/token", methods=["POST"])
+def issue_token():
+    payload = request.get_json(silent=True) or {}
+    username = (payload.get("username") or "").strip()
+    password = payload.get("password") or ""
+    user = _load_user(username)
+    if not user or not _run_password_work(_verify_password, user, password, user=username):
+        return jsonify({"message": "Invalid username or password"}), 401
+    if not user.enabled:
+        return jsonify({"message": "Account is disabled"}), 403
+    return jsonify(_issue_token(username))
+
+
+@app.route("/api/token/refresh", methods=["POST"])
+@require_auth
+def refresh_token(username: str):
+    claims = g.principal.token
+    if not claims:
+        return jsonify({"message": "A bearer token is required"}), 400
+    _get_token_revocations().revoke(username, claims["jti"], claims["exp"])
+    return jsonify(_issue_token(username))
+
+
+@app.route("/api/token/revoke", methods=["POST"])
+@require_auth
+def revoke_token(username: str):
+    payload = request.get_json(silent=True) or {}
+    claims = g.principal.token
+    if payload.get("all"):
+        _get_token_revocations().revoke_user(username)
+    elif claims:
+        _get_token_revocations().revoke(username, claims["jti"], claims["exp"])
+    else:
+        return jsonify({"message": "A bearer token is required"}), 400
+    return jsonify({"message": "Token revoked"})
+
+
 @app.route("/logout", methods=["POST"])
 def logout():
     session.pop("username", None)
@@ -624,53 +1386,123 @@ def admin_page():
     return render_template("admin.html")
 
 
+def _format_event_time(value: Optional[datetime]) -> Optional[str]:
+    return value.strftime("%Y-%m-%dT%H:%M") if value else None
+
+
+def _list_raw_events(username: str):
+    """Stored items; with ``limit`` or ``after`` they are paged by ``(time, id)`` instead of returned whole."""
+    try:
+        limit = _parse_page_limit(request.args.get("limit"))
+        after = _parse_item_cursor(request.args["after"]) if request.args.get("after") else None
+    except ValueError as exc:
+        return jsonify({"message": str(exc)}), 400
+    if not limit and not after:
+        return jsonify({"items": _load_schedule(username)["items"]})
+
+    page = _get_storage().load_events_page(username, limit + 1 if limit else None, after)
+    response: Dict[str, Any] = {}
+    if limit:
+        has_more = len(page) > limit
+        page = page[:limit]
+        response["next_cursor"] = _encode_cursor(page[-1]["time"], page[-1]["id"]) if has_more else None
+    return jsonify({"items": page, **response})
+
+
 def _list_events(username: str):
-    data = _load_schedule(username)
     if request.args.get("expand") != "1":
-        return jsonify({"items": data["items"]})
+        return _list_raw_events(username)
 
     start_raw = request.args.get("start")
     end_raw = request.args.get("end")
-    query_start = _parse_event_or_date(start_raw) if start_raw else None
-    query_end = _parse_event_or_date(end_raw, is_end=True) if end_raw else None
-    occurrences: list[Dict[str, Any]] = []
-    for item in data["items"]:
-        occurrences.extend(_build_occurrences(item, query_start, query_end))
-    occurrences.sort(key=lambda item: item["occurrence_time"])
-    return jsonify({"items": occurrences})
+    query_start = _parse_event_or_date(start_raw, "start") if start_raw else None
+    query_end = _parse_event_or_date(end_raw, "end", is_end=True) if end_raw else None
+    try:
+        limit = _parse_page_limit(request.args.get("limit"))
+        cursor = _parse_occurrence_cursor(request.args["after"]) if request.args.get("after") else None
+    except ValueError as exc:
+        return jsonify({"message": str(exc)}), 400
+    # Open-ended series are cut off a year after the first page's start, so later pages
+    # keep that horizon instead of moving it forward with the cursor and never ending.
+    window_start = query_start
+    after = None
+    if cursor:
+        after, window_start = cursor[:2], cursor[2]
+        query_start = max(query_start, after[0]) if query_start else after[0]
+
+    items = _get_storage().load_schedule_range(username, _format_event_time(query_start), _format_event_time(query_end))
+    # Each series yields in order, so a k-way merge streams the global order without a full sort.
+    merged: Iterator[tuple[datetime, Dict[str, Any]]] = heapq.merge(
+        *(_iter_occurrences(item, query_start, query_end, window_start or datetime.min) for item in items),
+        key=_occurrence_sort_key,
+    )
+    if after:
+        merged = (entry for entry in merged if _occurrence_sort_key(entry) > after)
+    # Paged or not, one bound applies to the whole response rather than to each series.
+    limit = limit or MAX_OCCURRENCES
+    page = list(itertools.islice(merged, limit + 1))
+    has_more = len(page) > limit
+    page = page[:limit]
+    last_start, last_item = page[-1] if page else (None, None)
+    next_cursor = (
+        _encode_cursor(last_start.strftime("%Y-%m-%dT%H:%M"), last_item["id"], _format_event_time(window_start))
+        if has_more
+        else None
+    )
+    return jsonify({"items": [_occurrence_payload(start, item) for start, item in page], "next_cursor": next_cursor})
 
 
-def _create_event(username: str):
-    data = _load_schedule(username)
-    payload = request.get_json(force=True)
+def _load_window_items(username: str, start_at: datetime, end_at: datetime) -> list[Dict[str, Any]]:
+    """Items whose stored series bounds may overlap ``[start_at, end_at]``."""
+    return _get_storage().load_schedule_range(username, _format_event_time(start_at), _format_event_time(end_at))
+
+
+def _load_series_items(username: str, candidate: Dict[str, Any]) -> list[Dict[str, Any]]:
+    """Items whose stored series bounds may overlap any occurrence of ``candidate``."""
+    start_at, last_end = _series_span(candidate)
+    return _get_storage().load_schedule_range(username, _format_event_time(start_at), _format_event_time(last_end))
+
+
+def _event_item_from_payload(payload: Any) -> Dict[str, Any]:
+    """Validated fields for a new event; raises ValueError with the client-facing message."""
+    if not isinstance(payload, dict):
+        raise ValueError("event must be a JSON object")
 
     required = ["title", "time", "location"]
     if not all(payload.get(field) for field in required):
-        return jsonify({"message": "title, time and location are required"}), 400
+        raise ValueError("title, time and location are required")
 
     if "description" not in payload:
-        return jsonify({"message": "description field is required"}), 400
-
-    try:
-        start_at, end_at = _resolve_event_range(payload["time"], payload.get("end_time"))
-        recurrence = _normalize_recurrence(payload)
-    except ValueError as exc:
-        return jsonify({"message": str(exc)}), 400
-
-    conflict = _find_conflict(data["items"], start_at, end_at)
-    if conflict:
-        return jsonify({"message": f"Time conflict with event #{conflict['id']}: {conflict['title']}"}), 409
+        raise ValueError("description field is required")
 
-    item_payload = {
+    _, end_at = _resolve_event_range(payload["time"], payload.get("end_time"))
+    return {
         "title": payload["title"],
         "time": payload["time"],
         "end_time": end_at.strftime("%Y-%m-%dT%H:%M"),
         "location": payload["location"],
         "description": payload["description"],
-        "recurrence": recurrence,
+        "recurrence": _normalize_recurrence(payload),
         "created_at": _iso_now(),
     }
-    item = _get_storage().create_event(username, item_payload)
+
+
+def _create_event(username: str):
+    payload = request.get_json(force=True)
+    try:
+        item_payload = _event_item_from_payload(payload)
+    except ValueError as exc:
+        return jsonify({"message": str(exc)}), 400
+
+    start_at = _parse_event_time(item_payload["time"])
+    storage = _get_storage()
+    # The conflict check and the insert share one locked transaction, so concurrent creates cannot both pass.
+    with storage.schedule_transaction(username):
+        conflict = _find_series_conflict(item_payload, _load_series_items(username, item_payload))
+        if conflict:
+            return jsonify({"message": f"Time conflict with event #{conflict['id']}: {conflict['title']}"}), 409
+        item = storage.create_event(username, item_payload)
+    _get_freebusy().record(username, item)
 
     day_info = _check_working_hours(start_at)
     if day_info["day_type"] == "workday_lunch":
@@ -722,46 +1554,448 @@ def workday_check(username: str):
     return jsonify({"datetime": response_value, **day_info})
 
 
+def _ics_escape(value: str) -> str:
+    return (
+        value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\r\n", "\\n").replace("\n", "\\n")
+    )
+
+
+def _ics_unescape(value: str) -> str:
+    return re.sub(r"\\([\;,nN])", lambda match: "\n" if match.group(1) in "nN" else match.group(1), value)
+
+
+def _ics_fold(line: str) -> str:
+    """Content line folded at 75 octets (RFC 5545 section 3.1) without splitting UTF-8 sequences."""
+    encoded = line.encode("utf-8")
+    parts: list[str] = []
+    limit = 75
+    while len(encoded) > limit:
+        cut = limit
+        while encoded[cut] & 0xC0 == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode("utf-8"))
+        encoded = encoded[cut:]
+        limit = 74
+    parts.append(encoded.decode("utf-8"))
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _ics_datetime(value: datetime) -> str:
+    return value.strftime("%Y%m%dT%H%M%S")
+
+
+def _ics_clamped_monthdays(frequency: str, start_at: datetime) -> Optional[str]:
+    """``BYMONTHDAY`` list for series the app clamps to the end of shorter months, else ``None``.
+
+    RFC 5545 skips months that lack the start day (Jan 31 monthly has no February instance),
+    while the app moves such occurrences to the month's last day. Taking the last existing day
+    out of ``28..start day`` with ``BYSETPOS=-1`` repeats the app's dates exactly.
+    """
+    if (frequency == "monthly" and start_at.day > 28) or (frequency == "yearly" and (start_at.month, start_at.day) == (2, 29)):
+        return ",".join(str(day) for day in range(28, start_at.day + 1))
+    return None
+
+
+def _ics_rrule(recurrence: Dict[str, Any], start_at: datetime) -> Optional[str]:
+    frequency = (recurrence or {}).get("frequency", "none")
+    if frequency == "none":
+        return None
+    rule = f"FREQ={frequency.upper()}"
+    monthdays = _ics_clamped_monthdays(frequency, start_at)
+    if monthdays:
+        rule += f";BYMONTH={start_at.month}" if frequency == "yearly" else ""
+        rule += f";BYMONTHDAY={monthdays};BYSETPOS=-1"
+    if recurrence.get("end_type") == "count" and recurrence.get("count"):
+        rule += f";COUNT={int(recurrence['count'])}"
+    elif recurrence.get("end_type") == "until" and recurrence.get("until"):
+        rule += f";UNTIL={_ics_datetime(_parse_end_date(recurrence['until']))}"
+    return rule
+
+
+def _ics_vevent(username: str, item: Dict[str, Any]) -> str:
+    start_at, end_at = _resolve_event_range(item["time"], item.get("end_time"))
+    try:
+        stamp = datetime.fromisoformat(item.get("created_at") or "")
+    except ValueError:
+        stamp = datetime.utcnow()
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{item['id']}-{username}@calendarsecretary",
+        f"DTSTAMP:{_ics_datetime(stamp)}Z",
+        f"DTSTART:{_ics_datetime(start_at)}",
+        f"DTEND:{_ics_datetime(end_at)}",
+        f"SUMMARY:{_ics_escape(item.get('title') or '')}",
+        f"LOCATION:{_ics_escape(item.get('location') or '')}",
+        f"DESCRIPTION:{_ics_escape(item.get('description') or '')}",
+    ]
+    rrule = _ics_rrule(item.get("recurrence") or {}, start_at)
+    if rrule:
+        lines.append(f"RRULE:{rrule}")
+    lines.append("END:VEVENT")
+    return "".join(_ics_fold(line) for line in lines)
+
+
+def _iter_ics_calendar(username: str, items: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """VCALENDAR text, one VEVENT per chunk, so a large schedule is never held as one string."""
+    yield "".join(_ics_fold(line) for line in ("BEGIN:VCALENDAR", "VERSION:2.0", f"PRODID:{ICS_PRODID}", "CALSCALE:GREGORIAN"))
+    for item in items:
+        yield _ics_vevent(username, item)
+    yield _ics_fold("END:VCALENDAR")
+
+
+def _iter_ics_lines(chunks: Iterable[bytes]) -> Iterator[str]:
+    """Unfolded content lines from a line-oriented byte stream."""
+    pending: Optional[str] = None
+    for raw in chunks:
+        line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+        if line[:1] in {" ", "\t"} and pending is not None:
+            pending += line[1:]
+            continue
+        if pending:
+            yield pending
+        pending = line
+    if pending:
+        yield pending
+
+
+def _parse_ics_property(line: str) -> Optional[tuple[str, Dict[str, str], str]]:
+    """``(NAME, params, value)`` of a content line; colons inside quoted parameters are skipped."""
+    quoted = False
+    for position, char in enumerate(line):
+        if char == '"':
+            quoted = not quoted
+        elif char == ":" and not quoted:
+            head, value = line[:position], line[position + 1:]
+            break
+    else:
+        return None
+    name, *raw_params = head.split(";")
+    params = {}
+    for raw in raw_params:
+        key, _, param_value = raw.partition("=")
+        params[key.upper()] = param_value.strip('"')
+    return name.upper(), params, value
+
+
+def _iter_ics_events(lines: Iterable[str]) -> Iterator[Dict[str, tuple[Dict[str, str], str]]]:
+    """Properties of each top-level VEVENT; nested components such as VALARM are skipped."""
+    event: Optional[Dict[str, tuple[Dict[str, str], str]]] = None
+    nested = 0
+    for line in lines:
+        parsed = _parse_ics_property(line)
+        if parsed is None:
+            continue
+        name, params, value = parsed
+        if name == "BEGIN":
+            if event is None and value.upper() == "VEVENT":
+                event, nested = {}, 0
+            elif event is not None:
+                nested += 1
+        elif name == "END":
+            if event is not None and nested:
+                nested -= 1
+            elif event is not None and value.upper() == "VEVENT":
+                yield event
+                event = None
+        elif event is not None and not nested:
+            event.setdefault(name, (params, value))
+
+
+def _parse_ics_time(params: Dict[str, str], value: str) -> tuple[datetime, bool]:
+    """Wall-clock time of a DATE or DATE-TIME value and whether it was a DATE.
+
+    The app stores floating local times, so TZID parameters and UTC markers are not converted.
+    """
+    value = value.strip()
+    try:
+        if params.get("VALUE", "").upper() == "DATE" or len(value) == 8:
+            return datetime.strptime(value[:8], "%Y%m%d"), True
+        return datetime.strptime(value.rstrip("Zz")[:15], "%Y%m%dT%H%M%S"), False
+    except ValueError:
+        raise ValueError(f"invalid date value: {value}")
+
+
+def _parse_ics_duration(value: str) -> timedelta:
+    match = ICS_DURATION_PATTERN.match(value.strip())
+    if not match or not any(match.groups()):
+        raise ValueError(f"unsupported DURATION: {value}")
+    weeks, days, hours, minutes, seconds = (int(group or 0) for group in match.groups())
+    return timedelta(weeks=weeks, days=days, hours=hours, minutes=minutes, seconds=seconds)
+
+
+def _ics_recurrence(rule: str, start_at: datetime) -> Dict[str, Any]:
+    """Recurrence dict for an RRULE; only rules the app can repeat exactly are accepted.
+
+    A monthly rule starting after the 28th, or a yearly one on Feb 29, must use the
+    ``BYSETPOS=-1`` form written by :func:`_ics_rrule`; the plain rule skips short months.
+    """
+    parts = {}
+    for part in rule.split(";"):
+        key, _, value = part.partition("=")
+        parts[key.strip().upper()] = value.strip().upper()
+    frequency = ICS_FREQUENCIES.get(parts.pop("FREQ", ""))
+    if not frequency:
+        raise ValueError(f"unsupported RRULE: {rule}")
+    parts.pop("WKST", None)
+    monthdays = _ics_clamped_monthdays(frequency, start_at)
+    if monthdays and (parts.pop("BYMONTHDAY", None) != monthdays or parts.pop("BYSETPOS", None) != "-1"):
+        raise ValueError(f"unsupported RRULE: {rule}")
+    implied = {
+        "INTERVAL": "1",
+        "BYDAY": ICS_WEEKDAYS[start_at.weekday()] if frequency == "weekly" else None,
+        "BYMONTHDAY": str(start_at.day) if frequency in {"monthly", "yearly"} else None,
+        "BYMONTH": str(start_at.month) if frequency == "yearly" else None,
+    }
+    for key, allowed in implied.items():
+        if key in parts and parts.pop(key) != allowed:
+            raise ValueError(f"unsupported RRULE: {rule}")
+
+    recurrence: Dict[str, Any] = {"frequency": frequency, "end_type": "never"}
+    if "COUNT" in parts:
+        recurrence.update(end_type="count", count=parts.pop("COUNT"))
+    elif "UNTIL" in parts:
+        until, _ = _parse_ics_time({}, parts.pop("UNTIL"))
+        recurrence.update(end_type="until", until=until.strftime("%Y-%m-%d"))
+    if parts:
+        raise ValueError(f"unsupported RRULE: {rule}")
+    return recurrence
+
+
+def _ics_event_payload(event: Dict[str, tuple[Dict[str, str], str]]) -> Dict[str, Any]:
+    """Create-request payload for one parsed VEVENT."""
+    if "DTSTART" not in event:
+        raise ValueError("VEVENT has no DTSTART")
+    start_at, all_day = _parse_ics_time(*event["DTSTART"])
+    if "DTEND" in event:
+        end_at, _ = _parse_ics_time(*event["DTEND"])
+    elif "DURATION" in event:
+        end_at = start_at + _parse_ics_duration(event["DURATION"][1])
+    else:
+        end_at = start_at + (timedelta(days=1) if all_day else timedelta(hours=1))
+
+    payload: Dict[str, Any] = {
+        "title": _ics_unescape(event.get("SUMMARY", ({}, ""))[1]).strip() or ICS_DEFAULT_TITLE,
+        "time": start_at.strftime("%Y-%m-%dT%H:%M"),
+        "end_time": end_at.strftime("%Y-%m-%dT%H:%M"),
+        "location": _ics_unescape(event.get("LOCATION", ({}, ""))[1]).strip() or ICS_DEFAULT_LOCATION,
+        "description": _ics_unescape(event.get("DESCRIPTION", ({}, ""))[1]),
+    }
+    if "RRULE" in event:
+        payload["recurrence"] = _ics_recurrence(event["RRULE"][1], start_at)
+    return payload
+
+
+def _ics_import_rows(chunks: Iterable[bytes]) -> Iterator[tuple[Optional[str], Any]]:
+    """``(uid, payload)`` per VEVENT, or ``(uid, ValueError)`` when it cannot be converted."""
+    for event in _iter_ics_events(_iter_ics_lines(chunks)):
+        uid = event["UID"][1] if "UID" in event else None
+        try:
+            yield uid, _ics_event_payload(event)
+        except ValueError as exc:
+            yield uid, exc
+
+
+def _parse_bulk_rows(body: str) -> list[Any]:
+    """Rows of a bulk request: a JSON array, or JSON Lines where a bad line becomes that row's error."""
+    if body.lstrip().startswith("["):
+        rows = json.loads(body)
+        if not isinstance(rows, list):
+            raise ValueError("body must be a JSON array or JSON Lines")
+        return rows
+    rows: list[Any] = []
+    for number, line in enumerate(body.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            rows.append(json.loads(line))
+        except ValueError:
+            rows.append(ValueError(f"line {number} is not valid JSON"))
+    return rows
+
+
+def _bulk_create_events(username: str, rows: list[Any], atomic: bool = False) -> tuple[list[Dict[str, Any]], int]:
+    """Validate, conflict-check and insert ``rows`` in one locked transaction.
+
+    Returns per-row results (in input order) and the number of events created. With ``atomic``
+    nothing is inserted unless every row is accepted.
+    """
+    results: list[Dict[str, Any]] = []
+    accepted: list[tuple[int, Dict[str, Any]]] = []
+    for index, row in enumerate(rows):
+        try:
+            if isinstance(row, ValueError):
+                raise row
+            accepted.append((index, _event_item_from_payload(row)))
+            results.append({"index": index, "status": "created"})
+        except ValueError as exc:
+            results.append({"index": index, "status": "invalid", "message": str(exc)})
+
+    storage = _get_storage()
+    with storage.schedule_transaction(username):
+        existing: list[Dict[str, Any]] = []
+        if accepted:
+            spans = [_series_span(item) for _, item in accepted]
+            batch_start = min(start_at for start_at, _ in spans)
+            batch_end = None if any(end_at is None for _, end_at in spans) else max(end_at for _, end_at in spans)
+            existing = storage.load_schedule_range(username, _format_event_time(batch_start), _format_event_time(batch_end))
+        conflict_index = _BatchConflictIndex(existing)
+        to_insert: list[tuple[int, Dict[str, Any]]] = []
+        for row_index, item in accepted:
+            conflict = conflict_index.find(item)
+            if conflict:
+                target = f"event #{conflict['id']}" if "id" in conflict else f"row #{conflict['row']}"
+                results[row_index] = {
+                    "index": row_index,
+                    "status": "conflict",
+                    "message": f"Time conflict with {target}: {conflict['title']}",
+                }
+                continue
+            conflict_index.add({**item, "row": row_index})
+            to_insert.append((row_index, item))
+
+        if atomic and len(to_insert) < len(rows):
+            for row_index, _ in to_insert:
+                results[row_index] = {"index": row_index, "status": "skipped"}
+            return results, 0
+        created = storage.create_events(username, [item for _, item in to_insert])
+    for (row_index, _), item in zip(to_insert, created):
+        results[row_index]["id"] = item["id"]
+    if created:
+        _get_freebusy().invalidate(username)
+    return results, len(created)
+
+
+@app.route("/api/events/bulk", methods=["GET", "POST"])
+@require_auth
+def bulk_events(username: str):
+    if request.method == "GET":
+        items = _get_storage().iter_events(username)
+        lines = (json.dumps(item, ensure_ascii=False) + "\n" for item in items)
+        return app.response_class(lines, mimetype="application/x-ndjson")
+
+    try:
+        rows = _parse_bulk_rows(request.get_data(as_text=True))
+    except ValueError:
+        return jsonify({"message": "body must be a JSON array or JSON Lines"}), 400
+    if not rows:
+        return jsonify({"message": "no events to import"}), 400
+    if len(rows) > MAX_BULK_EVENTS:
+        return jsonify({"message": f"at most {MAX_BULK_EVENTS} events per request"}), 400
+
+    atomic = request.args.get("atomic") == "1"
+    results, created = _bulk_create_events(username, rows, atomic=atomic)
+    failed = sum(1 for result in results if result["status"] not in {"created", "skipped"})
+    status = 409 if atomic and failed else 200
+    return jsonify({"created": created, "failed": failed, "results": results}), status
+
+
+@app.route("/api/events.ics", methods=["GET", "POST"])
+@require_auth
+def events_ics(username: str):
+    if request.method == "GET":
+        items = _get_storage().iter_events(username)
+        response = app.response_class(_iter_ics_calendar(username, items), mimetype="text/calendar")
+        response.headers["Content-Disposition"] = 'attachment; filename="calendar.ics"'
+        return response
+
+    # VEVENTs are parsed as the body streams in and imported a batch at a time.
+    rows = _ics_import_rows(request.stream)
+    results: list[Dict[str, Any]] = []
+    created = 0
+    while True:
+        chunk = list(itertools.islice(rows, ICS_IMPORT_BATCH))
+        if not chunk:
+            break
+        chunk_results, chunk_created = _bulk_create_events(username, [row for _, row in chunk])
+        for (uid, _), result in zip(chunk, chunk_results):
+            results.append({**result, "index": len(results), "uid": uid})
+        created += chunk_created
+    if not results:
+        return jsonify({"message": "no VEVENT found in request body"}), 400
+    failed = sum(1 for result in results if result["status"] != "created")
+    return jsonify({"created": created, "failed": failed, "results": results})
+
+
+@app.route("/api/events/check-conflicts", methods=["POST"])
+@require_auth
+def check_conflicts(username: str):
+    payload = request.get_json(force=True)
+    if not payload.get("time"):
+        return jsonify({"message": "time is required"}), 400
+
+    try:
+        start_at, end_at = _resolve_event_range(payload["time"], payload.get("end_time"))
+        recurrence = _normalize_recurrence(payload)
+    except ValueError as exc:
+        return jsonify({"message": str(exc)}), 400
+    try:
+        ignore_id = int(payload["ignore_id"]) if payload.get("ignore_id") is not None else None
+    except (TypeError, ValueError):
+        return jsonify({"message": "ignore_id must be an integer"}), 400
+
+    candidate = {"time": payload["time"], "end_time": _format_event_time(end_at), "recurrence": recurrence}
+    conflicts = _series_conflicts(candidate, _load_series_items(username, candidate), ignore_id=ignore_id)
+    return jsonify({
+        "conflict": bool(conflicts),
+        "conflicts": [
+            {"id": item["id"], "title": item["title"], "occurrence_time": _format_event_time(occurrence_start)}
+            for occurrence_start, item in conflicts
+        ],
+    })
+
+
 @app.route("/api/events/<int:item_id>", methods=["GET", "PUT", "DELETE"])
 @require_auth
 def event_detail(username: str, item_id: int):
-    data = _load_schedule(username)
-    items = data["items"]
-    item = next((entry for entry in items if entry["id"] == item_id), None)
-    if not item:
-        return jsonify({"message": "Schedule item not found"}), 404
-
     if request.method == "GET":
+        item = _get_storage().get_event(username, item_id)
+        if not item:
+            return jsonify({"message": "Schedule item not found"}), 404
         return jsonify(item)
 
     if request.method == "DELETE":
-        data["items"] = [entry for entry in items if entry["id"] != item_id]
-        _save_schedule(username, data)
+        if not _get_storage().delete_event(username, item_id):
+            return jsonify({"message": "Schedule item not found"}), 404
+        _get_freebusy().invalidate(username)
         return jsonify({"message": "Deleted"})
 
-    payload = request.get_json(force=True)
-    try:
-        candidate_time = payload.get("time", item["time"])
-        candidate_end_time = payload.get("end_time", item.get("end_time"))
-        start_at, end_at = _resolve_event_range(candidate_time, candidate_end_time)
-
-        conflict = _find_conflict(items, start_at, end_at, ignore_id=item_id)
-        if conflict:
-            return jsonify({"message": f"Time conflict with event #{conflict['id']}: {conflict['title']}"}), 409
-
-        if "recurrence" in payload:
-            item["recurrence"] = _normalize_recurrence(payload)
-        for field in ["title", "time", "location", "description", "end_time"]:
-            if field in payload:
-                item[field] = payload[field]
-        if "end_time" not in payload:
-            item["end_time"] = end_at.strftime("%Y-%m-%dT%H:%M")
-    except ValueError as exc:
-        return jsonify({"message": str(exc)}), 400
+    storage = _get_storage()
+    with storage.schedule_transaction(username):
+        item = storage.get_event(username, item_id)
+        if not item:
+            return jsonify({"message": "Schedule item not found"}), 404
 
-    if "recurrence" not in item:
-        item["recurrence"] = {"frequency": "none", "end_type": "never", "until": None, "count": None}
-    _save_schedule(username, data)
+        payload = request.get_json(force=True)
+        changes: Dict[str, Any] = {}
+        try:
+            candidate_time = payload.get("time", item["time"])
+            candidate_end_time = payload.get("end_time", item.get("end_time"))
+            start_at, end_at = _resolve_event_range(candidate_time, candidate_end_time)
+            if "recurrence" in payload:
+                changes["recurrence"] = _normalize_recurrence(payload)
+
+            candidate = {
+                "time": candidate_time,
+                "end_time": _format_event_time(end_at),
+                "recurrence": changes.get("recurrence", item.get("recurrence")),
+            }
+            conflict = _find_series_conflict(candidate, _load_series_items(username, candidate), ignore_id=item_id)
+            if conflict:
+                return jsonify({"message": f"Time conflict with event #{conflict['id']}: {conflict['title']}"}), 409
+
+            for field in ["title", "time", "location", "description", "end_time"]:
+                if field in payload:
+                    changes[field] = payload[field]
+            if "end_time" not in payload:
+                changes["end_time"] = end_at.strftime("%Y-%m-%dT%H:%M")
+        except ValueError as exc:
+            return jsonify({"message": str(exc)}), 400
+
+        previous = dict(item)
+        item.update(changes)
+        storage.update_event(username, item_id, changes)
+    _get_freebusy().invalidate(username, previous)
+    _get_freebusy().record(username, item)
     return jsonify(item)
 
 
@@ -779,6 +2013,13 @@ def schedule_detail(username: str, item_id: int):
     return event_detail(username, item_id)
 
 
+def _search_cached_slots(username: str, windows: list[tuple[datetime, datetime]], required_minutes: int, max_results: int) -> list[tuple[datetime, datetime]]:
+    if not windows:
+        return []
+    masks = _get_freebusy().masks(username, windows[0][0], windows[-1][1])
+    return _scan_free_slots(masks, windows, required_minutes, max_results)
+
+
 @app.route("/api/slots/find-and-book", methods=["POST"])
 @require_auth
 def find_and_book_slot(username: str):
@@ -788,92 +2029,214 @@ def find_and_book_slot(username: str):
         return jsonify({"message": "target_date, duration_hours, title, location and description are required"}), 400
 
     try:
-        target_date = _parse_date(payload.get("target_date"))
-        duration_hours = float(payload.get("duration_hours"))
-        if duration_hours <= 0:
-            raise ValueError("duration_hours must be greater than 0")
-        required_minutes = int(duration_hours * 60)
-        if required_minutes <= 0:
-            raise ValueError("duration_hours must be at least 1 minute")
-
-        preferred_start_raw = payload.get("preferred_start_time") or "00:00"
-        preferred_end_raw = payload.get("preferred_end_time") or "23:59"
-        start_hour, start_minute = _parse_clock_time(preferred_start_raw, "preferred_start_time")
-        end_hour, end_minute = _parse_clock_time(preferred_end_raw, "preferred_end_time")
-        window_start = target_date.replace(hour=start_hour, minute=start_minute)
-        window_end = target_date.replace(hour=end_hour, minute=end_minute)
-        if window_end <= window_start:
-            raise ValueError("preferred_end_time must be later than preferred_start_time")
+        windows, required_minutes = _parse_slot_search(payload, "target_date")
     except ValueError as exc:
         return jsonify({"message": str(exc)}), 400
 
-    data = _load_schedule(username)
-    slot = _find_first_available_slot(data["items"], target_date, required_minutes, window_start, window_end)
-    if not slot:
-        return jsonify({"message": "No available slot found for the requested duration"}), 409
-
-    start_at, end_at = slot
-    item_payload = {
-        "title": payload["title"],
-        "time": start_at.strftime("%Y-%m-%dT%H:%M"),
-        "end_time": end_at.strftime("%Y-%m-%dT%H:%M"),
-        "location": payload["location"],
-        "description": payload["description"],
-        "recurrence": {"frequency": "none", "end_type": "never", "until": None, "count": None},
-        "created_at": _iso_now(),
-    }
-    item = _get_storage().create_event(username, item_payload)
+    storage = _get_storage()
+    freebusy = _get_freebusy()
+    # Searching, confirming and inserting under one lock keeps parallel bookings from taking the same slot.
+    with storage.schedule_transaction(username):
+        slot = None
+        for _ in range(2):
+            slots = _search_cached_slots(username, windows, required_minutes, 1)
+            if not slots:
+                break
+            # The bitmaps may trail writes from other processes; confirm before booking.
+            if not _find_conflict(_load_window_items(username, *slots[0]), *slots[0]):
+                slot = slots[0]
+                break
+            freebusy.invalidate(username)
+        if not slot:
+            return jsonify({"message": "No available slot found for the requested duration"}), 409
+
+        start_at, end_at = slot
+        item_payload = {
+            "title": payload["title"],
+            "time": start_at.strftime("%Y-%m-%dT%H:%M"),
+            "end_time": end_at.strftime("%Y-%m-%dT%H:%M"),
+            "location": payload["location"],
+            "description": payload["description"],
+            "recurrence": {"frequency": "none", "end_type": "never", "until": None, "count": None},
+            "created_at": _iso_now(),
+        }
+        item = storage.create_event(username, item_payload)
+    freebusy.record(username, item)
     return jsonify({"message": "Booked available slot", "item": item}), 201
 
 
+@app.route("/api/slots/search", methods=["POST"])
+@require_auth
+def search_slots(username: str):
+    payload = request.get_json(force=True)
+    if not payload.get("start_date") or not payload.get("duration_hours"):
+        return jsonify({"message": "start_date and duration_hours are required"}), 400
+
+    try:
+        windows, required_minutes = _parse_slot_search(payload, "start_date")
+        max_results = int(payload.get("max_results") or 5)
+        if not 1 <= max_results <= MAX_SLOT_RESULTS:
+            raise ValueError(f"max_results must be between 1 and {MAX_SLOT_RESULTS}")
+    except ValueError as exc:
+        return jsonify({"message": str(exc)}), 400
+
+    slots = _search_cached_slots(username, windows, required_minutes, max_results)
+    return jsonify({
+        "slots": [{"start": _format_event_time(start_at), "end": _format_event_time(end_at)} for start_at, end_at in slots],
+    })
+
+
+@app.route("/api/slots/find-common", methods=["POST"])
+@require_auth
+def find_common_slots(username: str):
+    payload = request.get_json(force=True)
+    if not payload.get("start_date") or not payload.get("duration_hours"):
+        return jsonify({"message": "start_date and duration_hours are required"}), 400
+    requested = payload.get("usernames")
+    if not isinstance(requested, list) or not all(isinstance(name, str) for name in requested):
+        return jsonify({"message": "usernames must be a list of usernames"}), 400
+    participants = list(dict.fromkeys([username, *requested]))
+    if len(participants) > MAX_COMMON_PARTICIPANTS:
+        return jsonify({"message": f"At most {MAX_COMMON_PARTICIPANTS} participants are supported"}), 400
+
+    try:
+        windows, required_minutes = _parse_slot_search(payload, "start_date")
+        max_results = int(payload.get("max_results") or 5)
+        if not 1 <= max_results <= MAX_SLOT_RESULTS:
+            raise ValueError(f"max_results must be between 1 and {MAX_SLOT_RESULTS}")
+    except ValueError as exc:
+        return jsonify({"message": str(exc)}), 400
+
+    unknown = []
+    for name in participants:
+        user = _load_user(name)
+        if not user or not user.enabled:
+            unknown.append(name)
+    if unknown:
+        return jsonify({"message": "Unknown or disabled users", "usernames": unknown}), 404
+
+    slots: list[tuple[datetime, datetime]] = []
+    if windows:
+        combined: Dict[date, int] = {}
+        for user_masks in _get_freebusy().masks_for(participants, windows[0][0], windows[-1][1]).values():
+            for day, mask in user_masks.items():
+                combined[day] = combined.get(day, 0) | mask
+        slots = _scan_free_slots(combined, windows, required_minutes, max_results)
+    return jsonify({
+        "participants": participants,
+        "slots": [{"start": _format_event_time(start_at), "end": _format_event_time(end_at)} for start_at, end_at in slots],
+    })
+
+
+@app.route("/api/freebusy", methods=["GET"])
+@require_auth
+def freebusy(username: str):
+    start_raw = request.args.get("start")
+    if not start_raw:
+        return jsonify({"message": "start query parameter is required"}), 400
+    try:
+        first_day = _parse_date(start_raw, "start")
+        last_day = _parse_date(request.args["end"], "end") if request.args.get("end") else first_day
+        if last_day < first_day:
+            raise ValueError("end must not be earlier than start")
+        if (last_day - first_day).days >= MAX_SLOT_SEARCH_DAYS:
+            raise ValueError(f"date range must not exceed {MAX_SLOT_SEARCH_DAYS} days")
+    except ValueError as exc:
+        return jsonify({"message": str(exc)}), 400
+
+    masks = _get_freebusy().masks(username, first_day, last_day)
+    days = []
+    for day, mask in sorted(masks.items()):
+        origin = datetime.combine(day, datetime.min.time())
+        days.append({
+            "date": day.isoformat(),
+            "busy_minutes": bin(mask).count("1"),
+            "busy": [
+                {
+                    "start": _format_event_time(origin + timedelta(minutes=start_minute)),
+                    "end": _format_event_time(origin + timedelta(minutes=end_minute)),
+                }
+                for start_minute, end_minute in _mask_runs(mask)
+            ],
+        })
+    return jsonify({"days": days})
+
+
 @app.route("/api/profile", methods=["GET"])
 @require_auth
 def profile(username: str):
-    users = _load_users()
-    user = users.get(username)
-    if not user:
-        return jsonify({"message": "User not found"}), 404
-    return jsonify({"username": user.username, "api_key": user.api_key})
+    api_key = g.principal.api_key
+    if not api_key:
+        user = _load_user(username)
+        api_key = user.api_key if user else ""
+    return jsonify({"username": username, "api_key": api_key})
 
 
 @app.route("/api/admin/users", methods=["GET"])
 @require_admin
 def admin_list_users(_admin_username: str):
-    users = _load_users()
-    result = []
-    for username, user in users.items():
-        result.append({
-            "username": username,
-            "api_key": user.api_key,
-            "enabled": user.enabled,
-            "created_at": user.created_at,
-            "is_admin": _is_admin(username),
-            "event_count": _event_count_for_user(username),
-        })
-    result.sort(key=lambda item: item["username"])
-    return jsonify({"items": result})
+    sort = request.args.get("sort", "username")
+    order = request.args.get("order", "asc")
+    enabled_raw = request.args.get("enabled")
+    try:
+        if sort not in ADMIN_USER_SORTS:
+            raise ValueError(f"sort must be one of: {', '.join(ADMIN_USER_SORTS)}")
+        if order not in {"asc", "desc"}:
+            raise ValueError("order must be asc or desc")
+        if enabled_raw not in {None, "", "true", "false"}:
+            raise ValueError("enabled must be true or false")
+        limit = _parse_page_limit(request.args.get("limit"))
+        after = _parse_user_cursor(request.args["after"], sort) if request.args.get("after") else None
+    except ValueError as exc:
+        return jsonify({"message": str(exc)}), 400
+
+    users, total = _get_storage().list_users_page(
+        search=request.args.get("q", "").strip() or None,
+        enabled=(enabled_raw == "true") if enabled_raw else None,
+        sort=sort,
+        descending=order == "desc",
+        limit=limit + 1 if limit else None,
+        after=after,
+    )
+    response: Dict[str, Any] = {"total": total}
+    if limit:
+        has_more = len(users) > limit
+        users = users[:limit]
+        response["next_cursor"] = _encode_cursor(users[-1][sort], users[-1]["username"]) if has_more else None
+    items = [
+        {
+            "username": user["username"],
+            "api_key": user["api_key"],
+            "enabled": user["enabled"],
+            "created_at": user["created_at"],
+            "is_admin": _is_admin(user["username"]),
+            "event_count": user["event_count"],
+        }
+        for user in users
+    ]
+    return jsonify({"items": items, **response})
 
 
 @app.route("/api/admin/users/<username>", methods=["DELETE"])
 @require_admin
 def admin_delete_user(_admin_username: str, username: str):
-    users = _load_users()
-    if username not in users:
-        return jsonify({"message": "User not found"}), 404
     if _is_admin(username):
+        if not _load_user(username):
+            return jsonify({"message": "User not found"}), 404
         return jsonify({"message": "Admin user cannot be deleted"}), 400
 
-    users.pop(username)
-    _save_users(users)
+    if not _get_storage().delete_user(username):
+        return jsonify({"message": "User not found"}), 404
+    _get_storage().invalidate_user(username)
+    _get_freebusy().invalidate(username)
+    _get_token_revocations().revoke_user(username)
     return jsonify({"message": "User deleted"})
 
 
 @app.route("/api/admin/users/<username>/reset-password", methods=["POST"])
 @require_admin
 def admin_reset_password(_admin_username: str, username: str):
-    users = _load_users()
-    user = users.get(username)
-    if not user:
+    if not _load_user(username):
         return jsonify({"message": "User not found"}), 404
 
     payload = request.get_json(force=True)
@@ -881,60 +2244,85 @@ def admin_reset_password(_admin_username: str, username: str):
     if not _validate_password(new_password):
         return jsonify({"message": "Password must be at least 8 chars and include letters and numbers"}), 400
 
-    salt, password_hash = _hash_password(new_password)
-    user.password_salt = salt
-    user.password_hash = password_hash
-    user.iterations = PASSWORD_ITERATIONS
-    _save_users(users)
+    salt, password_hash = _run_password_work(_hash_password, new_password, user=username)
+    updated = _get_storage().update_user_fields(
+        username,
+        {"password": _serialize_password(salt, password_hash, PASSWORD_ITERATIONS)},
+    )
+    _get_storage().invalidate_user(username)
+    if not updated:
+        return jsonify({"message": "User not found"}), 404
+    _get_token_revocations().revoke_user(username)
     return jsonify({"message": "Password reset successful"})
 
 
 @app.route("/api/admin/users/<username>/toggle", methods=["POST"])
 @require_admin
 def admin_toggle_user(_admin_username: str, username: str):
-    users = _load_users()
-    user = users.get(username)
-    if not user:
-        return jsonify({"message": "User not found"}), 404
     if _is_admin(username):
         return jsonify({"message": "Admin user cannot be disabled"}), 400
 
-    user.enabled = not user.enabled
-    _save_users(users)
-    return jsonify({"message": "User status updated", "enabled": user.enabled})
+    # Flipped in the database rather than from a cached copy that another process may have outdated.
+    enabled = _get_storage().toggle_user_enabled(username)
+    if enabled is None:
+        return jsonify({"message": "User not found"}), 404
+    if not enabled:
+        _get_token_revocations().revoke_user(username)
+    return jsonify({"message": "User status updated", "enabled": enabled})
+
+
+def _parse_stats_range(start_raw: Optional[str], end_raw: Optional[str]) -> Optional[tuple[date, date]]:
+    """Inclusive histogram date range from the ``start`` / ``end`` query parameters, if requested."""
+    if not start_raw and not end_raw:
+        return None
+    if not start_raw or not end_raw:
+        raise ValueError("start and end are both required for a histogram")
+    try:
+        first_day = datetime.strptime(start_raw, "%Y-%m-%d").date()
+        last_day = datetime.strptime(end_raw, "%Y-%m-%d").date()
+    except ValueError:
+        raise ValueError("start and end must be YYYY-MM-DD")
+    if last_day < first_day:
+        raise ValueError("end must not be earlier than start")
+    if (last_day - first_day).days >= MAX_STATS_HISTOGRAM_DAYS:
+        raise ValueError(f"histogram range must not exceed {MAX_STATS_HISTOGRAM_DAYS} days")
+    return first_day, last_day
 
 
 @app.route("/api/admin/stats", methods=["GET"])
 @require_admin
 def admin_stats(_admin_username: str):
-    users = _load_users()
+    storage = _get_storage()
     today = datetime.utcnow().date()
+    try:
+        histogram_range = _parse_stats_range(request.args.get("start"), request.args.get("end"))
+    except ValueError as exc:
+        return jsonify({"message": str(exc)}), 400
 
-    total_events = 0
-    today_events = 0
-    for username in users:
-        schedule = _load_schedule(username)
-        items = schedule.get("items", [])
-        total_events += len(items)
-        for item in items:
-            created_at = _parse_iso_datetime(item.get("created_at", ""))
-            if created_at and created_at.date() == today:
-                today_events += 1
-
-    today_users = 0
-    for user in users.values():
-        created_at = _parse_iso_datetime(user.created_at)
-        if created_at and created_at.date() == today:
-            today_users += 1
-
+    totals = storage.creation_totals(today.isoformat())
     system_ok = True
-    return jsonify({
-        "total_users": len(users),
-        "total_events": total_events,
-        "today_new_users": today_users,
-        "today_new_events": today_events,
+    response = {
+        "total_users": totals["total_users"],
+        "total_events": totals["total_events"],
+        "today_new_users": totals["today_new_users"],
+        "today_new_events": totals["today_new_events"],
+        "active_api_keys": totals["active_api_keys"],
         "system_status": "ok" if system_ok else "degraded",
-    })
+        "user_cache": storage.cache_stats(),
+    }
+    if histogram_range:
+        first_day, last_day = histogram_range
+        counts = storage.creation_histogram(first_day.isoformat(), last_day.isoformat())
+        days = (first_day + timedelta(days=offset) for offset in range((last_day - first_day).days + 1))
+        response["histogram"] = [
+            {
+                "date": day.isoformat(),
+                "new_users": counts["users"].get(day.isoformat(), 0),
+                "new_events": counts["events"].get(day.isoformat(), 0),
+            }
+            for day in days
+        ]
+    return jsonify(response)
 
 
 @app.route("/health", methods=["GET"])
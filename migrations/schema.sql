@@ -11,7 +11,7 @@ CREATE TABLE IF NOT EXISTS users (
 CREATE INDEX IF NOT EXISTS idx_users_api_key ON users(api_key);
 
 CREATE TABLE IF NOT EXISTS events (
-    id INTEGER PRIMARY KEY,
+    id INTEGER NOT NULL,
     username TEXT NOT NULL,
     title TEXT NOT NULL,
     time TEXT NOT NULL,
@@ -20,8 +20,85 @@ CREATE TABLE IF NOT EXISTS events (
     description TEXT NOT NULL,
     recurrence TEXT NOT NULL,
     created_at TEXT NOT NULL,
+    series_start TEXT,
+    series_end TEXT,
+    frequency TEXT,
+    PRIMARY KEY (username, id),
     CONSTRAINT fk_events_user FOREIGN KEY (username) REFERENCES users(username) ON DELETE CASCADE
 );
 
 CREATE INDEX IF NOT EXISTS idx_events_username ON events(username);
 CREATE INDEX IF NOT EXISTS idx_events_username_time ON events(username, time);
+
+-- Materialized recurrence bounds: series_start is the first occurrence, series_end an upper bound
+-- for when the last occurrence ends (NULL = never-ending series), frequency mirrors recurrence.frequency.
+-- Existing rows are backfilled by scripts/init_db.py.
+ALTER TABLE events ADD COLUMN IF NOT EXISTS series_start TEXT;
+ALTER TABLE events ADD COLUMN IF NOT EXISTS series_end TEXT;
+ALTER TABLE events ADD COLUMN IF NOT EXISTS frequency TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_events_username_series ON events(username, series_start, series_end);
+CREATE INDEX IF NOT EXISTS idx_events_username_frequency ON events(username, frequency);
+
+-- Event ids are allocated per user from event_counters (next id to hand out) and are never reused.
+CREATE TABLE IF NOT EXISTS event_counters (
+    username TEXT PRIMARY KEY,
+    next_id INTEGER NOT NULL,
+    CONSTRAINT fk_event_counters_user FOREIGN KEY (username) REFERENCES users(username) ON DELETE CASCADE
+);
+
+-- Databases created with a global id primary key are re-keyed to (username, id); ids are kept.
+DO $$
+DECLARE
+    pk_name TEXT;
+BEGIN
+    SELECT tc.constraint_name INTO pk_name
+    FROM information_schema.table_constraints tc
+    WHERE tc.table_name = 'events' AND tc.constraint_type = 'PRIMARY KEY'
+      AND NOT EXISTS (
+          SELECT 1 FROM information_schema.key_column_usage kcu
+          WHERE kcu.constraint_name = tc.constraint_name AND kcu.column_name = 'username'
+      );
+    IF pk_name IS NOT NULL THEN
+        EXECUTE format('ALTER TABLE events DROP CONSTRAINT %I', pk_name);
+        ALTER TABLE events ADD PRIMARY KEY (username, id);
+    END IF;
+END $$;
+
+INSERT INTO event_counters (username, next_id)
+SELECT username, MAX(id) + 1 FROM events GROUP BY username
+ON CONFLICT (username) DO UPDATE SET next_id = GREATEST(event_counters.next_id, EXCLUDED.next_id);
+
+-- Admin metrics maintained by the application's write paths in the same transaction as each change.
+-- daily_metrics counts existing rows by the date part of created_at. Recount with scripts/rebuild_metrics.py.
+-- The global counters are split over shards that each write picks at random; readers sum the shards.
+CREATE TABLE IF NOT EXISTS user_metrics (
+    username TEXT PRIMARY KEY,
+    event_count INTEGER NOT NULL DEFAULT 0,
+    CONSTRAINT fk_user_metrics_user FOREIGN KEY (username) REFERENCES users(username) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS daily_metrics (
+    day TEXT NOT NULL,
+    shard INTEGER NOT NULL DEFAULT 0,
+    new_users INTEGER NOT NULL DEFAULT 0,
+    new_events INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, shard)
+);
+
+CREATE TABLE IF NOT EXISTS metric_totals (
+    name TEXT NOT NULL,
+    shard INTEGER NOT NULL DEFAULT 0,
+    value INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (name, shard)
+);
+
+-- Revoked bearer tokens (epoch milliseconds). token_id '*' revokes every token issued to the user up to
+-- revoked_at. Rows are pruned once expires_at passes, so the list stays small enough to cache in memory.
+CREATE TABLE IF NOT EXISTS token_revocations (
+    username TEXT NOT NULL,
+    token_id TEXT NOT NULL,
+    revoked_at BIGINT NOT NULL,
+    expires_at BIGINT NOT NULL,
+    PRIMARY KEY (username, token_id)
+);
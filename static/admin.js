@@ -23,7 +23,9 @@ const setMessage = (text, isError = false) => {
   messageEl.classList.toggle("error", isError);
 };
 
-const state = { users: [] };
+const PAGE_SIZE = 50;
+const state = { users: [], total: 0, nextCursor: null };
+let searchTimer = null;
 
 const renderStats = (stats) => {
   document.getElementById("stat-total-users").textContent = stats.total_users;
@@ -33,23 +35,42 @@ const renderStats = (stats) => {
   document.getElementById("stat-system-status").textContent = stats.system_status;
 };
 
-const filteredUsers = () => {
-  const keyword = userSearch.value.trim().toLowerCase();
-  if (!keyword) {
-    return state.users;
+const refreshUsers = async ({ append = false } = {}) => {
+  const params = new URLSearchParams({ limit: PAGE_SIZE });
+  const keyword = userSearch.value.trim();
+  if (keyword) {
+    params.set("q", keyword);
   }
-  return state.users.filter((user) => user.username.toLowerCase().includes(keyword));
+  if (append && state.nextCursor) {
+    params.set("after", state.nextCursor);
+  }
+  const data = await request(`/api/admin/users?${params}`);
+  state.users = append ? state.users.concat(data.items || []) : data.items || [];
+  state.total = data.total || 0;
+  state.nextCursor = data.next_cursor || null;
+  renderUsers();
 };
 
-const refreshUsers = async () => {
-  const data = await request("/api/admin/users");
-  state.users = data.items || [];
-  renderUsers();
+const renderLoadMore = () => {
+  const row = document.createElement("tr");
+  row.innerHTML = `<td colspan='6'>已显示 ${state.users.length} / ${state.total} 位用户 </td>`;
+  const moreBtn = document.createElement("button");
+  moreBtn.className = "secondary";
+  moreBtn.textContent = "加载更多";
+  moreBtn.addEventListener("click", async () => {
+    try {
+      await refreshUsers({ append: true });
+    } catch (error) {
+      setMessage(error.message, true);
+    }
+  });
+  row.firstElementChild.appendChild(moreBtn);
+  tableBody.appendChild(row);
 };
 
 const renderUsers = () => {
   tableBody.innerHTML = "";
-  const users = filteredUsers();
+  const users = state.users;
   if (users.length === 0) {
     const row = document.createElement("tr");
     row.innerHTML = "<td colspan='6'>暂无用户</td>";
@@ -129,6 +150,10 @@ const renderUsers = () => {
     actionsCell.append(resetBtn, toggleBtn, deleteBtn);
     tableBody.appendChild(row);
   });
+
+  if (state.nextCursor) {
+    renderLoadMore();
+  }
 };
 
 const loadStats = async () => {
@@ -166,6 +191,11 @@ document.getElementById("admin-logout").addEventListener("click", async () => {
   window.location.href = "/";
 });
 
-userSearch.addEventListener("input", renderUsers);
+userSearch.addEventListener("input", () => {
+  clearTimeout(searchTimer);
+  searchTimer = setTimeout(() => {
+    refreshUsers().catch((error) => setMessage(error.message, true));
+  }, 300);
+});
 
 initialize();
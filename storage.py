@@ -2,10 +2,15 @@ from __future__ import annotations
 
 import json
 import os
+import random
 import sqlite3
+import threading
+import time
+from collections import OrderedDict
 from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Any, Dict, Generator, Optional
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Generator, Iterable, Iterator, Optional
 from urllib.parse import urlparse
 
 
@@ -17,28 +22,207 @@ class StorageConfigError(StorageError):
     """Raised when database configuration is missing or invalid."""
 
 
+class UserExistsError(StorageError):
+    """Raised when inserting a user whose username or API key is already taken."""
+
+
 @dataclass
 class DBConfig:
     database_url: str
     supabase_url: str
     supabase_service_role_key: str
+    user_cache_ttl: float = 30.0
+    user_cache_size: int = 1024
+    freebusy_cache_ttl: float = 30.0
+    freebusy_cache_size: int = 4096
+    pool_min_size: int = 1
+    pool_max_size: int = 10
+    pool_timeout: float = 10.0
+    pool_health_check_interval: float = 30.0
 
 
-SCHEMA_SQL = """
-CREATE TABLE IF NOT EXISTS users (
-    username TEXT PRIMARY KEY,
-    api_key TEXT UNIQUE NOT NULL,
-    password_salt TEXT NOT NULL,
-    password_hash TEXT NOT NULL,
-    iterations INTEGER NOT NULL,
-    enabled BOOLEAN NOT NULL DEFAULT TRUE,
-    created_at TEXT NOT NULL
-);
+class LRUCache:
+    """Thread-safe LRU mapping whose entries expire ``ttl`` seconds after being stored."""
 
-CREATE INDEX IF NOT EXISTS idx_users_api_key ON users(api_key);
+    def __init__(self, max_entries: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._clock = clock
+        self._entries: "OrderedDict[Any, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Any, value: Any) -> None:
+        if self.max_entries <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def update(self, key: Any, func: Callable[[Any], Any]) -> None:
+        """Replace a live entry's value with ``func(value)``, keeping its expiry."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self._clock():
+                self._entries[key] = (entry[0], func(entry[1]))
+
+    def discard_where(self, predicate: Callable[[Any, Any], bool]) -> None:
+        with self._lock:
+            for key in [key for key, (_, value) in self._entries.items() if predicate(key, value)]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+class ConnectionPool:
+    """Bounded pool of DB-API connections.
+
+    Idle connections are handed back to the thread that last used them when possible, and a
+    connection that sat idle longer than ``health_check_interval`` is probed before reuse.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        min_size: int = 1,
+        max_size: int = 10,
+        timeout: float = 10.0,
+        health_check_interval: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise StorageConfigError("Connection pool sizes must satisfy 0 <= min_size <= max_size and max_size >= 1.")
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self._connect = connect
+        self._clock = clock
+        self._idle: list[tuple[Any, float, int]] = []
+        self._size = 0
+        self._closed = False
+        self._warmed = False
+        self._cond = threading.Condition()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def idle_count(self) -> int:
+        return len(self._idle)
+
+    def _warm_up(self) -> None:
+        self._warmed = True
+        while self._size < self.min_size:
+            self._idle.append((self._connect(), self._clock(), 0))
+            self._size += 1
+
+    def _take_idle(self) -> tuple[Any, float]:
+        owner = threading.get_ident()
+        for index in range(len(self._idle) - 1, -1, -1):
+            if self._idle[index][2] == owner:
+                conn, last_used, _ = self._idle.pop(index)
+                return conn, last_used
+        conn, last_used, _ = self._idle.pop()
+        return conn, last_used
+
+    def acquire(self) -> Any:
+        deadline = self._clock() + self.timeout
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise StorageError("Connection pool is closed")
+                if not self._warmed:
+                    self._warm_up()
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - self._clock()
+                    if remaining <= 0:
+                        raise StorageError(f"Timed out waiting for a database connection (pool max_size={self.max_size})")
+                    self._cond.wait(remaining)
+                if self._idle:
+                    conn, last_used = self._take_idle()
+                else:
+                    self._size += 1
+                    conn, last_used = None, None
+
+            if conn is None:
+                try:
+                    return self._connect()
+                except BaseException:
+                    self._forget()
+                    raise
+            if self._clock() - last_used < self.health_check_interval or self._is_healthy(conn):
+                return conn
+            self._discard(conn)
+
+    def release(self, conn: Any, broken: bool = False) -> None:
+        if broken:
+            self._discard(conn)
+            return
+        with self._cond:
+            if not self._closed:
+                self._idle.append((conn, self._clock(), threading.get_ident()))
+                self._cond.notify()
+                return
+        self._discard(conn)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for conn, _, _ in idle:
+            self._discard(conn)
 
+    @staticmethod
+    def _is_healthy(conn: Any) -> bool:
+        if getattr(conn, "closed", False) or getattr(conn, "broken", False):
+            return False
+        try:
+            conn.execute("SELECT 1")
+            conn.rollback()
+        except Exception:
+            return False
+        return True
+
+    def _discard(self, conn: Any) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+        self._forget()
+
+    def _forget(self) -> None:
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+
+EVENTS_TABLE_SQL = """
 CREATE TABLE IF NOT EXISTS events (
-    id INTEGER PRIMARY KEY,
+    id INTEGER NOT NULL,
     username TEXT NOT NULL,
     title TEXT NOT NULL,
     time TEXT NOT NULL,
@@ -47,19 +231,262 @@ CREATE TABLE IF NOT EXISTS events (
     description TEXT NOT NULL,
     recurrence TEXT NOT NULL,
     created_at TEXT NOT NULL,
+    series_start TEXT,
+    series_end TEXT,
+    frequency TEXT,
+    PRIMARY KEY (username, id),
     FOREIGN KEY (username) REFERENCES users(username) ON DELETE CASCADE
+)"""
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    api_key TEXT UNIQUE NOT NULL,
+    password_salt TEXT NOT NULL,
+    password_hash TEXT NOT NULL,
+    iterations INTEGER NOT NULL,
+    enabled BOOLEAN NOT NULL DEFAULT TRUE,
+    created_at TEXT NOT NULL
 );
 
+CREATE INDEX IF NOT EXISTS idx_users_api_key ON users(api_key);
+""" + EVENTS_TABLE_SQL + """;
+
 CREATE INDEX IF NOT EXISTS idx_events_username ON events(username);
 CREATE INDEX IF NOT EXISTS idx_events_username_time ON events(username, time);
+
+CREATE TABLE IF NOT EXISTS event_counters (
+    username TEXT PRIMARY KEY,
+    next_id INTEGER NOT NULL,
+    FOREIGN KEY (username) REFERENCES users(username) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS user_metrics (
+    username TEXT PRIMARY KEY,
+    event_count INTEGER NOT NULL DEFAULT 0,
+    FOREIGN KEY (username) REFERENCES users(username) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS daily_metrics (
+    day TEXT NOT NULL,
+    shard INTEGER NOT NULL DEFAULT 0,
+    new_users INTEGER NOT NULL DEFAULT 0,
+    new_events INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, shard)
+);
+
+CREATE TABLE IF NOT EXISTS metric_totals (
+    name TEXT NOT NULL,
+    shard INTEGER NOT NULL DEFAULT 0,
+    value INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (name, shard)
+);
+
+CREATE TABLE IF NOT EXISTS token_revocations (
+    username TEXT NOT NULL,
+    token_id TEXT NOT NULL,
+    revoked_at BIGINT NOT NULL,
+    expires_at BIGINT NOT NULL,
+    PRIMARY KEY (username, token_id)
+);
 """
 
+# Recomputes every metrics table from users and events; init_schema runs it once to seed them.
+METRICS_REBUILD_SQL = (
+    "DELETE FROM user_metrics",
+    "DELETE FROM daily_metrics",
+    "DELETE FROM metric_totals",
+    "INSERT INTO user_metrics (username, event_count) "
+    "SELECT u.username, COUNT(e.id) FROM users u LEFT JOIN events e ON e.username = u.username GROUP BY u.username",
+    "INSERT INTO metric_totals (name, value) "
+    "SELECT 'users', COUNT(*) FROM users "
+    "UNION ALL SELECT 'events', COUNT(*) FROM events "
+    "UNION ALL SELECT 'active_api_keys', COUNT(*) FROM users WHERE enabled",
+    "INSERT INTO daily_metrics (day, new_users, new_events) "
+    "SELECT day, SUM(new_users), SUM(new_events) FROM ("
+    "SELECT substr(created_at, 1, 10) AS day, 1 AS new_users, 0 AS new_events FROM users "
+    "UNION ALL SELECT substr(created_at, 1, 10), 0, 1 FROM events"
+    ") AS created GROUP BY day",
+)
+
+# Writers spread the global and per-day counters over this many rows each, so concurrent
+# writes from different users rarely wait on the same row; readers sum the shards.
+METRIC_SHARDS = 16
+
+# Rebuilt on SQLite after the events table is recreated with its (username, id) key.
+EVENT_BASE_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_events_username ON events(username)",
+    "CREATE INDEX IF NOT EXISTS idx_events_username_time ON events(username, time)",
+)
+
+# Columns added after the initial schema; init_schema adds and backfills them on existing databases.
+EVENT_MIGRATION_COLUMNS = {"series_start": "TEXT", "series_end": "TEXT", "frequency": "TEXT"}
+# Indexes over migrated columns can only be created once those columns exist.
+EVENT_MIGRATION_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_events_username_series ON events(username, series_start, series_end)",
+    "CREATE INDEX IF NOT EXISTS idx_events_username_frequency ON events(username, frequency)",
+)
+
+USER_COLUMNS = "username, api_key, password_salt, password_hash, iterations, enabled, created_at"
+# Sort keys accepted by list_users_page; the event count comes from the maintained user_metrics row.
+USER_SORT_EXPRESSIONS = {
+    "username": "u.username",
+    "created_at": "u.created_at",
+    "event_count": "COALESCE(m.event_count, 0)",
+}
+
+
+def _user_from_row(row: Any) -> Dict[str, Any]:
+    return {
+        "username": row[0] if not hasattr(row, "keys") else row["username"],
+        "api_key": row[1] if not hasattr(row, "keys") else row["api_key"],
+        "password": {
+            "salt": row[2] if not hasattr(row, "keys") else row["password_salt"],
+            "hash": row[3] if not hasattr(row, "keys") else row["password_hash"],
+            "iterations": int(row[4] if not hasattr(row, "keys") else row["iterations"]),
+        },
+        "enabled": bool(row[5] if not hasattr(row, "keys") else row["enabled"]),
+        "created_at": row[6] if not hasattr(row, "keys") else row["created_at"],
+    }
+
+
+EVENT_COLUMNS = "id, title, time, end_time, location, description, recurrence, created_at"
+EVENT_FIELD_COLUMNS = ("title", "time", "end_time", "location", "description", "recurrence", "created_at")
+
+
+def _event_from_row(row: Any) -> Dict[str, Any]:
+    rec_raw = row[6] if not hasattr(row, "keys") else row["recurrence"]
+    return {
+        "id": int(row[0] if not hasattr(row, "keys") else row["id"]),
+        "title": row[1] if not hasattr(row, "keys") else row["title"],
+        "time": row[2] if not hasattr(row, "keys") else row["time"],
+        "end_time": row[3] if not hasattr(row, "keys") else row["end_time"],
+        "location": row[4] if not hasattr(row, "keys") else row["location"],
+        "description": row[5] if not hasattr(row, "keys") else row["description"],
+        "recurrence": json.loads(rec_raw),
+        "created_at": row[7] if not hasattr(row, "keys") else row["created_at"],
+    }
+
+
+EVENT_INSERT_COLUMNS = (
+    "id",
+    "username",
+    "title",
+    "time",
+    "end_time",
+    "location",
+    "description",
+    "recurrence",
+    "created_at",
+    "series_start",
+    "series_end",
+    "frequency",
+)
+SERIES_SOURCE_FIELDS = ("time", "end_time", "recurrence")
+DEFAULT_RECURRENCE = {"frequency": "none", "end_type": "never", "until": None, "count": None}
+EVENT_TIME_FORMAT = "%Y-%m-%dT%H:%M"
+# Longest gap between consecutive occurrences, used to bound count-limited series.
+MAX_PERIOD_DAYS = {"daily": 1, "weekly": 7, "monthly": 31, "yearly": 366}
+
+
+def _series_end(item: Dict[str, Any]) -> Optional[str]:
+    """Upper bound for when the last occurrence of ``item`` ends; None for series that never end."""
+    start_at = datetime.strptime(item["time"], EVENT_TIME_FORMAT)
+    end_at = datetime.strptime(item.get("end_time") or item["time"], EVENT_TIME_FORMAT)
+    duration = max(end_at - start_at, timedelta(0))
+    recurrence = item.get("recurrence") or DEFAULT_RECURRENCE
+    frequency = recurrence.get("frequency", "none")
+    try:
+        if frequency == "none":
+            last_start = start_at
+        elif recurrence.get("end_type") == "until" and recurrence.get("until"):
+            last_start = datetime.strptime(recurrence["until"], "%Y-%m-%d").replace(hour=23, minute=59)
+        elif recurrence.get("end_type") == "count" and recurrence.get("count"):
+            last_start = start_at + timedelta(days=MAX_PERIOD_DAYS[frequency] * (int(recurrence["count"]) - 1))
+        else:
+            return None
+        return (max(last_start, start_at) + duration).strftime(EVENT_TIME_FORMAT)
+    except (OverflowError, ValueError):
+        # A bound past datetime.max cannot narrow any range query, so store the series as open-ended.
+        return None
+
+
+def _series_columns(item: Dict[str, Any]) -> tuple[str, Optional[str], str]:
+    """Materialized ``(series_start, series_end, frequency)`` for an event."""
+    frequency = (item.get("recurrence") or DEFAULT_RECURRENCE).get("frequency", "none")
+    return item["time"], _series_end(item), frequency
+
+
+def _series_backfill(row: Any) -> tuple:
+    item = {"time": row[2], "end_time": row[3], "recurrence": json.loads(row[4])}
+    return (*_series_columns(item), row[0], row[1])
+
+
+def _event_insert_values(username: str, item_id: int, item: Dict[str, Any]) -> tuple:
+    return (
+        item_id,
+        username,
+        item["title"],
+        item["time"],
+        item.get("end_time", item["time"]),
+        item["location"],
+        item.get("description", ""),
+        json.dumps(item.get("recurrence", DEFAULT_RECURRENCE), ensure_ascii=False),
+        item.get("created_at", ""),
+        *_series_columns(item),
+    )
+
+
+USER_FIELD_COLUMNS = {
+    "api_key": "api_key",
+    "enabled": "enabled",
+    "created_at": "created_at",
+}
+
+
+def _day_counts(created_ats: Iterable[Optional[str]], sign: int = 1) -> Dict[str, int]:
+    """Signed row counts per creation date, the first ten characters of ISO ``created_at``."""
+    counts: Dict[str, int] = {}
+    for created_at in created_ats:
+        day = (created_at or "")[:10]
+        counts[day] = counts.get(day, 0) + sign
+    return counts
+
+
+def _merge_counts(*parts: Dict[str, int]) -> Dict[str, int]:
+    merged: Dict[str, int] = {}
+    for part in parts:
+        for key, value in part.items():
+            merged[key] = merged.get(key, 0) + value
+    return {key: value for key, value in merged.items() if value}
+
+
+def _is_integrity_error(error: BaseException) -> bool:
+    return any(cls.__name__ == "IntegrityError" for cls in type(error).__mro__)
+
+
+def _user_params(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten a user payload (as returned by load_users) into column values."""
+    params: Dict[str, Any] = {}
+    for field, column in USER_FIELD_COLUMNS.items():
+        if field in payload:
+            params[column] = payload[field]
+    if "password" in payload:
+        params["password_salt"] = payload["password"]["salt"]
+        params["password_hash"] = payload["password"]["hash"]
+        params["iterations"] = payload["password"]["iterations"]
+    return params
+
 
 class DatabaseStorage:
     def __init__(self, config: Optional[DBConfig] = None):
         self.config = config or self._load_config()
         self.database_url = self.config.database_url
         self._backend = self._detect_backend(self.database_url)
+        self._user_cache = LRUCache(self.config.user_cache_size, self.config.user_cache_ttl)
+        self._pool: Optional[ConnectionPool] = None
+        self._pool_lock = threading.Lock()
+        self._local = threading.local()
 
     @staticmethod
     def _load_config() -> DBConfig:
@@ -70,10 +497,29 @@ class DatabaseStorage:
             raise StorageConfigError(
                 "Database not configured. Please set DATABASE_URL (and SUPABASE_URL/SUPABASE_SERVICE_ROLE_KEY for Supabase deployment)."
             )
+        try:
+            user_cache_ttl = float(os.environ.get("USER_CACHE_TTL_SECONDS", "30"))
+            user_cache_size = int(os.environ.get("USER_CACHE_MAX_ENTRIES", "1024"))
+            freebusy_cache_ttl = float(os.environ.get("FREEBUSY_CACHE_TTL_SECONDS", "30"))
+            freebusy_cache_size = int(os.environ.get("FREEBUSY_CACHE_MAX_ENTRIES", "4096"))
+            pool_min_size = int(os.environ.get("DB_POOL_MIN_SIZE", "1"))
+            pool_max_size = int(os.environ.get("DB_POOL_MAX_SIZE", "10"))
+            pool_timeout = float(os.environ.get("DB_POOL_TIMEOUT_SECONDS", "10"))
+            pool_health_check_interval = float(os.environ.get("DB_POOL_HEALTH_CHECK_SECONDS", "30"))
+        except ValueError as exc:
+            raise StorageConfigError("USER_CACHE_*, FREEBUSY_CACHE_* and DB_POOL_* settings must be numeric.") from exc
         return DBConfig(
             database_url=database_url,
             supabase_url=supabase_url,
             supabase_service_role_key=supabase_service_role_key,
+            user_cache_ttl=user_cache_ttl,
+            user_cache_size=user_cache_size,
+            freebusy_cache_ttl=freebusy_cache_ttl,
+            freebusy_cache_size=freebusy_cache_size,
+            pool_min_size=pool_min_size,
+            pool_max_size=pool_max_size,
+            pool_timeout=pool_timeout,
+            pool_health_check_interval=pool_health_check_interval,
         )
 
     @staticmethod
@@ -86,18 +532,12 @@ class DatabaseStorage:
             return "postgres"
         raise StorageConfigError(f"Unsupported DATABASE_URL scheme: {scheme}")
 
-    @contextmanager
-    def connection(self) -> Generator[Any, None, None]:
+    def _connect(self) -> Any:
         if self._backend == "sqlite":
             conn = sqlite3.connect(self.database_url.replace("sqlite:///", ""), check_same_thread=False)
             conn.row_factory = sqlite3.Row
             conn.execute("PRAGMA foreign_keys = ON")
-            try:
-                yield conn
-                conn.commit()
-            finally:
-                conn.close()
-            return
+            return conn
 
         try:
             import psycopg
@@ -105,207 +545,813 @@ class DatabaseStorage:
             raise StorageConfigError(
                 "Postgres DATABASE_URL detected but psycopg is not installed. Install psycopg[binary]."
             ) from exc
+        return psycopg.connect(self.database_url)
+
+    def _get_pool(self) -> ConnectionPool:
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ConnectionPool(
+                        self._connect,
+                        min_size=self.config.pool_min_size,
+                        max_size=self.config.pool_max_size,
+                        timeout=self.config.pool_timeout,
+                        health_check_interval=self.config.pool_health_check_interval,
+                    )
+        return self._pool
 
-        conn = psycopg.connect(self.database_url)
+    @contextmanager
+    def connection(self) -> Generator[Any, None, None]:
+        joined = getattr(self._local, "conn", None)
+        if joined is not None:
+            # Inside schedule_transaction: the outer block commits or rolls back.
+            yield joined
+            return
+        pool = self._get_pool()
+        conn = pool.acquire()
         try:
             yield conn
             conn.commit()
-        finally:
-            conn.close()
+        except BaseException:
+            try:
+                conn.rollback()
+            except Exception:
+                pool.release(conn, broken=True)
+                raise
+            pool.release(conn)
+            raise
+        pool.release(conn)
+
+    @contextmanager
+    def schedule_transaction(self, username: str) -> Generator["DatabaseStorage", None, None]:
+        """Hold ``username``'s schedule write lock for the block; storage calls made in it share one transaction.
+
+        SQLite takes the database write lock up front (``BEGIN IMMEDIATE``). Postgres takes a
+        transaction-scoped advisory lock on the username, so other users' writers are not blocked.
+        """
+        if getattr(self._local, "conn", None) is not None:
+            raise StorageError("schedule transactions cannot be nested")
+        with self.connection() as conn:
+            if self._backend == "sqlite":
+                conn.execute("BEGIN IMMEDIATE")
+            else:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (f"events:{username}",))
+            self._local.conn = conn
+            try:
+                yield self
+            finally:
+                self._local.conn = None
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.close()
 
     def init_schema(self) -> None:
         with self.connection() as conn:
             if self._backend == "sqlite":
                 conn.executescript(SCHEMA_SQL)
+                self._migrate_event_keys(conn)
+                existing = {row["name"] for row in conn.execute("PRAGMA table_info(events)").fetchall()}
             else:
                 with conn.cursor() as cur:
                     for stmt in [segment.strip() for segment in SCHEMA_SQL.split(";") if segment.strip()]:
                         cur.execute(stmt)
+                self._migrate_event_keys(conn)
+                with conn.cursor() as cur:
+                    cur.execute("SELECT column_name FROM information_schema.columns WHERE table_name = 'events'")
+                    existing = {row[0] for row in cur.fetchall()}
+            added = [column for column in EVENT_MIGRATION_COLUMNS if column not in existing]
+            self._migrate_event_columns(conn, added)
+            self._sync_event_counters(conn)
+            if self._fetch_metric_totals(conn) == {}:
+                self._rebuild_metrics(conn)
+
+    def rebuild_metrics(self) -> None:
+        """Recompute the metrics tables from users and events, e.g. after editing rows by hand."""
+        with self.connection() as conn:
+            self._rebuild_metrics(conn)
+
+    def _rebuild_metrics(self, conn: Any) -> None:
+        if self._backend == "sqlite":
+            for stmt in METRICS_REBUILD_SQL:
+                conn.execute(stmt)
+        else:
+            with conn.cursor() as cur:
+                for stmt in METRICS_REBUILD_SQL:
+                    cur.execute(stmt)
+
+    def _fetch_metric_totals(self, conn: Any) -> Dict[str, int]:
+        if self._backend == "sqlite":
+            rows = conn.execute("SELECT name, SUM(value) FROM metric_totals GROUP BY name").fetchall()
+        else:
+            with conn.cursor() as cur:
+                cur.execute("SELECT name, SUM(value) FROM metric_totals GROUP BY name")
+                rows = cur.fetchall()
+        return {row[0]: int(row[1]) for row in rows}
+
+    def _bump_metrics(
+        self,
+        conn: Any,
+        username: Optional[str] = None,
+        new_users: Optional[Dict[str, int]] = None,
+        new_events: Optional[Dict[str, int]] = None,
+        active_api_keys: int = 0,
+    ) -> None:
+        """Apply signed deltas to the metrics tables inside the caller's transaction.
+
+        ``new_users`` and ``new_events`` map creation dates to row deltas; the totals follow from
+        their sums. With ``username`` the user's ``user_metrics`` row is upserted as well. Global and
+        per-day deltas land on one randomly chosen shard row.
+        """
+        placeholder = "?" if self._backend == "sqlite" else "%s"
+        shard = random.randrange(METRIC_SHARDS)
+        new_users = new_users or {}
+        new_events = new_events or {}
+        event_delta = sum(new_events.values())
+        statements: list[tuple[str, list[tuple]]] = []
+        totals = [
+            (name, shard, delta)
+            for name, delta in (("users", sum(new_users.values())), ("events", event_delta), ("active_api_keys", active_api_keys))
+            if delta
+        ]
+        if totals:
+            statements.append((
+                f"INSERT INTO metric_totals (name, shard, value) VALUES ({placeholder}, {placeholder}, {placeholder}) "
+                "ON CONFLICT (name, shard) DO UPDATE SET value = metric_totals.value + excluded.value",
+                totals,
+            ))
+        if username is not None:
+            statements.append((
+                f"INSERT INTO user_metrics (username, event_count) VALUES ({placeholder}, {placeholder}) "
+                "ON CONFLICT (username) DO UPDATE SET event_count = user_metrics.event_count + excluded.event_count",
+                [(username, event_delta)],
+            ))
+        days = [
+            (day, shard, new_users.get(day, 0), new_events.get(day, 0))
+            for day in sorted(set(new_users) | set(new_events))
+            if new_users.get(day) or new_events.get(day)
+        ]
+        if days:
+            statements.append((
+                f"INSERT INTO daily_metrics (day, shard, new_users, new_events) "
+                f"VALUES ({placeholder}, {placeholder}, {placeholder}, {placeholder}) "
+                "ON CONFLICT (day, shard) DO UPDATE SET new_users = daily_metrics.new_users + excluded.new_users, "
+                "new_events = daily_metrics.new_events + excluded.new_events",
+                days,
+            ))
+        if self._backend == "sqlite":
+            for sql, rows in statements:
+                conn.executemany(sql, rows)
+        else:
+            with conn.cursor() as cur:
+                for sql, rows in statements:
+                    cur.executemany(sql, rows)
+
+    def _event_days(self, conn: Any, username: str, item_id: Optional[int] = None, sign: int = 1) -> Dict[str, int]:
+        """Signed creation-date counts of ``username``'s stored events, or of one event."""
+        placeholder = "?" if self._backend == "sqlite" else "%s"
+        sql = f"SELECT substr(created_at, 1, 10), COUNT(*) FROM events WHERE username={placeholder}"
+        params: tuple = (username,)
+        if item_id is not None:
+            sql += f" AND id={placeholder}"
+            params = (username, item_id)
+        sql += " GROUP BY substr(created_at, 1, 10)"
+        if self._backend == "sqlite":
+            rows = conn.execute(sql, params).fetchall()
+        else:
+            with conn.cursor() as cur:
+                cur.execute(sql, params)
+                rows = cur.fetchall()
+        return {row[0]: sign * int(row[1]) for row in rows}
+
+    def _user_state(self, conn: Any, username: str) -> Optional[tuple[bool, str]]:
+        """``(enabled, created_at)`` of one user, read inside the caller's transaction."""
+        if self._backend == "sqlite":
+            row = conn.execute("SELECT enabled, created_at FROM users WHERE username=?", (username,)).fetchone()
+        else:
+            with conn.cursor() as cur:
+                cur.execute("SELECT enabled, created_at FROM users WHERE username=%s", (username,))
+                row = cur.fetchone()
+        return (bool(row[0]), row[1]) if row else None
+
+    def _migrate_event_keys(self, conn: Any) -> None:
+        """Re-key events from a global ``id`` to ``(username, id)``, keeping existing ids.
+
+        SQLite cannot alter a primary key, so the table is rebuilt inside the init transaction;
+        Postgres swaps the constraint in place.
+        """
+        if self._backend == "sqlite":
+            columns = {row["name"]: row["pk"] for row in conn.execute("PRAGMA table_info(events)").fetchall()}
+            if columns.get("username"):
+                return
+            conn.execute("BEGIN")
+            conn.execute(EVENTS_TABLE_SQL.replace("CREATE TABLE IF NOT EXISTS events (", "CREATE TABLE events_rekeyed ("))
+            shared = ", ".join(column for column in columns if column in EVENT_INSERT_COLUMNS)
+            conn.execute(f"INSERT INTO events_rekeyed ({shared}) SELECT {shared} FROM events")
+            conn.execute("DROP TABLE events")
+            conn.execute("ALTER TABLE events_rekeyed RENAME TO events")
+            for stmt in EVENT_BASE_INDEXES:
+                conn.execute(stmt)
+            return
+
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT tc.constraint_name, kcu.column_name FROM information_schema.table_constraints tc "
+                "JOIN information_schema.key_column_usage kcu "
+                "ON kcu.constraint_name = tc.constraint_name AND kcu.table_name = tc.table_name "
+                "WHERE tc.table_name = 'events' AND tc.constraint_type = 'PRIMARY KEY'"
+            )
+            rows = cur.fetchall()
+            if any(row[1] == "username" for row in rows):
+                return
+            if rows:
+                cur.execute(f'ALTER TABLE events DROP CONSTRAINT "{rows[0][0]}"')
+            cur.execute("ALTER TABLE events ADD PRIMARY KEY (username, id)")
+
+    def _sync_event_counters(self, conn: Any) -> None:
+        """Raise id counters to at least one past each user's highest stored event id."""
+        greatest = "MAX" if self._backend == "sqlite" else "GREATEST"
+        # SQLite needs a WHERE clause to tell the upsert's ON CONFLICT apart from a join constraint.
+        sql = (
+            "INSERT INTO event_counters (username, next_id) "
+            "SELECT username, MAX(id) + 1 FROM events WHERE true GROUP BY username "
+            f"ON CONFLICT (username) DO UPDATE SET next_id = {greatest}(event_counters.next_id, excluded.next_id)"
+        )
+        if self._backend == "sqlite":
+            conn.execute(sql)
+        else:
+            with conn.cursor() as cur:
+                cur.execute(sql)
+
+    def _migrate_event_columns(self, conn: Any, columns: list[str]) -> None:
+        """Add derived event columns to an existing table and backfill rows that predate them.
+
+        Rows are backfilled whenever ``series_start`` is missing, which also covers databases
+        where the columns were added by hand from ``migrations/schema.sql``.
+        """
+        placeholder = "?" if self._backend == "sqlite" else "%s"
+        select_sql = "SELECT username, id, time, end_time, recurrence FROM events WHERE series_start IS NULL"
+        update_sql = (
+            f"UPDATE events SET series_start={placeholder}, series_end={placeholder}, frequency={placeholder} "
+            f"WHERE username={placeholder} AND id={placeholder}"
+        )
+        if self._backend == "sqlite":
+            for column in columns:
+                conn.execute(f"ALTER TABLE events ADD COLUMN {column} {EVENT_MIGRATION_COLUMNS[column]}")
+            for stmt in EVENT_MIGRATION_INDEXES:
+                conn.execute(stmt)
+            rows = conn.execute(select_sql).fetchall()
+            conn.executemany(update_sql, [_series_backfill(row) for row in rows])
+        else:
+            with conn.cursor() as cur:
+                for column in columns:
+                    cur.execute(f"ALTER TABLE events ADD COLUMN IF NOT EXISTS {column} {EVENT_MIGRATION_COLUMNS[column]}")
+                for stmt in EVENT_MIGRATION_INDEXES:
+                    cur.execute(stmt)
+                cur.execute(select_sql)
+                rows = cur.fetchall()
+                cur.executemany(update_sql, [_series_backfill(row) for row in rows])
 
     def load_users(self) -> Dict[str, Dict[str, Any]]:
         with self.connection() as conn:
             if self._backend == "sqlite":
-                rows = conn.execute("SELECT * FROM users").fetchall()
+                rows = conn.execute(f"SELECT {USER_COLUMNS} FROM users").fetchall()
             else:
                 with conn.cursor() as cur:
-                    cur.execute("SELECT username, api_key, password_salt, password_hash, iterations, enabled, created_at FROM users")
+                    cur.execute(f"SELECT {USER_COLUMNS} FROM users")
                     rows = cur.fetchall()
         users: Dict[str, Dict[str, Any]] = {}
         for row in rows:
-            username = row[0] if not hasattr(row, "keys") else row["username"]
-            users[username] = {
-                "api_key": row[1] if not hasattr(row, "keys") else row["api_key"],
-                "password": {
-                    "salt": row[2] if not hasattr(row, "keys") else row["password_salt"],
-                    "hash": row[3] if not hasattr(row, "keys") else row["password_hash"],
-                    "iterations": int(row[4] if not hasattr(row, "keys") else row["iterations"]),
-                },
-                "enabled": bool(row[5] if not hasattr(row, "keys") else row["enabled"]),
-                "created_at": row[6] if not hasattr(row, "keys") else row["created_at"],
-            }
+            payload = _user_from_row(row)
+            users[payload["username"]] = payload
         return users
 
-    def save_users(self, users: Dict[str, Dict[str, Any]]) -> None:
+    def list_users_page(
+        self,
+        search: Optional[str] = None,
+        enabled: Optional[bool] = None,
+        sort: str = "username",
+        descending: bool = False,
+        limit: Optional[int] = None,
+        after: Optional[tuple[Any, str]] = None,
+    ) -> tuple[list[Dict[str, Any]], int]:
+        """One page of users with their ``event_count``, and the number of users matching the filters.
+
+        ``search`` is a case-insensitive username substring. Pages are keyed on ``(sort value, username)``,
+        so ``after`` is the pair from the previous page's last row. Event counts and the unfiltered
+        total come from the metrics tables rather than from counting events.
+        """
+        if sort not in USER_SORT_EXPRESSIONS:
+            raise ValueError(f"unsupported sort: {sort}")
+        placeholder = "?" if self._backend == "sqlite" else "%s"
+        sort_expression = USER_SORT_EXPRESSIONS[sort]
+        columns = ", ".join(f"u.{column.strip()}" for column in USER_COLUMNS.split(","))
+
+        filters: list[str] = []
+        params: list[Any] = []
+        if search:
+            escaped = search.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            filters.append(f"lower(u.username) LIKE {placeholder} ESCAPE '\\'")
+            params.append(f"%{escaped}%")
+        if enabled is not None:
+            filters.append(f"u.enabled={placeholder}")
+            params.append(enabled)
+        where = f" WHERE {' AND '.join(filters)}" if filters else ""
+
+        page_filters = list(filters)
+        page_params = list(params)
+        if after:
+            op = "<" if descending else ">"
+            page_filters.append(
+                f"({sort_expression}{op}{placeholder} OR ({sort_expression}={placeholder} AND u.username{op}{placeholder}))"
+            )
+            page_params.extend([after[0], after[0], after[1]])
+        direction = "DESC" if descending else "ASC"
+        sql = (
+            f"SELECT {columns}, {USER_SORT_EXPRESSIONS['event_count']} AS event_count "
+            "FROM users u LEFT JOIN user_metrics m ON m.username = u.username"
+        )
+        if page_filters:
+            sql += f" WHERE {' AND '.join(page_filters)}"
+        sql += f" ORDER BY {sort_expression} {direction}, u.username {direction}"
+        if limit:
+            sql += f" LIMIT {placeholder}"
+            page_params.append(limit)
+        count_sql = f"SELECT COUNT(*) FROM users u{where}"
+
         with self.connection() as conn:
             if self._backend == "sqlite":
-                conn.execute("DELETE FROM users")
-                for username, payload in users.items():
-                    conn.execute(
-                        """
-                        INSERT INTO users (username, api_key, password_salt, password_hash, iterations, enabled, created_at)
-                        VALUES (?, ?, ?, ?, ?, ?, ?)
-                        """,
-                        (
-                            username,
-                            payload["api_key"],
-                            payload["password"]["salt"],
-                            payload["password"]["hash"],
-                            payload["password"]["iterations"],
-                            1 if payload.get("enabled", True) else 0,
-                            payload.get("created_at", ""),
-                        ),
-                    )
+                rows = conn.execute(sql, tuple(page_params)).fetchall()
+                total = conn.execute(count_sql, tuple(params)).fetchone()[0] if filters else None
+            else:
+                with conn.cursor() as cur:
+                    cur.execute(sql, tuple(page_params))
+                    rows = cur.fetchall()
+                    if filters:
+                        cur.execute(count_sql, tuple(params))
+                        total = cur.fetchone()[0]
+                    else:
+                        total = None
+            if total is None:
+                total = self._fetch_metric_totals(conn).get("users", 0)
+        users = []
+        for row in rows:
+            payload = _user_from_row(row)
+            payload["event_count"] = int(row["event_count"] if hasattr(row, "keys") else row[7])
+            users.append(payload)
+        return users, int(total)
+
+    def get_user(self, username: str) -> Optional[Dict[str, Any]]:
+        cached = self._user_cache.get(("username", username))
+        if cached is not None:
+            return cached
+        with self.connection() as conn:
+            if self._backend == "sqlite":
+                row = conn.execute(f"SELECT {USER_COLUMNS} FROM users WHERE username=?", (username,)).fetchone()
+            else:
+                with conn.cursor() as cur:
+                    cur.execute(f"SELECT {USER_COLUMNS} FROM users WHERE username=%s", (username,))
+                    row = cur.fetchone()
+        if not row:
+            return None
+        payload = _user_from_row(row)
+        self._user_cache.set(("username", username), payload)
+        return payload
+
+    def get_user_by_api_key(self, api_key: str) -> Optional[Dict[str, Any]]:
+        """Point lookup served by ``idx_users_api_key``."""
+        cached = self._user_cache.get(("api_key", api_key))
+        if cached is not None:
+            return cached
+        with self.connection() as conn:
+            if self._backend == "sqlite":
+                row = conn.execute(f"SELECT {USER_COLUMNS} FROM users WHERE api_key=?", (api_key,)).fetchone()
+            else:
+                with conn.cursor() as cur:
+                    cur.execute(f"SELECT {USER_COLUMNS} FROM users WHERE api_key=%s", (api_key,))
+                    row = cur.fetchone()
+        if not row:
+            return None
+        payload = _user_from_row(row)
+        self._user_cache.set(("api_key", api_key), payload)
+        return payload
+
+    def invalidate_user(self, username: Optional[str] = None) -> None:
+        """Drop cached lookups for ``username`` (by name and by API key), or everything when omitted."""
+        if username is None:
+            self._user_cache.clear()
+            return
+        self._user_cache.discard_where(lambda _key, payload: payload["username"] == username)
+
+    def cache_stats(self) -> Dict[str, int]:
+        return self._user_cache.stats()
+
+    def creation_totals(self, day: str) -> Dict[str, int]:
+        """Total users, events and enabled API keys, and the users and events created on ``day``.
+
+        Reads the maintained metrics tables, so the cost does not grow with the data.
+        """
+        placeholder = "?" if self._backend == "sqlite" else "%s"
+        sql = f"SELECT SUM(new_users), SUM(new_events) FROM daily_metrics WHERE day={placeholder}"
+        with self.connection() as conn:
+            totals = self._fetch_metric_totals(conn)
+            if self._backend == "sqlite":
+                row = conn.execute(sql, (day,)).fetchone()
+            else:
+                with conn.cursor() as cur:
+                    cur.execute(sql, (day,))
+                    row = cur.fetchone()
+        return {
+            "total_users": totals.get("users", 0),
+            "total_events": totals.get("events", 0),
+            "active_api_keys": totals.get("active_api_keys", 0),
+            "today_new_users": int(row[0] or 0) if row else 0,
+            "today_new_events": int(row[1] or 0) if row else 0,
+        }
+
+    def creation_histogram(self, first_day: str, last_day: str) -> Dict[str, Dict[str, int]]:
+        """Per-day creation counts for users and events between two dates (inclusive, ``YYYY-MM-DD``).
+
+        Days without any new rows are absent.
+        """
+        placeholder = "?" if self._backend == "sqlite" else "%s"
+        sql = (
+            "SELECT day, SUM(new_users), SUM(new_events) FROM daily_metrics "
+            f"WHERE day>={placeholder} AND day<={placeholder} GROUP BY day"
+        )
+        with self.connection() as conn:
+            if self._backend == "sqlite":
+                rows = conn.execute(sql, (first_day, last_day)).fetchall()
+            else:
+                with conn.cursor() as cur:
+                    cur.execute(sql, (first_day, last_day))
+                    rows = cur.fetchall()
+        return {
+            "users": {row[0]: int(row[1]) for row in rows if row[1]},
+            "events": {row[0]: int(row[2]) for row in rows if row[2]},
+        }
+
+    def insert_user(self, username: str, payload: Dict[str, Any]) -> None:
+        params = {
+            "username": username,
+            "enabled": True,
+            "created_at": "",
+            **_user_params(payload),
+        }
+        placeholder = "?" if self._backend == "sqlite" else "%s"
+        columns = ", ".join(params)
+        values = ", ".join(placeholder for _ in params)
+        sql = f"INSERT INTO users ({columns}) VALUES ({values})"
+        try:
+            with self.connection() as conn:
+                if self._backend == "sqlite":
+                    conn.execute(sql, tuple(params.values()))
+                else:
+                    with conn.cursor() as cur:
+                        cur.execute(sql, tuple(params.values()))
+                self._bump_metrics(
+                    conn,
+                    username,
+                    new_users=_day_counts([params["created_at"]]),
+                    active_api_keys=1 if params["enabled"] else 0,
+                )
+        except Exception as exc:
+            if _is_integrity_error(exc):
+                raise UserExistsError(f"User {username} already exists") from exc
+            raise
+
+    def update_user_fields(self, username: str, fields: Dict[str, Any]) -> bool:
+        """Update only the given fields (``api_key``, ``password``, ``enabled``, ``created_at``) of one user."""
+        params = _user_params(fields)
+        if not params:
+            return False
+        placeholder = "?" if self._backend == "sqlite" else "%s"
+        assignments = ", ".join(f"{column}={placeholder}" for column in params)
+        sql = f"UPDATE users SET {assignments} WHERE username={placeholder}"
+        with self.connection() as conn:
+            before = self._user_state(conn, username) if {"enabled", "created_at"} & set(params) else None
+            if self._backend == "sqlite":
+                updated = conn.execute(sql, (*params.values(), username)).rowcount
+            else:
+                with conn.cursor() as cur:
+                    cur.execute(sql, (*params.values(), username))
+                    updated = cur.rowcount
+            if updated and before:
+                enabled, created_at = before
+                self._bump_metrics(
+                    conn,
+                    new_users=_merge_counts(
+                        _day_counts([created_at], sign=-1),
+                        _day_counts([params.get("created_at", created_at)]),
+                    ),
+                    active_api_keys=int(bool(params.get("enabled", enabled))) - int(enabled),
+                )
+        return updated > 0
+
+    def toggle_user_enabled(self, username: str) -> Optional[bool]:
+        """Flip ``enabled`` in one statement and return the new value, or ``None`` for an unknown user."""
+        placeholder = "?" if self._backend == "sqlite" else "%s"
+        sql = f"UPDATE users SET enabled = NOT enabled WHERE username={placeholder} RETURNING enabled"
+        with self.connection() as conn:
+            if self._backend == "sqlite":
+                row = conn.execute(sql, (username,)).fetchone()
             else:
                 with conn.cursor() as cur:
-                    cur.execute("DELETE FROM users")
-                    for username, payload in users.items():
-                        cur.execute(
-                            """
-                            INSERT INTO users (username, api_key, password_salt, password_hash, iterations, enabled, created_at)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s)
-                            """,
-                            (
-                                username,
-                                payload["api_key"],
-                                payload["password"]["salt"],
-                                payload["password"]["hash"],
-                                payload["password"]["iterations"],
-                                payload.get("enabled", True),
-                                payload.get("created_at", ""),
-                            ),
-                        )
+                    cur.execute(sql, (username,))
+                    row = cur.fetchone()
+            if row is None:
+                return None
+            enabled = bool(row[0])
+            self._bump_metrics(conn, active_api_keys=1 if enabled else -1)
+        self.invalidate_user(username)
+        return enabled
+
+    def delete_user(self, username: str) -> bool:
+        """Delete one user; their events go with them through ``ON DELETE CASCADE``."""
+        with self.connection() as conn:
+            before = self._user_state(conn, username)
+            event_days = self._event_days(conn, username, sign=-1) if before else {}
+            if self._backend == "sqlite":
+                deleted = conn.execute("DELETE FROM users WHERE username=?", (username,)).rowcount
+            else:
+                with conn.cursor() as cur:
+                    cur.execute("DELETE FROM users WHERE username=%s", (username,))
+                    deleted = cur.rowcount
+            if deleted and before:
+                enabled, created_at = before
+                self._bump_metrics(
+                    conn,
+                    new_users=_day_counts([created_at], sign=-1),
+                    new_events=event_days,
+                    active_api_keys=-int(enabled),
+                )
+        return deleted > 0
+
+    def revoke_token(self, username: str, token_id: str, revoked_at: int, expires_at: int) -> None:
+        """Record a revoked bearer token and drop entries whose tokens have expired anyway.
+
+        ``token_id`` ``"*"`` revokes every token issued to ``username`` up to ``revoked_at``.
+        Times are epoch milliseconds.
+        """
+        placeholder = "?" if self._backend == "sqlite" else "%s"
+        upsert_sql = (
+            "INSERT INTO token_revocations (username, token_id, revoked_at, expires_at) "
+            f"VALUES ({placeholder}, {placeholder}, {placeholder}, {placeholder}) "
+            "ON CONFLICT (username, token_id) DO UPDATE SET revoked_at = excluded.revoked_at, expires_at = excluded.expires_at"
+        )
+        prune_sql = f"DELETE FROM token_revocations WHERE expires_at<{placeholder}"
+        with self.connection() as conn:
+            if self._backend == "sqlite":
+                conn.execute(upsert_sql, (username, token_id, revoked_at, expires_at))
+                conn.execute(prune_sql, (revoked_at,))
+            else:
+                with conn.cursor() as cur:
+                    cur.execute(upsert_sql, (username, token_id, revoked_at, expires_at))
+                    cur.execute(prune_sql, (revoked_at,))
+
+    def load_token_revocations(self, now: int) -> list[tuple[str, str, int]]:
+        """``(username, token_id, revoked_at)`` for revocations still relevant at ``now`` (epoch ms)."""
+        placeholder = "?" if self._backend == "sqlite" else "%s"
+        sql = f"SELECT username, token_id, revoked_at FROM token_revocations WHERE expires_at>={placeholder}"
+        with self.connection() as conn:
+            if self._backend == "sqlite":
+                rows = conn.execute(sql, (now,)).fetchall()
+            else:
+                with conn.cursor() as cur:
+                    cur.execute(sql, (now,))
+                    rows = cur.fetchall()
+        return [(row[0], row[1], int(row[2])) for row in rows]
 
     def load_schedule(self, username: str) -> Dict[str, Any]:
         with self.connection() as conn:
             if self._backend == "sqlite":
                 rows = conn.execute(
-                    "SELECT id, title, time, end_time, location, description, recurrence, created_at FROM events WHERE username=? ORDER BY id",
+                    f"SELECT {EVENT_COLUMNS} FROM events WHERE username=? ORDER BY id",
                     (username,),
                 ).fetchall()
+                counter = conn.execute("SELECT next_id FROM event_counters WHERE username=?", (username,)).fetchone()
             else:
                 with conn.cursor() as cur:
                     cur.execute(
-                        "SELECT id, title, time, end_time, location, description, recurrence, created_at FROM events WHERE username=%s ORDER BY id",
+                        f"SELECT {EVENT_COLUMNS} FROM events WHERE username=%s ORDER BY id",
                         (username,),
                     )
                     rows = cur.fetchall()
-        items = []
-        max_id = 0
+                    cur.execute("SELECT next_id FROM event_counters WHERE username=%s", (username,))
+                    counter = cur.fetchone()
+        items = [_event_from_row(row) for row in rows]
+        # Ids are never reused, so the counter can be ahead of the highest remaining id.
+        max_id = max((item["id"] for item in items), default=0)
+        return {"next_id": max(max_id + 1, int(counter[0]) if counter else 1), "items": items}
+
+    def iter_events(self, username: str, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """All of ``username``'s events in id order, read in keyset pages so memory stays bounded."""
+        placeholder = "?" if self._backend == "sqlite" else "%s"
+        sql = (
+            f"SELECT {EVENT_COLUMNS} FROM events WHERE username={placeholder} AND id>{placeholder} "
+            f"ORDER BY id LIMIT {placeholder}"
+        )
+        after_id = 0
+        while True:
+            with self.connection() as conn:
+                if self._backend == "sqlite":
+                    rows = conn.execute(sql, (username, after_id, batch_size)).fetchall()
+                else:
+                    with conn.cursor() as cur:
+                        cur.execute(sql, (username, after_id, batch_size))
+                        rows = cur.fetchall()
+            for row in rows:
+                item = _event_from_row(row)
+                after_id = item["id"]
+                yield item
+            if len(rows) < batch_size:
+                return
+
+    def load_events_page(
+        self,
+        username: str,
+        limit: Optional[int],
+        after: Optional[tuple[str, int]] = None,
+    ) -> list[Dict[str, Any]]:
+        """Up to ``limit`` events ordered by ``(time, id)``, starting after the ``after`` key.
+
+        Times are stored as ``YYYY-MM-DDTHH:MM`` strings, so the keyset compares them directly
+        and walks ``idx_events_username_time`` instead of offsetting through earlier rows.
+        """
+        placeholder = "?" if self._backend == "sqlite" else "%s"
+        sql = f"SELECT {EVENT_COLUMNS} FROM events WHERE username={placeholder}"
+        params: list[Any] = [username]
+        if after:
+            sql += f" AND (time>{placeholder} OR (time={placeholder} AND id>{placeholder}))"
+            params.extend([after[0], after[0], after[1]])
+        sql += " ORDER BY time, id"
+        if limit:
+            sql += f" LIMIT {placeholder}"
+            params.append(limit)
+        with self.connection() as conn:
+            if self._backend == "sqlite":
+                rows = conn.execute(sql, tuple(params)).fetchall()
+            else:
+                with conn.cursor() as cur:
+                    cur.execute(sql, tuple(params))
+                    rows = cur.fetchall()
+        return [_event_from_row(row) for row in rows]
+
+    def _series_range_clauses(self, start: Optional[str], end: Optional[str], recurring: Optional[bool]) -> tuple[list[str], list[Any]]:
+        placeholder = "?" if self._backend == "sqlite" else "%s"
+        clauses: list[str] = []
+        params: list[Any] = []
+        if end:
+            clauses.append(f"series_start<={placeholder}")
+            params.append(end)
+        if start:
+            clauses.append(f"(series_end IS NULL OR series_end>{placeholder})")
+            params.append(start)
+        if recurring is not None:
+            clauses.append("frequency<>'none'" if recurring else "frequency='none'")
+        return clauses, params
+
+    def load_schedule_range(
+        self,
+        username: str,
+        start: Optional[str],
+        end: Optional[str],
+        recurring: Optional[bool] = None,
+    ) -> list[Dict[str, Any]]:
+        """Events that may have an occurrence overlapping ``[start, end]`` (``YYYY-MM-DDTHH:MM`` bounds, None for open).
+
+        One-off events are filtered exactly; recurring series are kept when their span from
+        ``series_start`` to ``series_end`` could intersect the window, so callers still expand them.
+        ``recurring`` restricts the result to series (True) or one-off events (False).
+        """
+        return self.load_schedules_range([username], start, end, recurring).get(username, [])
+
+    def load_schedules_range(
+        self,
+        usernames: list[str],
+        start: Optional[str],
+        end: Optional[str],
+        recurring: Optional[bool] = None,
+    ) -> Dict[str, list[Dict[str, Any]]]:
+        """``load_schedule_range`` for several users in one query, keyed by username."""
+        result: Dict[str, list[Dict[str, Any]]] = {username: [] for username in usernames}
+        if not usernames:
+            return result
+        placeholder = "?" if self._backend == "sqlite" else "%s"
+        clauses, params = self._series_range_clauses(start, end, recurring)
+        if len(usernames) == 1:
+            clauses.insert(0, f"username={placeholder}")
+        else:
+            clauses.insert(0, f"username IN ({', '.join([placeholder] * len(usernames))})")
+        params = [*usernames, *params]
+        sql = f"SELECT {EVENT_COLUMNS}, username FROM events WHERE {' AND '.join(clauses)} ORDER BY series_start, id"
+        with self.connection() as conn:
+            if self._backend == "sqlite":
+                rows = conn.execute(sql, tuple(params)).fetchall()
+            else:
+                with conn.cursor() as cur:
+                    cur.execute(sql, tuple(params))
+                    rows = cur.fetchall()
         for row in rows:
-            item_id = int(row[0] if not hasattr(row, "keys") else row["id"])
-            max_id = max(max_id, item_id)
-            rec_raw = row[6] if not hasattr(row, "keys") else row["recurrence"]
-            items.append(
-                {
-                    "id": item_id,
-                    "title": row[1] if not hasattr(row, "keys") else row["title"],
-                    "time": row[2] if not hasattr(row, "keys") else row["time"],
-                    "end_time": row[3] if not hasattr(row, "keys") else row["end_time"],
-                    "location": row[4] if not hasattr(row, "keys") else row["location"],
-                    "description": row[5] if not hasattr(row, "keys") else row["description"],
-                    "recurrence": json.loads(rec_raw),
-                    "created_at": row[7] if not hasattr(row, "keys") else row["created_at"],
-                }
-            )
-        return {"next_id": max_id + 1, "items": items}
+            result[row["username"] if hasattr(row, "keys") else row[8]].append(_event_from_row(row))
+        return result
 
-    def create_event(self, username: str, item: Dict[str, Any]) -> Dict[str, Any]:
+    def get_event(self, username: str, item_id: int) -> Optional[Dict[str, Any]]:
         with self.connection() as conn:
             if self._backend == "sqlite":
-                conn.execute("BEGIN IMMEDIATE")
-                row = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 AS next_id FROM events WHERE username=?", (username,)).fetchone()
-                next_id = int(row[0])
-                conn.execute(
-                    """
-                    INSERT INTO events (id, username, title, time, end_time, location, description, recurrence, created_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (
-                        next_id,
-                        username,
-                        item["title"],
-                        item["time"],
-                        item["end_time"],
-                        item["location"],
-                        item["description"],
-                        json.dumps(item.get("recurrence", {"frequency": "none", "end_type": "never", "until": None, "count": None}), ensure_ascii=False),
-                        item["created_at"],
-                    ),
-                )
+                row = conn.execute(
+                    f"SELECT {EVENT_COLUMNS} FROM events WHERE username=? AND id=?",
+                    (username, item_id),
+                ).fetchone()
             else:
                 with conn.cursor() as cur:
-                    cur.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM events WHERE username=%s FOR UPDATE", (username,))
-                    next_id = int(cur.fetchone()[0])
-                    cur.execute(
-                        """
-                        INSERT INTO events (id, username, title, time, end_time, location, description, recurrence, created_at)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                        """,
-                        (
-                            next_id,
-                            username,
-                            item["title"],
-                            item["time"],
-                            item["end_time"],
-                            item["location"],
-                            item["description"],
-                            json.dumps(item.get("recurrence", {"frequency": "none", "end_type": "never", "until": None, "count": None}), ensure_ascii=False),
-                            item["created_at"],
-                        ),
-                    )
-        return {"id": next_id, **item}
+                    cur.execute(f"SELECT {EVENT_COLUMNS} FROM events WHERE username=%s AND id=%s", (username, item_id))
+                    row = cur.fetchone()
+        return _event_from_row(row) if row else None
 
-    def save_schedule(self, username: str, data: Dict[str, Any]) -> None:
-        items = data.get("items", [])
+    def update_event(self, username: str, item_id: int, fields: Dict[str, Any]) -> bool:
+        """Write only ``fields`` of one event with a single UPDATE; returns False when it does not exist."""
+        params = {column: fields[column] for column in EVENT_FIELD_COLUMNS if column in fields}
+        if not params:
+            return self.get_event(username, item_id) is not None
+        timing = {key: fields[key] for key in SERIES_SOURCE_FIELDS if key in fields}
+        if timing and len(timing) < len(SERIES_SOURCE_FIELDS):
+            current = self.get_event(username, item_id)
+            if not current:
+                return False
+            timing = {key: timing.get(key, current[key]) for key in SERIES_SOURCE_FIELDS}
+        if timing:
+            params["series_start"], params["series_end"], params["frequency"] = _series_columns(timing)
+        if "recurrence" in params:
+            params["recurrence"] = json.dumps(params["recurrence"], ensure_ascii=False)
+        placeholder = "?" if self._backend == "sqlite" else "%s"
+        assignments = ", ".join(f"{column}={placeholder}" for column in params)
+        sql = f"UPDATE events SET {assignments} WHERE username={placeholder} AND id={placeholder}"
         with self.connection() as conn:
+            previous_days = self._event_days(conn, username, item_id, sign=-1) if "created_at" in params else {}
             if self._backend == "sqlite":
-                conn.execute("DELETE FROM events WHERE username=?", (username,))
-                for item in items:
-                    conn.execute(
-                        """
-                        INSERT INTO events (id, username, title, time, end_time, location, description, recurrence, created_at)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """,
-                        (
-                            item["id"],
-                            username,
-                            item["title"],
-                            item["time"],
-                            item.get("end_time", item["time"]),
-                            item["location"],
-                            item.get("description", ""),
-                            json.dumps(item.get("recurrence", {"frequency": "none", "end_type": "never", "until": None, "count": None}), ensure_ascii=False),
-                            item.get("created_at", ""),
-                        ),
-                    )
+                updated = conn.execute(sql, (*params.values(), username, item_id)).rowcount
+            else:
+                with conn.cursor() as cur:
+                    cur.execute(sql, (*params.values(), username, item_id))
+                    updated = cur.rowcount
+            if updated and previous_days:
+                self._bump_metrics(conn, new_events=_merge_counts(previous_days, _day_counts([params["created_at"]])))
+        return updated > 0
+
+    def delete_event(self, username: str, item_id: int) -> bool:
+        with self.connection() as conn:
+            event_days = self._event_days(conn, username, item_id, sign=-1)
+            if self._backend == "sqlite":
+                deleted = conn.execute("DELETE FROM events WHERE username=? AND id=?", (username, item_id)).rowcount
+            else:
+                with conn.cursor() as cur:
+                    cur.execute("DELETE FROM events WHERE username=%s AND id=%s", (username, item_id))
+                    deleted = cur.rowcount
+            if deleted:
+                self._bump_metrics(conn, username, new_events=event_days)
+        return deleted > 0
+
+    def _insert_sql(self) -> str:
+        placeholder = "?" if self._backend == "sqlite" else "%s"
+        return f"INSERT INTO events ({', '.join(EVENT_INSERT_COLUMNS)}) VALUES ({', '.join(placeholder for _ in EVENT_INSERT_COLUMNS)})"
+
+    def _allocate_event_ids(self, conn: Any, username: str, count: int = 1) -> int:
+        """Reserve ``count`` consecutive ids from ``username``'s counter row and return the first.
+
+        The upsert locks only that user's counter row.
+        """
+        if self._backend == "sqlite":
+            conn.execute(
+                "INSERT INTO event_counters (username, next_id) VALUES (?, ?) "
+                "ON CONFLICT (username) DO UPDATE SET next_id = next_id + ?",
+                (username, count + 1, count),
+            )
+            row = conn.execute("SELECT next_id - ? FROM event_counters WHERE username=?", (count, username)).fetchone()
+            return int(row[0])
+        with conn.cursor() as cur:
+            cur.execute(
+                "INSERT INTO event_counters (username, next_id) VALUES (%s, %s) "
+                "ON CONFLICT (username) DO UPDATE SET next_id = event_counters.next_id + %s RETURNING next_id - %s",
+                (username, count + 1, count, count),
+            )
+            return int(cur.fetchone()[0])
+
+    def create_event(self, username: str, item: Dict[str, Any]) -> Dict[str, Any]:
+        return self.create_events(username, [item])[0]
+
+    def create_events(self, username: str, items: list[Dict[str, Any]]) -> list[Dict[str, Any]]:
+        """Insert ``items`` with one id reservation and one ``executemany``; returns them with their ids."""
+        if not items:
+            return []
+        with self.connection() as conn:
+            first_id = self._allocate_event_ids(conn, username, len(items))
+            rows = [_event_insert_values(username, first_id + offset, item) for offset, item in enumerate(items)]
+            if self._backend == "sqlite":
+                conn.executemany(self._insert_sql(), rows)
             else:
                 with conn.cursor() as cur:
-                    cur.execute("DELETE FROM events WHERE username=%s", (username,))
-                    for item in items:
-                        cur.execute(
-                            """
-                            INSERT INTO events (id, username, title, time, end_time, location, description, recurrence, created_at)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                            """,
-                            (
-                                item["id"],
-                                username,
-                                item["title"],
-                                item["time"],
-                                item.get("end_time", item["time"]),
-                                item["location"],
-                                item.get("description", ""),
-                                json.dumps(item.get("recurrence", {"frequency": "none", "end_type": "never", "until": None, "count": None}), ensure_ascii=False),
-                                item.get("created_at", ""),
-                            ),
-                        )
+                    cur.executemany(self._insert_sql(), rows)
+            self._bump_metrics(conn, username, new_events=_day_counts(item.get("created_at") for item in items))
+        return [{"id": first_id + offset, **item} for offset, item in enumerate(items)]
@@ -3,12 +3,20 @@ import pytest
 import base64
 import hashlib
 import hmac
+import threading
+import time
+
+import app as app_module
 from app import (
     _validate_username,
     _validate_password,
     _hash_password,
     _verify_password,
     _generate_api_key,
+    _PasswordWorkers,
+    _PasswordWorkRejected,
+    _issue_token,
+    _verify_token,
     User,
     USERNAME_PATTERN,
     PASSWORD_PATTERN,
@@ -117,6 +125,105 @@ class TestPasswordHashing:
         assert _verify_password(user, "") == False
 
 
+class TestPasswordWorkers:
+    """密码哈希线程池准入控制测试"""
+
+    def _occupy(self, workers, **keys):
+        """在后台线程占用一个名额，返回 (释放事件, 线程)"""
+        started, release = threading.Event(), threading.Event()
+
+        def blocking():
+            started.set()
+            release.wait(5)
+            return "done"
+
+        thread = threading.Thread(target=workers.run, args=(blocking,), kwargs=keys)
+        thread.start()
+        assert started.wait(5)
+        return release, thread
+
+    def test_rejects_when_capacity_is_exhausted(self):
+        """测试在途任务达到上限时立即拒绝"""
+        workers = _PasswordWorkers(workers=1, queue_limit=0, per_client_limit=5, per_user_limit=5)
+        release, thread = self._occupy(workers, client="10.0.0.1")
+        with pytest.raises(_PasswordWorkRejected):
+            workers.run(lambda: None, client="10.0.0.2")
+        release.set()
+        thread.join()
+        assert workers.run(lambda value: value * 2, 21, client="10.0.0.2") == 42
+
+    def test_per_client_and_per_user_caps(self):
+        """测试同一来源地址或同一用户的并发上限"""
+        workers = _PasswordWorkers(workers=2, queue_limit=2, per_client_limit=1, per_user_limit=1)
+        release, thread = self._occupy(workers, client="10.0.0.1", user="alice")
+        with pytest.raises(_PasswordWorkRejected):
+            workers.run(lambda: None, client="10.0.0.1", user="bob")
+        with pytest.raises(_PasswordWorkRejected):
+            workers.run(lambda: None, client="10.0.0.2", user="alice")
+        assert workers.run(lambda: "ok", client="10.0.0.2", user="bob") == "ok"
+        release.set()
+        thread.join()
+
+    def test_settings_fall_back_and_clamp(self, monkeypatch):
+        """测试配置无法解析时使用默认值，过小的值按下限处理"""
+        monkeypatch.setenv("PASSWORD_HASH_WORKERS", "four")
+        monkeypatch.setenv("PASSWORD_HASH_QUEUE_LIMIT", "-3")
+        monkeypatch.setenv("PASSWORD_HASH_PER_CLIENT", "0")
+        monkeypatch.setenv("PASSWORD_HASH_PER_USER", "")
+        monkeypatch.setattr(app_module, "_PASSWORD_WORKERS", None)
+        workers = app_module._get_password_workers()
+        assert workers._executor._max_workers == min(4, app_module.os.cpu_count() or 1)
+        assert workers.capacity == workers._executor._max_workers
+        assert workers.limits == {"client": 1, "user": 1}
+
+
+class TestSignedTokens:
+    """签名访问令牌测试"""
+
+    def test_round_trip_and_tampering(self):
+        """测试令牌可验证，篡改载荷或签名后失效"""
+        token = _issue_token("tokenuser")["access_token"]
+        claims = _verify_token(token)
+        assert claims["sub"] == "tokenuser"
+        assert claims["exp"] - claims["iat"] == app_module.TOKEN_TTL_SECONDS * 1000
+
+        prefix, payload, signature = token.split(".")
+        forged = base64.urlsafe_b64encode(b'{"sub": "admin", "iat": 0, "exp": 9999999999999, "jti": "x"}').decode().rstrip("=")
+        assert _verify_token(f"{prefix}.{forged}.{signature}") is None
+        assert _verify_token(f"{prefix}.{payload}.{signature[:-2]}AA") is None
+        assert _verify_token("not-a-token") is None
+        assert _verify_token(f"{prefix}.é.{signature}") is None
+        assert _verify_token(f"{prefix}.{payload}.é") is None
+
+    def test_expiry_and_revocation(self, monkeypatch):
+        """测试过期令牌失效，撤销单个令牌或用户全部令牌"""
+        first = _issue_token("tokenuser")["access_token"]
+        second = _issue_token("tokenuser")["access_token"]
+        revocations = app_module._get_token_revocations()
+        revocations.revoke("tokenuser", _verify_token(first)["jti"], _verify_token(first)["exp"])
+        assert _verify_token(first) is None
+        assert _verify_token(second) is not None
+
+        revocations.revoke_user("tokenuser")
+        assert _verify_token(second) is None
+        monkeypatch.setattr(app_module, "_now_ms", lambda: int(time.time() * 1000) + 1)
+        assert _verify_token(_issue_token("tokenuser")["access_token"]) is not None
+
+        monkeypatch.setattr(app_module, "TOKEN_TTL_SECONDS", -1)
+        assert _verify_token(_issue_token("tokenuser")["access_token"]) is None
+
+    def test_token_settings_fall_back_and_clamp(self, monkeypatch):
+        """测试令牌有效期与撤销列表刷新间隔的解析"""
+        monkeypatch.setenv("API_TOKEN_TTL_SECONDS", "15m")
+        monkeypatch.setenv("TOKEN_REVOCATION_REFRESH_SECONDS", "-2.5")
+        assert app_module._env_int("API_TOKEN_TTL_SECONDS", 900, minimum=1) == 900
+        assert app_module._env_float("TOKEN_REVOCATION_REFRESH_SECONDS", 5.0, minimum=0.0) == 0.0
+        monkeypatch.setenv("API_TOKEN_TTL_SECONDS", "0")
+        monkeypatch.setenv("TOKEN_REVOCATION_REFRESH_SECONDS", "abc")
+        assert app_module._env_int("API_TOKEN_TTL_SECONDS", 900, minimum=1) == 1
+        assert app_module._env_float("TOKEN_REVOCATION_REFRESH_SECONDS", 5.0, minimum=0.0) == 5.0
+
+
 class TestApiKeyGeneration:
     """API Key生成测试"""
 
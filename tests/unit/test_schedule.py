@@ -1,22 +1,32 @@
 """单元测试 - 日程和重复功能"""
 import pytest
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from app import (
     _parse_event_time,
     _parse_end_date,
     _normalize_recurrence,
-    _advance_occurrence,
-    _build_occurrences,
+    _iter_occurrences,
+    _occurrence_payload,
+    _nth_occurrence,
+    _first_index_at_or_after,
     _resolve_event_range,
     _find_conflict,
+    _first_series_overlap,
+    _series_conflicts,
     ALLOWED_FREQUENCIES,
     ALLOWED_END_TYPES,
     _check_day_type,
     _check_working_hours,
     _parse_workday_date,
+    _parse_date,
 )
 
 
+def _expand(item, query_start, query_end):
+    """展开为接口返回的实例列表"""
+    return [_occurrence_payload(start, source) for start, source in _iter_occurrences(item, query_start, query_end)]
+
+
 class TestEventTimeParsing:
     """事件时间解析测试"""
 
@@ -136,6 +146,14 @@ class TestNormalizeRecurrence:
                 "recurrence": {"frequency": "daily", "end_type": "count", "count": -1}
             })
 
+    def test_recurrence_count_too_large(self):
+        """测试重复次数超过上限"""
+        with pytest.raises(ValueError) as exc_info:
+            _normalize_recurrence({
+                "recurrence": {"frequency": "daily", "end_type": "count", "count": 3000000}
+            })
+        assert "must not exceed" in str(exc_info.value)
+
     def test_recurrence_default_values(self):
         """测试默认重复值（无recurrence字段）"""
         result = _normalize_recurrence({})
@@ -148,31 +166,31 @@ class TestAdvanceOccurrence:
     def test_advance_daily(self):
         """测试每日推进"""
         base = datetime(2025, 2, 10, 14, 0)
-        result = _advance_occurrence(base, "daily")
+        result = _nth_occurrence(base, "daily", 1)
         assert result == datetime(2025, 2, 11, 14, 0)
 
     def test_advance_weekly(self):
         """测试每周推进"""
         base = datetime(2025, 2, 10, 14, 0)
-        result = _advance_occurrence(base, "weekly")
+        result = _nth_occurrence(base, "weekly", 1)
         assert result == datetime(2025, 2, 17, 14, 0)
 
     def test_advance_monthly(self):
         """测试每月推进"""
         base = datetime(2025, 2, 10, 14, 0)
-        result = _advance_occurrence(base, "monthly")
+        result = _nth_occurrence(base, "monthly", 1)
         assert result == datetime(2025, 3, 10, 14, 0)
 
     def test_advance_monthly_leap_year(self):
         """测试闰年月推进"""
         base = datetime(2024, 1, 31, 14, 0)  # Jan 31
-        result = _advance_occurrence(base, "monthly")
+        result = _nth_occurrence(base, "monthly", 1)
         assert result == datetime(2024, 2, 29, 14, 0)  # Feb 29 (leap year)
 
     def test_advance_yearly(self):
         """测试每年推进"""
         base = datetime(2025, 2, 10, 14, 0)
-        result = _advance_occurrence(base, "yearly")
+        result = _nth_occurrence(base, "yearly", 1)
         assert result == datetime(2026, 2, 10, 14, 0)
 
 
@@ -187,7 +205,7 @@ class TestBuildOccurrences:
             "time": "2025-02-10T14:00",
             "recurrence": {"frequency": "none"}
         }
-        result = _build_occurrences(item, None, None)
+        result = _expand(item, None, None)
         assert len(result) == 1
         assert result[0]["occurrence_time"] == "2025-02-10T14:00"
 
@@ -199,7 +217,7 @@ class TestBuildOccurrences:
             "time": "2025-02-10T09:00",
             "recurrence": {"frequency": "daily", "end_type": "count", "count": 3}
         }
-        result = _build_occurrences(item, None, None)
+        result = _expand(item, None, None)
         assert len(result) == 3
         assert result[0]["occurrence_time"] == "2025-02-10T09:00"
         assert result[1]["occurrence_time"] == "2025-02-11T09:00"
@@ -213,7 +231,7 @@ class TestBuildOccurrences:
             "time": "2025-02-10T14:00",
             "recurrence": {"frequency": "weekly", "end_type": "count", "count": 4}
         }
-        result = _build_occurrences(item, None, None)
+        result = _expand(item, None, None)
         assert len(result) == 4
         # Check dates are 7 days apart
         assert result[1]["occurrence_time"] == "2025-02-17T14:00"
@@ -230,7 +248,7 @@ class TestBuildOccurrences:
         }
         query_start = datetime(2025, 2, 12, 0, 0)
         query_end = datetime(2025, 2, 14, 23, 59)
-        result = _build_occurrences(item, query_start, query_end)
+        result = _expand(item, query_start, query_end)
         # Should only get Feb 12, 13, 14
         assert len(result) == 3
         assert result[0]["occurrence_time"] == "2025-02-12T09:00"
@@ -247,7 +265,7 @@ class TestBuildOccurrences:
         }
         query_start = datetime(2025, 2, 1, 0, 0)
         query_end = datetime(2025, 2, 28, 23, 59)
-        result = _build_occurrences(item, query_start, query_end)
+        result = _expand(item, query_start, query_end)
         assert len(result) == 0
 
     def test_build_with_until_date(self):
@@ -258,7 +276,7 @@ class TestBuildOccurrences:
             "time": "2025-02-10T14:00",
             "recurrence": {"frequency": "daily", "end_type": "until", "until": "2025-02-14"}
         }
-        result = _build_occurrences(item, None, None)
+        result = _expand(item, None, None)
         # Should get Feb 10, 11, 12, 13, 14
         assert len(result) == 5
         assert result[-1]["occurrence_time"] == "2025-02-14T14:00"
@@ -273,7 +291,7 @@ class TestBuildOccurrences:
             "description": "项目讨论",
             "recurrence": {"frequency": "daily", "end_type": "count", "count": 2}
         }
-        result = _build_occurrences(item, None, None)
+        result = _expand(item, None, None)
         for occ in result:
             assert occ["title"] == "会议"
             assert occ["location"] == "会议室A"
@@ -281,6 +299,92 @@ class TestBuildOccurrences:
             assert occ["source_id"] == 1
 
 
+class TestOccurrenceJump:
+    """重复事件直接跳转测试"""
+
+    def test_nth_occurrence_monthly_keeps_original_day(self):
+        """测试按月重复从基准日计算，不因短月累积漂移"""
+        base = datetime(2024, 1, 31, 9, 0)
+        assert _nth_occurrence(base, "monthly", 1) == datetime(2024, 2, 29, 9, 0)
+        assert _nth_occurrence(base, "monthly", 2) == datetime(2024, 3, 31, 9, 0)
+        assert _nth_occurrence(base, "monthly", 13) == datetime(2025, 2, 28, 9, 0)
+
+    def test_nth_occurrence_yearly_leap_day(self):
+        """测试闰日按年重复"""
+        base = datetime(2024, 2, 29, 9, 0)
+        assert _nth_occurrence(base, "yearly", 1) == datetime(2025, 2, 28, 9, 0)
+        assert _nth_occurrence(base, "yearly", 4) == datetime(2028, 2, 29, 9, 0)
+
+    @pytest.mark.parametrize("frequency", ["daily", "weekly", "monthly", "yearly"])
+    def test_occurrence_past_datetime_max_is_none(self, frequency):
+        """测试超出 datetime 上限的实例返回 None 而非溢出"""
+        assert _nth_occurrence(datetime(2025, 1, 1, 9, 0), frequency, 3000000) is None
+
+    @pytest.mark.parametrize(
+        "recurrence",
+        [
+            {"frequency": "yearly", "end_type": "count", "count": 9000},
+            {"frequency": "daily", "end_type": "count", "count": 3000000},
+            {"frequency": "daily", "end_type": "until", "until": "9999-12-31"},
+        ],
+    )
+    def test_expansion_stops_at_datetime_max(self, recurrence):
+        """测试结束时间超出范围的重复日程展开到 datetime 上限为止"""
+        item = {"id": 1, "title": "远期", "time": "9999-12-29T09:00", "end_time": "9999-12-29T10:00", "recurrence": recurrence}
+        starts = [occ["occurrence_time"] for occ in _expand(item, datetime(9999, 12, 1), None)]
+        if recurrence["frequency"] == "daily":
+            assert starts == ["9999-12-29T09:00", "9999-12-30T09:00", "9999-12-31T09:00"]
+        else:
+            assert starts == ["9999-12-29T09:00"]
+
+    @pytest.mark.parametrize("frequency", ["daily", "weekly", "monthly", "yearly"])
+    def test_first_index_matches_stepping(self, frequency):
+        """测试跳转索引与逐次推进结果一致"""
+        base = datetime(2023, 1, 31, 9, 30)
+        for moment in [datetime(2023, 1, 31, 9, 30), datetime(2023, 3, 1), datetime(2024, 2, 29, 9, 31), datetime(2026, 7, 4)]:
+            index = _first_index_at_or_after(base, frequency, moment)
+            assert _nth_occurrence(base, frequency, index) >= moment
+            if index:
+                assert _nth_occurrence(base, frequency, index - 1) < moment
+
+    def test_long_running_daily_series_still_expands(self):
+        """测试开始很久的每日重复仍能展开到查询范围"""
+        item = {
+            "id": 1,
+            "title": "站会",
+            "time": "2020-01-01T09:00",
+            "recurrence": {"frequency": "daily", "end_type": "never"},
+        }
+        result = _expand(item, datetime(2025, 6, 1), datetime(2025, 6, 3, 23, 59))
+        assert [occ["occurrence_time"] for occ in result] == [
+            "2025-06-01T09:00",
+            "2025-06-02T09:00",
+            "2025-06-03T09:00",
+        ]
+
+    def test_count_limit_applied_arithmetically(self):
+        """测试按次数结束的重复在跳转后仍遵守次数限制"""
+        item = {
+            "id": 1,
+            "title": "周会",
+            "time": "2020-01-06T10:00",
+            "recurrence": {"frequency": "weekly", "end_type": "count", "count": 300},
+        }
+        tail = _expand(item, datetime(2025, 9, 1), datetime(2026, 12, 31))
+        assert tail[-1]["occurrence_time"] == (datetime(2020, 1, 6, 10, 0) + timedelta(weeks=299)).strftime("%Y-%m-%dT%H:%M")
+        assert _expand(item, datetime(2026, 1, 1), None) == []
+
+    def test_yearly_count_without_range_returns_all(self):
+        """测试无查询范围时按次数展开全部年度重复"""
+        item = {
+            "id": 1,
+            "title": "年会",
+            "time": "2025-02-10T14:00",
+            "recurrence": {"frequency": "yearly", "end_type": "count", "count": 5},
+        }
+        assert len(_expand(item, None, None)) == 5
+
+
 class TestWorkdayHelpers:
     """工作日和工作时段判断工具函数测试"""
 
@@ -295,6 +399,12 @@ class TestWorkdayHelpers:
             _parse_workday_date("2025/02/10")
         assert "date must be YYYY-MM-DD" in str(exc_info.value)
 
+    def test_parse_date_reports_field_name(self):
+        """测试日期解析失败时提示对应字段"""
+        with pytest.raises(ValueError) as exc_info:
+            _parse_date("2025/02/10", "end_date")
+        assert str(exc_info.value) == "end_date must be YYYY-MM-DD"
+
     def test_check_working_hours_morning(self):
         """测试上午工作时段"""
         result = _check_working_hours(datetime(2025, 2, 10, 9, 0))
@@ -368,6 +478,43 @@ class TestConflictDetection:
         assert conflict is not None
         assert conflict["id"] == 1
 
+    def test_find_conflict_with_recurring_occurrence(self):
+        """测试与重复日程后续实例冲突"""
+        items = [{
+            "id": 1,
+            "title": "周会",
+            "time": "2025-02-03T10:00",
+            "end_time": "2025-02-03T11:00",
+            "recurrence": {"frequency": "weekly", "end_type": "count", "count": 10},
+        }]
+        conflict = _find_conflict(items, datetime(2025, 3, 10, 10, 30), datetime(2025, 3, 10, 11, 30))
+        assert conflict is not None and conflict["id"] == 1
+        assert _find_conflict(items, datetime(2025, 3, 11, 10, 30), datetime(2025, 3, 11, 11, 30)) is None
+        assert _find_conflict(items, datetime(2025, 4, 14, 10, 0), datetime(2025, 4, 14, 11, 0)) is None
+
+    def test_find_conflict_with_occurrence_spanning_window(self):
+        """测试检测从窗口前开始并延续进窗口的实例"""
+        items = [{
+            "id": 2,
+            "title": "通宵值班",
+            "time": "2025-02-01T22:00",
+            "end_time": "2025-02-02T06:00",
+            "recurrence": {"frequency": "daily", "end_type": "never"},
+        }]
+        conflict = _find_conflict(items, datetime(2025, 2, 10, 5, 0), datetime(2025, 2, 10, 5, 30))
+        assert conflict is not None and conflict["id"] == 2
+
+    def test_busy_index_overlap_queries(self):
+        """测试区间索引的重叠查询"""
+        from app import _BusyIndex
+
+        index = _BusyIndex()
+        index.add(datetime(2025, 2, 10, 9, 0), datetime(2025, 2, 10, 12, 0), {"id": 1})
+        index.add(datetime(2025, 2, 10, 13, 0), datetime(2025, 2, 10, 13, 30), {"id": 2})
+        assert index.find_overlap(datetime(2025, 2, 10, 11, 0), datetime(2025, 2, 10, 11, 30))["id"] == 1
+        assert index.find_overlap(datetime(2025, 2, 10, 12, 0), datetime(2025, 2, 10, 13, 0)) is None
+        assert index.find_overlap(datetime(2025, 2, 10, 13, 15), datetime(2025, 2, 10, 14, 0))["id"] == 2
+
     def test_find_conflict_ignore_self(self):
         """测试更新时忽略自身"""
         items = [{"id": 1, "title": "已有会议", "time": "2025-02-10T10:00", "end_time": "2025-02-10T11:00"}]
@@ -375,6 +522,103 @@ class TestConflictDetection:
         assert conflict is None
 
 
+class TestSeriesOverlap:
+    """重复日程之间的冲突检测测试"""
+
+    @staticmethod
+    def _series(item_id, time, end_time, frequency="none", end_type="never", until=None, count=None):
+        return {
+            "id": item_id,
+            "title": f"日程{item_id}",
+            "time": time,
+            "end_time": end_time,
+            "recurrence": {"frequency": frequency, "end_type": end_type, "until": until, "count": count},
+        }
+
+    def test_daily_and_weekly_overlap_found_after_first_occurrence(self):
+        """测试首个实例不冲突但后续实例冲突"""
+        candidate = self._series(0, "2025-03-03T10:00", "2025-03-03T11:00", "daily")
+        existing = self._series(1, "2025-03-06T10:30", "2025-03-06T11:30", "weekly")
+        assert _first_series_overlap(candidate, existing) == datetime(2025, 3, 6, 10, 0)
+
+    def test_periodic_series_with_disjoint_times_never_overlap(self):
+        """测试时间段错开的每日/每周日程永不冲突"""
+        candidate = self._series(0, "2025-03-03T10:00", "2025-03-03T11:00", "daily")
+        existing = self._series(1, "2020-01-06T11:00", "2020-01-06T12:00", "weekly")
+        assert _first_series_overlap(candidate, existing) is None
+
+    def test_weekly_on_different_weekdays_never_overlap(self):
+        """测试不同星期几的每周日程不冲突"""
+        candidate = self._series(0, "2025-03-03T10:00", "2025-03-03T11:00", "weekly")
+        existing = self._series(1, "2025-03-04T10:00", "2025-03-04T11:00", "weekly")
+        assert _first_series_overlap(candidate, existing) is None
+
+    def test_monthly_against_weekly(self):
+        """测试每月日程与每周日程在某月重合"""
+        candidate = self._series(0, "2025-03-31T09:00", "2025-03-31T10:00", "monthly")
+        # 2025-06-30 is a Monday; the weekly series only runs on Mondays.
+        existing = self._series(1, "2025-04-07T09:30", "2025-04-07T10:30", "weekly")
+        assert _first_series_overlap(candidate, existing) == datetime(2025, 6, 30, 9, 0)
+
+    def test_series_bounds_are_respected(self):
+        """测试结束条件限制冲突范围"""
+        candidate = self._series(0, "2025-03-03T10:00", "2025-03-03T11:00", "daily", "count", count=3)
+        existing = self._series(1, "2025-03-06T10:00", "2025-03-06T11:00", "weekly")
+        assert _first_series_overlap(candidate, existing) is None
+        until_series = self._series(2, "2025-03-01T10:00", "2025-03-01T11:00", "daily", "until", until="2025-03-05")
+        assert _first_series_overlap(until_series, existing) is None
+
+    def test_series_conflicts_sorted_and_ignore_self(self):
+        """测试返回所有冲突并按首次冲突时间排序"""
+        candidate = self._series(0, "2025-03-03T10:00", "2025-03-03T11:00", "daily")
+        items = [
+            self._series(1, "2025-03-10T10:00", "2025-03-10T10:30"),
+            self._series(2, "2025-03-05T10:15", "2025-03-05T10:45", "weekly"),
+            self._series(3, "2025-03-05T12:00", "2025-03-05T13:00", "daily"),
+        ]
+        conflicts = _series_conflicts(candidate, items)
+        assert [(start.day, item["id"]) for start, item in conflicts] == [(5, 2), (10, 1)]
+        assert [item["id"] for _, item in _series_conflicts(candidate, items, ignore_id=2)] == [1]
+
+    def test_matches_brute_force_expansion(self):
+        """测试与逐个展开实例的结果一致"""
+        import itertools
+        import random
+
+        rng = random.Random(12)
+        frequencies = ["none", "daily", "weekly", "monthly", "yearly"]
+        horizon_end = datetime(2026, 3, 1)
+        for case in range(300):
+            pair = []
+            for item_id in range(2):
+                start = datetime(2025, 1, 1) + timedelta(days=rng.randrange(60), minutes=30 * rng.randrange(48))
+                end = start + timedelta(minutes=30 * rng.randrange(1, 6))
+                frequency = rng.choice(frequencies)
+                end_type = rng.choice(["never", "count"]) if frequency != "none" else "never"
+                count = rng.randrange(1, 20) if end_type == "count" else None
+                pair.append(self._series(item_id, start.strftime("%Y-%m-%dT%H:%M"), end.strftime("%Y-%m-%dT%H:%M"), frequency, end_type, count=count))
+
+            # Brute force expands every occurrence up to horizon_end; compare the first half-year only.
+            expected = None
+            spans = []
+            for item in pair:
+                start_at, end_at = _resolve_event_range(item["time"], item["end_time"])
+                duration = end_at - start_at
+                spans.append([
+                    (datetime.strptime(occ["occurrence_time"], "%Y-%m-%dT%H:%M"), duration)
+                    for occ in _expand(item, None, horizon_end)
+                ])
+            for (a_start, a_duration), (b_start, b_duration) in itertools.product(*spans):
+                if a_start < b_start + b_duration and b_start < a_start + a_duration:
+                    expected = a_start if expected is None else min(expected, a_start)
+
+            actual = _first_series_overlap(pair[0], pair[1])
+            if expected is not None and expected < datetime(2025, 7, 1):
+                assert actual == expected, (case, pair)
+            elif actual is not None and actual < datetime(2025, 7, 1):
+                pytest.fail(f"unexpected overlap in case {case}: {pair}")
+
+
 class TestFindAvailableSlot:
     """可用时段匹配测试"""
 
@@ -397,16 +641,12 @@ class TestFindAvailableSlot:
             },
         ]
         target_date = datetime(2025, 2, 10)
-        from app import _find_first_available_slot
-
-        slot = _find_first_available_slot(
-            items,
-            target_date,
-            required_minutes=30,
-            window_start=target_date.replace(hour=9, minute=0),
-            window_end=target_date.replace(hour=12, minute=0),
-        )
-        assert slot is not None
+        from app import _busy_masks, _scan_free_slots
+
+        window = (target_date.replace(hour=9, minute=0), target_date.replace(hour=12, minute=0))
+        slots = _scan_free_slots(_busy_masks(items, *window), [window], required_minutes=30, max_results=1)
+        assert len(slots) == 1
+        slot = slots[0]
         assert slot[0] == datetime(2025, 2, 10, 10, 0)
         assert slot[1] == datetime(2025, 2, 10, 10, 30)
 
@@ -422,19 +662,216 @@ class TestFindAvailableSlot:
             }
         ]
         target_date = datetime(2025, 2, 10)
-        from app import _find_first_available_slot
-
-        slot = _find_first_available_slot(
-            items,
-            target_date,
-            required_minutes=60,
-            window_start=target_date.replace(hour=9, minute=0),
-            window_end=target_date.replace(hour=12, minute=0),
-        )
-        assert slot is not None
+        from app import _busy_masks, _scan_free_slots
+
+        window = (target_date.replace(hour=9, minute=0), target_date.replace(hour=12, minute=0))
+        slots = _scan_free_slots(_busy_masks(items, *window), [window], required_minutes=60, max_results=1)
+        assert len(slots) == 1
+        slot = slots[0]
         assert slot[0] == datetime(2025, 2, 10, 9, 0)
         assert slot[1] == datetime(2025, 2, 10, 10, 0)
 
+    def test_find_multiple_slots_across_days_in_working_hours(self):
+        """测试跨多天且仅限工作时间的多个候选时段"""
+        from app import _busy_masks, _scan_free_slots, _search_windows
+
+        items = [
+            {
+                "id": 1,
+                "title": "每日上午会",
+                "time": "2025-02-07T09:00",
+                "end_time": "2025-02-07T11:30",
+                "recurrence": {"frequency": "daily", "end_type": "never"},
+            },
+            {
+                "id": 2,
+                "title": "下午培训",
+                "time": "2025-02-07T13:30",
+                "end_time": "2025-02-07T18:00",
+                "recurrence": {"frequency": "none"},
+            },
+        ]
+        # 2025-02-07 is a Friday; the weekend is skipped entirely.
+        windows = _search_windows(datetime(2025, 2, 7), datetime(2025, 2, 10), (0, 0), (23, 59), working_hours_only=True)
+        assert windows == [
+            (datetime(2025, 2, 7, 9, 0), datetime(2025, 2, 7, 12, 0)),
+            (datetime(2025, 2, 7, 13, 30), datetime(2025, 2, 7, 18, 0)),
+            (datetime(2025, 2, 10, 9, 0), datetime(2025, 2, 10, 12, 0)),
+            (datetime(2025, 2, 10, 13, 30), datetime(2025, 2, 10, 18, 0)),
+        ]
+
+        masks = _busy_masks(items, windows[0][0], windows[-1][1])
+        slots = _scan_free_slots(masks, windows, required_minutes=60, max_results=2)
+        assert slots == [
+            (datetime(2025, 2, 10, 13, 30), datetime(2025, 2, 10, 14, 30)),
+        ]
+        slots = _scan_free_slots(masks, windows, required_minutes=30, max_results=2)
+        assert slots == [
+            (datetime(2025, 2, 7, 11, 30), datetime(2025, 2, 7, 12, 0)),
+            (datetime(2025, 2, 10, 11, 30), datetime(2025, 2, 10, 12, 0)),
+        ]
+
+
+class TestFreeBusyBitmap:
+    """分钟级忙闲位图测试"""
+
+    def test_busy_masks_split_across_midnight(self):
+        """测试跨午夜的日程拆分到两天"""
+        from app import _busy_masks, _mask_runs
+
+        items = [{
+            "id": 1,
+            "title": "夜班",
+            "time": "2025-02-10T22:00",
+            "end_time": "2025-02-11T01:30",
+            "recurrence": {"frequency": "none"},
+        }]
+        masks = _busy_masks(items, datetime(2025, 2, 10), datetime(2025, 2, 12))
+        assert list(_mask_runs(masks[datetime(2025, 2, 10).date()])) == [(22 * 60, 24 * 60)]
+        assert list(_mask_runs(masks[datetime(2025, 2, 11).date()])) == [(0, 90)]
+        assert masks[datetime(2025, 2, 12).date()] == 0
+
+    def test_bit_scan_matches_minute_by_minute_search(self):
+        """测试位运算扫描与逐分钟查找结果一致"""
+        import random
+        from app import _minute_bits, _scan_free_slots
+
+        rng = random.Random(7)
+        day = datetime(2025, 2, 10)
+        for _ in range(200):
+            mask = 0
+            for _ in range(rng.randrange(6)):
+                start = rng.randrange(1440)
+                mask |= _minute_bits(start, min(1440, start + rng.randrange(1, 240)))
+            window = (day + timedelta(minutes=rng.randrange(720)), day + timedelta(minutes=rng.randrange(720, 1439)))
+            required = rng.randrange(1, 180)
+
+            expected = []
+            free_run = 0
+            first = int((window[0] - day).total_seconds() // 60)
+            last = int((window[1] - day).total_seconds() // 60)
+            for minute in range(first, last):
+                free_run = free_run + 1 if not mask >> minute & 1 else 0
+                if free_run == required:
+                    slot_start = day + timedelta(minutes=minute - required + 1)
+                    expected.append((slot_start, slot_start + timedelta(minutes=required)))
+            assert _scan_free_slots({day.date(): mask}, [window], required, 100) == expected
+
+    def test_bitmap_read_during_write_is_not_cached(self):
+        """测试读取位图期间发生写入时，结果不写入缓存"""
+        from types import SimpleNamespace
+        from app import _FreeBusyIndex
+
+        loads = []
+
+        def load_schedules_range(usernames, start, end):
+            loads.append(start)
+            if len(loads) == 1:
+                index.invalidate("fbuser")
+            return {username: [] for username in usernames}
+
+        config = SimpleNamespace(freebusy_cache_size=16, freebusy_cache_ttl=60)
+        index = _FreeBusyIndex(SimpleNamespace(config=config, load_schedules_range=load_schedules_range))
+        day = datetime(2025, 2, 10)
+        assert index.masks("fbuser", day, day) == {day.date(): 0}
+        assert index.masks("fbuser", day, day) == {day.date(): 0}
+        assert index.masks("fbuser", day, day) == {day.date(): 0}
+        assert len(loads) == 2
+
+
+class TestICalendar:
+    """iCalendar 导出与解析测试"""
+
+    def test_fold_and_escape(self):
+        """测试长行按 75 字节折行且不拆分多字节字符"""
+        from app import _ics_escape, _ics_fold, _ics_unescape, _iter_ics_lines
+
+        text = "会议;议程,第一项\n" + "长" * 40
+        line = "SUMMARY:" + _ics_escape(text)
+        folded = _ics_fold(line)
+        physical = folded.split("\r\n")[:-1]
+        assert len(physical) > 1
+        assert all(len(part.encode("utf-8")) <= 75 for part in physical)
+        assert physical[0].startswith("SUMMARY:会议\\;议程\\,第一项\\n")
+
+        unfolded = list(_iter_ics_lines(part.encode("utf-8") + b"\r\n" for part in physical))
+        assert unfolded == [line]
+        assert _ics_unescape(unfolded[0][len("SUMMARY:"):]) == text
+
+    def test_rrule_round_trip(self):
+        """测试重复规则与 RRULE 互相转换"""
+        from app import _ics_recurrence, _ics_rrule
+
+        start = datetime(2025, 2, 10, 9, 0)
+        assert _ics_rrule({"frequency": "none"}, start) is None
+        assert _ics_rrule({"frequency": "weekly", "end_type": "count", "count": 4}, start) == "FREQ=WEEKLY;COUNT=4"
+        assert _ics_rrule({"frequency": "daily", "end_type": "until", "until": "2025-03-01"}, start) == (
+            "FREQ=DAILY;UNTIL=20250301T235900"
+        )
+        assert _ics_recurrence("FREQ=WEEKLY;BYDAY=MO;COUNT=4", start) == {
+            "frequency": "weekly",
+            "end_type": "count",
+            "count": "4",
+        }
+        assert _ics_recurrence("FREQ=MONTHLY;UNTIL=20250601T000000Z", start) == {
+            "frequency": "monthly",
+            "end_type": "until",
+            "until": "2025-06-01",
+        }
+        for unsupported in ("FREQ=WEEKLY;BYDAY=TU", "FREQ=DAILY;INTERVAL=2", "FREQ=HOURLY", "FREQ=DAILY;BYHOUR=9"):
+            with pytest.raises(ValueError):
+                _ics_recurrence(unsupported, start)
+
+    @pytest.mark.parametrize(
+        "start, recurrence, rule",
+        [
+            (datetime(2025, 1, 31, 9, 0), {"frequency": "monthly", "end_type": "count", "count": 4}, "FREQ=MONTHLY;BYMONTHDAY=28,29,30,31;BYSETPOS=-1;COUNT=4"),
+            (datetime(2024, 2, 29, 9, 0), {"frequency": "yearly", "end_type": "count", "count": 3}, "FREQ=YEARLY;BYMONTH=2;BYMONTHDAY=28,29;BYSETPOS=-1;COUNT=3"),
+        ],
+    )
+    def test_rrule_for_end_of_month_series(self, start, recurrence, rule):
+        """测试月末与 2 月 29 日的重复规则导出为按月末取值的 RRULE，且仅接受该形式导入"""
+        from app import _ics_recurrence, _ics_rrule, _iter_occurrences
+
+        assert _ics_rrule(recurrence, start) == rule
+        assert _ics_recurrence(rule, start) == {**recurrence, "count": str(recurrence["count"])}
+        # RFC 5545 would skip months without the start day; the app clamps them instead.
+        plain = f"FREQ={recurrence['frequency'].upper()};COUNT={recurrence['count']}"
+        with pytest.raises(ValueError):
+            _ics_recurrence(plain, start)
+
+        item = {"time": start.strftime("%Y-%m-%dT%H:%M"), "end_time": None, "recurrence": recurrence}
+        dates = [occurrence.date() for occurrence, _ in _iter_occurrences(item, None, None)]
+        expected = {
+            "monthly": [date(2025, 1, 31), date(2025, 2, 28), date(2025, 3, 31), date(2025, 4, 30)],
+            "yearly": [date(2024, 2, 29), date(2025, 2, 28), date(2026, 2, 28)],
+        }
+        assert dates == expected[recurrence["frequency"]]
+
+    def test_event_payload_defaults(self):
+        """测试全天事件、DURATION 与缺省字段的转换"""
+        from app import _ics_event_payload, _iter_ics_events
+
+        lines = [
+            "BEGIN:VCALENDAR",
+            "BEGIN:VEVENT",
+            "DTSTART;VALUE=DATE:20250210",
+            "BEGIN:VALARM",
+            "DESCRIPTION:提醒",
+            "END:VALARM",
+            "END:VEVENT",
+            "BEGIN:VEVENT",
+            'DTSTART;TZID="Asia/Shanghai":20250211T090000',
+            "DURATION:PT1H30M",
+            "SUMMARY:站会",
+            "END:VEVENT",
+            "END:VCALENDAR",
+        ]
+        all_day, timed = [_ics_event_payload(event) for event in _iter_ics_events(lines)]
+        assert (all_day["time"], all_day["end_time"]) == ("2025-02-10T00:00", "2025-02-11T00:00")
+        assert (all_day["title"], all_day["location"], all_day["description"]) == ("(untitled)", "(none)", "")
+        assert (timed["time"], timed["end_time"], timed["title"]) == ("2025-02-11T09:00", "2025-02-11T10:30", "站会")
+
 
 class TestFindAndBookEndpoint:
     """智能时段匹配接口测试"""
@@ -528,3 +965,64 @@ class TestFindAndBookEndpoint:
             )
             assert response.status_code == 409
             assert "No available slot" in response.get_json()["message"]
+
+    def test_search_slots_over_date_range(self):
+        """测试按日期范围返回多个候选时段"""
+        from app import app
+
+        app.config["TESTING"] = True
+        client = app.test_client()
+        register = client.post("/api/register", json={"username": "slotuser3", "password": "Test1234"})
+        headers = {"X-API-Key": register.get_json()["api_key"]}
+        client.post(
+            "/api/events",
+            headers=headers,
+            json={
+                "title": "全天占用",
+                "time": "2025-02-10T09:00",
+                "end_time": "2025-02-10T18:00",
+                "location": "A",
+                "description": "busy",
+            },
+        )
+
+        response = client.post(
+            "/api/slots/search",
+            headers=headers,
+            json={
+                "start_date": "2025-02-10",
+                "end_date": "2025-02-12",
+                "duration_hours": 2,
+                "working_hours_only": True,
+                "max_results": 3,
+            },
+        )
+        assert response.status_code == 200
+        assert response.get_json()["slots"] == [
+            {"start": "2025-02-11T09:00", "end": "2025-02-11T11:00"},
+            {"start": "2025-02-11T13:30", "end": "2025-02-11T15:30"},
+            {"start": "2025-02-12T09:00", "end": "2025-02-12T11:00"},
+        ]
+
+        booked = client.post(
+            "/api/slots/find-and-book",
+            headers=headers,
+            json={
+                "target_date": "2025-02-10",
+                "end_date": "2025-02-12",
+                "duration_hours": 1,
+                "working_hours_only": True,
+                "title": "自动安排",
+                "location": "B",
+                "description": "跨天",
+            },
+        )
+        assert booked.status_code == 201
+        assert booked.get_json()["item"]["time"] == "2025-02-11T09:00"
+
+        too_long = client.post(
+            "/api/slots/search",
+            headers=headers,
+            json={"start_date": "2025-01-01", "end_date": "2025-12-31", "duration_hours": 1},
+        )
+        assert too_long.status_code == 400
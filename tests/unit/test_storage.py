@@ -0,0 +1,516 @@
+"""单元测试 - 存储层缓存与连接"""
+import threading
+import time
+
+import pytest
+
+from storage import ConnectionPool, DatabaseStorage, DBConfig, LRUCache, StorageError
+
+
+def _sqlite_config(tmp_path):
+    return DBConfig(database_url=f"sqlite:///{tmp_path / 'storage.db'}", supabase_url="", supabase_service_role_key="")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLRUCache:
+    """用户缓存测试"""
+
+    def test_hit_and_miss_counters(self):
+        """测试命中与未命中计数"""
+        cache = LRUCache(max_entries=4, ttl=10)
+        assert cache.get("a") is None
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        assert cache.stats() == {"hits": 1, "misses": 1, "size": 1}
+
+    def test_entries_expire_after_ttl(self):
+        """测试条目超过TTL后失效"""
+        clock = FakeClock()
+        cache = LRUCache(max_entries=4, ttl=5, clock=clock)
+        cache.set("a", 1)
+        clock.now = 4.9
+        assert cache.get("a") == 1
+        clock.now = 5.0
+        assert cache.get("a") is None
+        assert cache.stats()["size"] == 0
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """测试超出容量时淘汰最久未使用的条目"""
+        cache = LRUCache(max_entries=2, ttl=10)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_zero_ttl_disables_caching(self):
+        """测试TTL为0时不缓存"""
+        cache = LRUCache(max_entries=2, ttl=0)
+        cache.set("a", 1)
+        assert cache.get("a") is None
+
+    def test_update_keeps_expiry(self):
+        """测试原地更新保留原过期时间"""
+        clock = FakeClock()
+        cache = LRUCache(max_entries=2, ttl=5, clock=clock)
+        cache.set("a", 1)
+        clock.now = 3
+        cache.update("a", lambda value: value | 2)
+        cache.update("missing", lambda value: value | 2)
+        assert cache.get("a") == 3
+        assert cache.get("missing") is None
+        clock.now = 5
+        assert cache.get("a") is None
+
+    def test_discard_where(self):
+        """测试按条件清除条目"""
+        cache = LRUCache(max_entries=4, ttl=10)
+        cache.set(("username", "alice"), {"username": "alice"})
+        cache.set(("api_key", "k1"), {"username": "alice"})
+        cache.set(("username", "bob"), {"username": "bob"})
+        cache.discard_where(lambda _key, value: value["username"] == "alice")
+        assert cache.stats()["size"] == 1
+        assert cache.get(("username", "bob")) == {"username": "bob"}
+
+
+class FakeConnection:
+    def __init__(self, healthy=True):
+        self.healthy = healthy
+        self.closed = False
+
+    def execute(self, _sql):
+        if not self.healthy:
+            raise RuntimeError("server closed the connection")
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class TestConnectionPool:
+    """连接池测试"""
+
+    def test_connection_reused_by_same_thread(self):
+        """测试同一线程复用连接"""
+        created = []
+        pool = ConnectionPool(lambda: created.append(FakeConnection()) or created[-1], min_size=0, max_size=2)
+        first = pool.acquire()
+        pool.release(first)
+        second = pool.acquire()
+        assert second is first
+        assert len(created) == 1
+
+    def test_idle_connection_of_current_thread_preferred(self):
+        """测试优先返回当前线程上次使用的空闲连接"""
+        pool = ConnectionPool(FakeConnection, min_size=0, max_size=2)
+        mine = pool.acquire()
+        holder = {}
+
+        def other_thread():
+            holder["conn"] = pool.acquire()
+            pool.release(holder["conn"])
+
+        worker = threading.Thread(target=other_thread)
+        worker.start()
+        worker.join()
+        pool.release(mine)
+        assert pool.acquire() is mine
+
+    def test_min_size_warms_pool(self):
+        """测试最小连接数预热"""
+        pool = ConnectionPool(FakeConnection, min_size=2, max_size=3)
+        conn = pool.acquire()
+        assert pool.size == 2
+        assert pool.idle_count == 1
+        pool.release(conn)
+
+    def test_acquire_times_out_when_exhausted(self):
+        """测试连接耗尽时超时报错"""
+        pool = ConnectionPool(FakeConnection, min_size=0, max_size=1, timeout=0.05)
+        pool.acquire()
+        with pytest.raises(StorageError):
+            pool.acquire()
+
+    def test_unhealthy_idle_connection_is_replaced(self):
+        """测试空闲连接健康检查失败后被替换"""
+        clock = FakeClock()
+        stale = FakeConnection(healthy=False)
+        connections = iter([stale, FakeConnection()])
+        pool = ConnectionPool(lambda: next(connections), min_size=0, max_size=1, health_check_interval=5, clock=clock)
+        pool.release(pool.acquire())
+        clock.now = 10
+        fresh = pool.acquire()
+        assert fresh is not stale
+        assert stale.closed
+        assert pool.size == 1
+
+    def test_broken_release_frees_capacity(self):
+        """测试标记损坏的连接释放容量"""
+        pool = ConnectionPool(FakeConnection, min_size=0, max_size=1, timeout=0.05)
+        conn = pool.acquire()
+        pool.release(conn, broken=True)
+        assert conn.closed
+        assert pool.acquire() is not conn
+
+
+class TestDatabaseStoragePooling:
+    """数据库存储连接复用测试"""
+
+    def test_sqlite_operations_share_pooled_connection(self, tmp_path):
+        """测试连续操作复用同一个SQLite连接"""
+        storage = DatabaseStorage(_sqlite_config(tmp_path))
+        storage.init_schema()
+        with storage.connection() as first:
+            pass
+        storage.load_users()
+        with storage.connection() as second:
+            pass
+        assert first is second
+        storage.close()
+
+    def test_failed_operation_rolls_back(self, tmp_path):
+        """测试异常时回滚并归还连接"""
+        storage = DatabaseStorage(_sqlite_config(tmp_path))
+        storage.init_schema()
+        with pytest.raises(RuntimeError):
+            with storage.connection() as conn:
+                conn.execute(
+                    "INSERT INTO users (username, api_key, password_salt, password_hash, iterations, enabled, created_at) "
+                    "VALUES ('rollback', 'k', 's', 'h', 1, 1, '')"
+                )
+                raise RuntimeError("boom")
+        assert storage.load_users() == {}
+        storage.close()
+
+
+def _event(title, time, end_time, recurrence=None):
+    return {
+        "title": title,
+        "time": time,
+        "end_time": end_time,
+        "location": "A",
+        "description": "",
+        "recurrence": recurrence or {"frequency": "none", "end_type": "never", "until": None, "count": None},
+        "created_at": "2026-01-01T00:00:00",
+    }
+
+
+def _storage_with_user(tmp_path, username="rangeuser"):
+    storage = DatabaseStorage(_sqlite_config(tmp_path))
+    storage.init_schema()
+    storage.insert_user(username, {"api_key": f"cs_{username}", "password": {"salt": "", "hash": "", "iterations": 1}})
+    return storage
+
+
+class TestScheduleRange:
+    """日程范围查询测试"""
+
+    def test_range_prunes_events_outside_window(self, tmp_path):
+        """测试范围查询排除窗口外的单次日程和已结束的重复日程"""
+        storage = _storage_with_user(tmp_path)
+        storage.create_event("rangeuser", _event("before", "2026-01-01T09:00", "2026-01-01T10:00"))
+        storage.create_event("rangeuser", _event("inside", "2026-03-02T09:00", "2026-03-02T10:00"))
+        storage.create_event("rangeuser", _event("after", "2026-04-01T09:00", "2026-04-01T10:00"))
+        storage.create_event(
+            "rangeuser",
+            _event("ended", "2026-01-05T09:00", "2026-01-05T10:00", {"frequency": "daily", "end_type": "count", "count": 5, "until": None}),
+        )
+        storage.create_event(
+            "rangeuser",
+            _event("forever", "2025-01-01T08:00", "2025-01-01T08:30", {"frequency": "weekly", "end_type": "never", "until": None, "count": None}),
+        )
+        storage.create_event(
+            "rangeuser",
+            _event("until", "2026-02-01T08:00", "2026-02-01T08:30", {"frequency": "daily", "end_type": "until", "until": "2026-03-05", "count": None}),
+        )
+
+        titles = [item["title"] for item in storage.load_schedule_range("rangeuser", "2026-03-01T00:00", "2026-03-07T23:59")]
+        assert titles == ["forever", "until", "inside"]
+        assert len(storage.load_schedule_range("rangeuser", None, None)) == 6
+        storage.close()
+
+    def test_series_end_follows_updates(self, tmp_path):
+        """测试更新时间或重复规则后重新计算序列结束时间"""
+        storage = _storage_with_user(tmp_path)
+        item = storage.create_event("rangeuser", _event("moved", "2026-01-01T09:00", "2026-01-01T10:00"))
+        assert storage.load_schedule_range("rangeuser", "2026-03-01T00:00", "2026-03-01T23:59") == []
+
+        storage.update_event("rangeuser", item["id"], {"recurrence": {"frequency": "daily", "end_type": "never", "until": None, "count": None}})
+        assert [entry["title"] for entry in storage.load_schedule_range("rangeuser", "2026-03-01T00:00", "2026-03-01T23:59")] == ["moved"]
+        storage.close()
+
+    def test_series_end_past_datetime_max_is_open_ended(self, tmp_path):
+        """测试结束时间超出 datetime 范围的重复日程按无结束处理"""
+        storage = _storage_with_user(tmp_path)
+        for title, recurrence in [
+            ("yearly", {"frequency": "yearly", "end_type": "count", "count": 9000, "until": None}),
+            ("daily", {"frequency": "daily", "end_type": "count", "count": 3000000, "until": None}),
+            ("until", {"frequency": "daily", "end_type": "until", "until": "9999-12-31", "count": None}),
+        ]:
+            storage.create_event("rangeuser", _event(title, "2025-01-01T09:00", "2025-01-01T10:00", recurrence))
+        titles = [item["title"] for item in storage.load_schedule_range("rangeuser", "9000-01-01T00:00", None)]
+        assert titles == ["yearly", "daily", "until"]
+        storage.close()
+
+    def test_init_schema_backfills_series_end(self, tmp_path):
+        """测试旧库升级时补充序列结束时间"""
+        import sqlite3
+
+        db_path = tmp_path / "storage.db"
+        conn = sqlite3.connect(db_path)
+        conn.executescript(
+            """
+            CREATE TABLE users (username TEXT PRIMARY KEY, api_key TEXT UNIQUE NOT NULL, password_salt TEXT NOT NULL,
+                password_hash TEXT NOT NULL, iterations INTEGER NOT NULL, enabled BOOLEAN NOT NULL DEFAULT TRUE,
+                created_at TEXT NOT NULL);
+            CREATE TABLE events (id INTEGER PRIMARY KEY, username TEXT NOT NULL, title TEXT NOT NULL, time TEXT NOT NULL,
+                end_time TEXT NOT NULL, location TEXT NOT NULL, description TEXT NOT NULL, recurrence TEXT NOT NULL,
+                created_at TEXT NOT NULL);
+            INSERT INTO users VALUES ('legacy', 'k', 's', 'h', 1, 1, '');
+            INSERT INTO events VALUES (1, 'legacy', 'old', '2024-01-01T09:00', '2024-01-01T10:00', 'A', '',
+                '{"frequency": "none", "end_type": "never", "until": null, "count": null}', '');
+            """
+        )
+        conn.commit()
+        conn.close()
+
+        storage = DatabaseStorage(_sqlite_config(tmp_path))
+        storage.init_schema()
+        assert storage.load_schedule_range("legacy", "2026-01-01T00:00", None) == []
+        assert [item["title"] for item in storage.load_schedule_range("legacy", "2024-01-01T00:00", None)] == ["old"]
+        storage.close()
+
+    def test_recurring_filter_uses_frequency_column(self, tmp_path):
+        """测试按重复频率筛选单次日程与重复序列"""
+        storage = _storage_with_user(tmp_path)
+        storage.create_event("rangeuser", _event("once", "2026-03-02T09:00", "2026-03-02T10:00"))
+        storage.create_event(
+            "rangeuser",
+            _event("weekly", "2026-03-01T08:00", "2026-03-01T08:30", {"frequency": "weekly", "end_type": "never", "until": None, "count": None}),
+        )
+        window = ("2026-03-01T00:00", "2026-03-31T23:59")
+        assert [item["title"] for item in storage.load_schedule_range("rangeuser", *window, recurring=True)] == ["weekly"]
+        assert [item["title"] for item in storage.load_schedule_range("rangeuser", *window, recurring=False)] == ["once"]
+
+        with storage.connection() as conn:
+            row = conn.execute("SELECT series_start, series_end, frequency FROM events WHERE title='weekly'").fetchone()
+        assert tuple(row) == ("2026-03-01T08:00", None, "weekly")
+        storage.close()
+
+    def test_batched_range_groups_by_user(self, tmp_path):
+        """测试多用户批量范围查询按用户分组"""
+        storage = _storage_with_user(tmp_path)
+        storage.insert_user("otheruser", {"api_key": "cs_otheruser", "password": {"salt": "", "hash": "", "iterations": 1}})
+        storage.create_event("rangeuser", _event("mine", "2026-03-02T09:00", "2026-03-02T10:00"))
+        storage.create_event("otheruser", _event("theirs", "2026-03-02T11:00", "2026-03-02T12:00"))
+        storage.create_event("otheruser", _event("later", "2026-05-02T11:00", "2026-05-02T12:00"))
+
+        schedules = storage.load_schedules_range(["rangeuser", "otheruser", "nobody"], "2026-03-01T00:00", "2026-03-31T23:59")
+        assert {name: [item["title"] for item in items] for name, items in schedules.items()} == {
+            "rangeuser": ["mine"],
+            "otheruser": ["theirs"],
+            "nobody": [],
+        }
+        storage.close()
+
+    def test_events_page_walks_time_then_id(self, tmp_path):
+        """测试按 (time, id) 键集分页，相同时间按编号续接"""
+        storage = _storage_with_user(tmp_path)
+        for title, time in [("c", "2026-03-03T09:00"), ("a1", "2026-03-01T09:00"), ("b", "2026-03-02T09:00"), ("a2", "2026-03-01T09:00")]:
+            storage.create_event("rangeuser", _event(title, time, time[:11] + "10:00"))
+
+        first = storage.load_events_page("rangeuser", 2)
+        assert [item["title"] for item in first] == ["a1", "a2"]
+        rest = storage.load_events_page("rangeuser", 2, (first[0]["time"], first[0]["id"]))
+        assert [item["title"] for item in rest] == ["a2", "b"]
+        assert [item["title"] for item in storage.load_events_page("rangeuser", None, ("2026-03-02T09:00", 3))] == ["c"]
+        storage.close()
+
+
+class TestCreationStats:
+    """管理统计指标测试"""
+
+    def test_totals_and_histogram(self, tmp_path):
+        """测试总数、当日新增与按日直方图"""
+        storage = _storage_with_user(tmp_path)
+        storage.insert_user("otheruser", {"api_key": "cs_otheruser", "password": {"salt": "", "hash": "", "iterations": 1}})
+        for created_at in ["2026-03-01T23:59:59", "2026-03-02T00:00:00", "2026-03-02T12:00:00", "2026-03-04T08:00:00"]:
+            event = _event("e", "2026-03-02T09:00", "2026-03-02T10:00")
+            event["created_at"] = created_at
+            storage.create_event("rangeuser", event)
+
+        totals = storage.creation_totals("2026-03-02")
+        assert (totals["total_users"], totals["total_events"], totals["today_new_events"]) == (2, 4, 2)
+
+        histogram = storage.creation_histogram("2026-03-02", "2026-03-04")
+        assert histogram["events"] == {"2026-03-02": 2, "2026-03-04": 1}
+        storage.close()
+
+    def test_write_paths_keep_metrics_equal_to_rebuild(self, tmp_path):
+        """测试各写入路径增量维护的指标与全量重建结果一致"""
+        storage = _storage_with_user(tmp_path)
+        storage.insert_user(
+            "otheruser",
+            {"api_key": "cs_otheruser", "created_at": "2026-03-01T08:00:00", "password": {"salt": "", "hash": "", "iterations": 1}},
+        )
+        created = storage.create_events("rangeuser", [_event(str(n), "2026-03-02T09:00", "2026-03-02T10:00") for n in range(3)])
+        storage.create_event("otheruser", _event("x", "2026-03-02T09:00", "2026-03-02T10:00"))
+        storage.delete_event("rangeuser", created[0]["id"])
+        storage.update_event("rangeuser", created[1]["id"], {"created_at": "2026-03-05T00:00:00"})
+        storage.update_user_fields("otheruser", {"enabled": False})
+        storage.insert_user("gone", {"api_key": "cs_gone", "password": {"salt": "", "hash": "", "iterations": 1}})
+        storage.create_event("gone", _event("y", "2026-03-02T09:00", "2026-03-02T10:00"))
+        storage.delete_user("gone")
+
+        def snapshot():
+            users, _ = storage.list_users_page()
+            return (
+                storage.creation_totals("2026-01-01"),
+                storage.creation_histogram("2000-01-01", "2100-01-01"),
+                [(user["username"], user["event_count"]) for user in users],
+            )
+
+        incremental = snapshot()
+        assert incremental[0]["total_events"] == 3
+        assert incremental[0]["active_api_keys"] == 1
+        assert incremental[1]["users"] == {"2026-03-01": 1}
+        assert incremental[2] == [("otheruser", 1), ("rangeuser", 2)]
+        storage.rebuild_metrics()
+        assert snapshot() == incremental
+        storage.close()
+
+
+class TestUserListing:
+    """管理员用户列表查询测试"""
+
+    def test_event_counts_and_literal_search(self, tmp_path):
+        """测试日程数随用户列表一并查询，搜索中的通配符按字面匹配"""
+        storage = _storage_with_user(tmp_path)
+        storage.insert_user("new_user", {"api_key": "cs_new_user", "password": {"salt": "", "hash": "", "iterations": 1}})
+        storage.create_event("rangeuser", _event("a", "2026-03-02T09:00", "2026-03-02T10:00"))
+
+        users, total = storage.list_users_page(sort="event_count", descending=True)
+        assert [(user["username"], user["event_count"]) for user in users] == [("rangeuser", 1), ("new_user", 0)]
+        assert total == 2
+
+        users, total = storage.list_users_page(search="W_U")
+        assert ([user["username"] for user in users], total) == (["new_user"], 1)
+        assert storage.list_users_page(search="e_u") == ([], 0)
+        with pytest.raises(ValueError):
+            storage.list_users_page(sort="password_hash")
+        storage.close()
+
+
+class TestScheduleTransaction:
+    """日程事务测试"""
+
+    def test_calls_inside_share_one_transaction(self, tmp_path):
+        """测试事务内的存储调用共享连接并整体回滚"""
+        storage = _storage_with_user(tmp_path)
+        with pytest.raises(RuntimeError):
+            with storage.schedule_transaction("rangeuser"):
+                storage.create_event("rangeuser", _event("first", "2026-03-02T09:00", "2026-03-02T10:00"))
+                assert [item["title"] for item in storage.load_schedule_range("rangeuser", None, None)] == ["first"]
+                raise RuntimeError("abort")
+        assert storage.load_schedule_range("rangeuser", None, None) == []
+
+        with storage.schedule_transaction("rangeuser"):
+            storage.create_event("rangeuser", _event("kept", "2026-03-02T09:00", "2026-03-02T10:00"))
+            with pytest.raises(StorageError):
+                with storage.schedule_transaction("rangeuser"):
+                    pass
+        assert [item["title"] for item in storage.load_schedule_range("rangeuser", None, None)] == ["kept"]
+        storage.close()
+
+    def test_writers_are_serialized(self, tmp_path):
+        """测试并发写入方在锁内依次执行"""
+        storage = _storage_with_user(tmp_path)
+        inside = []
+        overlaps = []
+
+        def writer(index):
+            with storage.schedule_transaction("rangeuser"):
+                if inside:
+                    overlaps.append(index)
+                inside.append(index)
+                storage.create_event("rangeuser", _event(f"w{index}", "2026-03-02T09:00", "2026-03-02T10:00"))
+                time.sleep(0.01)
+                inside.remove(index)
+
+        threads = [threading.Thread(target=writer, args=(index,)) for index in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert overlaps == []
+        assert len(storage.load_schedule_range("rangeuser", None, None)) == 5
+        storage.close()
+
+
+class TestEventIds:
+    """日程编号分配测试"""
+
+    def test_ids_are_per_user_and_never_reused(self, tmp_path):
+        """测试编号按用户独立递增且删除后不复用"""
+        storage = _storage_with_user(tmp_path)
+        storage.insert_user("otheruser", {"api_key": "cs_otheruser", "password": {"salt": "", "hash": "", "iterations": 1}})
+        first = storage.create_event("rangeuser", _event("a", "2026-03-02T09:00", "2026-03-02T10:00"))
+        second = storage.create_event("rangeuser", _event("b", "2026-03-03T09:00", "2026-03-03T10:00"))
+        other = storage.create_event("otheruser", _event("c", "2026-03-02T09:00", "2026-03-02T10:00"))
+        assert (first["id"], second["id"], other["id"]) == (1, 2, 1)
+
+        storage.delete_event("rangeuser", second["id"])
+        assert storage.load_schedule("rangeuser")["next_id"] == 3
+        assert storage.create_event("rangeuser", _event("d", "2026-03-04T09:00", "2026-03-04T10:00"))["id"] == 3
+        assert storage.get_event("otheruser", 1)["title"] == "c"
+        storage.close()
+
+    def test_init_schema_rekeys_legacy_events(self, tmp_path):
+        """测试旧库全局编号迁移为按用户的复合主键"""
+        import sqlite3
+
+        db_path = tmp_path / "storage.db"
+        conn = sqlite3.connect(db_path)
+        conn.executescript(
+            """
+            CREATE TABLE users (username TEXT PRIMARY KEY, api_key TEXT UNIQUE NOT NULL, password_salt TEXT NOT NULL,
+                password_hash TEXT NOT NULL, iterations INTEGER NOT NULL, enabled BOOLEAN NOT NULL DEFAULT TRUE,
+                created_at TEXT NOT NULL);
+            CREATE TABLE events (id INTEGER PRIMARY KEY, username TEXT NOT NULL, title TEXT NOT NULL, time TEXT NOT NULL,
+                end_time TEXT NOT NULL, location TEXT NOT NULL, description TEXT NOT NULL, recurrence TEXT NOT NULL,
+                created_at TEXT NOT NULL);
+            INSERT INTO users VALUES ('alice', 'ka', 's', 'h', 1, 1, '');
+            INSERT INTO users VALUES ('bob', 'kb', 's', 'h', 1, 1, '');
+            INSERT INTO events VALUES (1, 'alice', 'a1', '2024-01-01T09:00', '2024-01-01T10:00', 'A', '',
+                '{"frequency": "none", "end_type": "never", "until": null, "count": null}', '');
+            INSERT INTO events VALUES (2, 'bob', 'b1', '2024-01-01T09:00', '2024-01-01T10:00', 'A', '',
+                '{"frequency": "none", "end_type": "never", "until": null, "count": null}', '');
+            INSERT INTO events VALUES (5, 'alice', 'a2', '2024-01-02T09:00', '2024-01-02T10:00', 'A', '',
+                '{"frequency": "daily", "end_type": "count", "until": null, "count": 2}', '');
+            """
+        )
+        conn.commit()
+        conn.close()
+
+        storage = DatabaseStorage(_sqlite_config(tmp_path))
+        storage.init_schema()
+        storage.init_schema()
+        assert [(item["id"], item["title"]) for item in storage.load_schedule("alice")["items"]] == [(1, "a1"), (5, "a2")]
+        assert [item["title"] for item in storage.load_schedule_range("alice", "2024-01-03T00:00", None)] == ["a2"]
+        assert storage.create_event("alice", _event("a3", "2026-03-02T09:00", "2026-03-02T10:00"))["id"] == 6
+        assert storage.create_event("bob", _event("b2", "2026-03-02T09:00", "2026-03-02T10:00"))["id"] == 3
+        with storage.connection() as conn:
+            keys = {row["name"]: row["pk"] for row in conn.execute("PRAGMA table_info(events)").fetchall()}
+        assert (keys["username"], keys["id"]) == (1, 2)
+        storage.close()